@@ -0,0 +1,77 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+class BackgroundRunner:
+    """
+    Runs analysis jobs off the Tk main thread and hands results back to it.
+
+    Jobs run one at a time on a worker thread and get two arguments:
+    progress(message) to report a stage, and cancelled() to check whether a
+    newer edit has made them stale. Callbacks always run on the Tk thread via
+    root.after; results of stale jobs are dropped and stale jobs that have
+    not started yet are skipped.
+
+    Args:
+        root: Tk root used to schedule callbacks
+        poll_interval (int): Milliseconds between result checks while busy
+    """
+
+    def __init__(self, root, poll_interval=16):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+        self._results = queue.SimpleQueue()
+        self._generation = 0
+        self._pending = 0
+        self._polling = False
+
+    @property
+    def busy(self):
+        return self._pending > 0
+
+    def cancel_pending(self):
+        """Marks every submitted job as stale."""
+        self._generation += 1
+
+    def submit(self, job, on_done, on_progress=None, on_error=None):
+        generation = self._generation
+
+        def cancelled():
+            return generation != self._generation
+
+        def progress(message):
+            self._results.put((generation, on_progress, message, False))
+
+        def run():
+            if cancelled():
+                self._results.put((generation, None, None, True))
+                return
+            try:
+                self._results.put((generation, on_done, job(progress, cancelled), True))
+            except Exception as error:
+                self._results.put((generation, on_error, error, True))
+
+        self._pending += 1
+        self._executor.submit(run)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+
+    def shutdown(self):
+        self.cancel_pending()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        while True:
+            try:
+                generation, callback, value, final = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if final:
+                self._pending -= 1
+            if callback is not None and generation == self._generation:
+                callback(value)
+        if self._pending:
+            self.root.after(self.poll_interval, self._poll)
+        else:
+            self._polling = False
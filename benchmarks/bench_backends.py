@@ -0,0 +1,62 @@
+"""
+Compares memory and throughput of the compact and networkx graph backends.
+
+    python benchmarks/bench_backends.py --sizes 10000 100000 1000000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_incremental import lock_ordered_edges
+from deadlock_detector import DeadlockDetector
+import networkx  # imported up front so it is not counted against the backend
+
+
+def measure(backend, edges):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    detector = DeadlockDetector(backend=backend)
+    for kind, process, resource in edges:
+        if kind == "allocate":
+            detector.allocate_resource(process, resource)
+        else:
+            detector.add_dependency(process, resource)
+    build_time = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    detector.detect_deadlock()
+    detect_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _, process, resource in edges:
+        detector.release_resource(process, resource)
+    release_time = time.perf_counter() - start
+    return memory, len(edges) / build_time, detect_time, len(edges) / release_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--backends", nargs="+", default=["compact", "networkx"])
+    args = parser.parse_args()
+
+    print(f"{'edges':>10} {'backend':>10} {'memory MB':>10} {'B/edge':>8} "
+          f"{'adds/s':>10} {'detect ms':>10} {'releases/s':>11}")
+    for size in args.sizes:
+        edges = list(lock_ordered_edges(size))
+        for backend in args.backends:
+            memory, adds, detect, releases = measure(backend, edges)
+            print(f"{size:>10} {backend:>10} {memory / 2**20:>10.1f} {memory / size:>8.0f} "
+                  f"{adds:>10.0f} {detect * 1e3:>10.1f} {releases:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Per-request latency of the vectorized Banker's safety check.
+
+    python benchmarks/bench_bankers.py --processes 1000 4000 --resources 100 300
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bankers import BankersAvoidance
+
+
+def build(processes, resources, seed=0):
+    """Random max claims with a safe partial allocation of about half of each claim."""
+    rng = np.random.default_rng(seed)
+    banker = BankersAvoidance()
+    claims = rng.integers(0, 4, size=(processes, resources))
+    for col in range(resources):
+        banker.add_resource(f"R{col}", int(claims[:, col].sum() // 2 + claims[:, col].max()))
+    for row in range(processes):
+        banker.add_process(f"P{row}", {f"R{col}": int(claims[row, col]) for col in range(resources)})
+    held = claims // 2
+    for row, col in zip(*np.nonzero(held)):
+        banker._allocate(row, col, int(held[row, col]))
+    return banker, claims - held
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, nargs="+", default=[1000, 4000])
+    parser.add_argument("--resources", type=int, nargs="+", default=[100, 300])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    print(f"{'processes':>10} {'resources':>10} {'us/request':>11} {'granted':>8}")
+    for processes in args.processes:
+        for resources in args.resources:
+            banker, need = build(processes, resources)
+            rows, cols = np.nonzero(need)
+            picks = rng.integers(0, len(rows), size=args.requests)
+            granted = 0
+            start = time.perf_counter()
+            for pick in picks:
+                granted += banker.can_grant(f"P{rows[pick]}", f"R{cols[pick]}", 1)
+            elapsed = (time.perf_counter() - start) / args.requests
+            print(f"{processes:>10} {resources:>10} {elapsed * 1e6:>11.1f} {granted:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compares replaying a lock snapshot edge by edge against one apply_events() batch.
+
+    python benchmarks/bench_bulk.py --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_incremental import lock_ordered_edges
+from deadlock_detector import DeadlockDetector
+
+
+def replay_one_by_one(edges, incremental):
+    detector = DeadlockDetector(incremental=incremental)
+    for kind, process, resource in edges:
+        if kind == "allocate":
+            detector.allocate_resource(process, resource)
+        else:
+            detector.add_dependency(process, resource)
+        detector.detect_deadlock()
+
+
+def replay_bulk(edges, incremental):
+    detector = DeadlockDetector(incremental=incremental)
+    detector.apply_events(
+        (resource, process, kind) if kind == "allocate" else (process, resource, kind)
+        for kind, process, resource in edges
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--max-full-scan", type=int, default=10000,
+                        help="largest size replayed one by one with full-scan detection")
+    args = parser.parse_args()
+
+    print(f"{'edges':>10} {'path':>24} {'seconds':>10}")
+    for size in args.sizes:
+        edges = list(lock_ordered_edges(size))
+        runs = [
+            ("bulk, full-scan", replay_bulk, False),
+            ("bulk, incremental", replay_bulk, True),
+            ("one by one, incremental", replay_one_by_one, True),
+        ]
+        if size <= args.max_full_scan:
+            runs.append(("one by one, full-scan", replay_one_by_one, False))
+        for label, replay, incremental in runs:
+            start = time.perf_counter()
+            replay(edges, incremental)
+            print(f"{size:>10} {label:>24} {time.perf_counter() - start:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
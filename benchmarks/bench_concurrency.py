@@ -0,0 +1,88 @@
+"""
+Contention benchmark: many producer threads feeding one detector.
+
+Compares ConcurrentDeadlockDetector (single writer, lock-free reads) with a
+plain DeadlockDetector behind one global lock that detects after every edge.
+
+    python benchmarks/bench_concurrency.py --threads 1 2 4 8 --events 20000
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrent_detector import ConcurrentDeadlockDetector
+from deadlock_detector import DeadlockDetector
+
+
+class LockedDetector:
+    def __init__(self):
+        self.detector = DeadlockDetector(incremental=True)
+        self.lock = threading.Lock()
+
+    def add_dependency(self, process, resource):
+        with self.lock:
+            self.detector.add_dependency(process, resource)
+            self.detector.detect_deadlock()
+
+    def allocate_resource(self, process, resource):
+        with self.lock:
+            self.detector.allocate_resource(process, resource)
+            self.detector.detect_deadlock()
+
+    def detect_deadlock(self):
+        with self.lock:
+            return self.detector.detect_deadlock()
+
+    def flush(self):
+        pass
+
+
+def producer(detector, thread, count, reads):
+    """Acquires resources in lock order so the graph stays acyclic."""
+    for i in range(count // 2):
+        process = f"P{thread}-{i}"
+        detector.allocate_resource(process, f"R{thread}-{i}")
+        detector.add_dependency(process, f"R{thread}-{i + 1}")
+        if reads and i % reads == 0:
+            detector.detect_deadlock()
+
+
+def run(detector, threads, events, reads):
+    workers = [
+        threading.Thread(target=producer, args=(detector, t, events // threads, reads))
+        for t in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    produced = time.perf_counter() - start
+    detector.flush()
+    return events / produced, events / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--events", type=int, default=20000, help="total events per run")
+    parser.add_argument("--reads", type=int, default=10,
+                        help="each producer reads the result every N events (0 = never)")
+    args = parser.parse_args()
+
+    print(f"{'threads':>8} {'detector':>12} {'producer ev/s':>14} {'applied ev/s':>13}")
+    for threads in args.threads:
+        concurrent = ConcurrentDeadlockDetector()
+        produced, applied = run(concurrent, threads, args.events, args.reads)
+        concurrent.close()
+        print(f"{threads:>8} {'concurrent':>12} {produced:>14,.0f} {applied:>13,.0f}")
+        produced, applied = run(LockedDetector(), threads, args.events, args.reads)
+        print(f"{threads:>8} {'global lock':>12} {produced:>14,.0f} {applied:>13,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Distributed detection over loopback: message volume and latency by site count.
+
+Every site runs in its own process with its own detector and reports to a
+coordinator in this process (see distributed.py). Once the sites have
+loaded their lock tables and gone quiet, site 0 applies the request that
+closes a ring of distributed transactions through all sites; latency runs
+from that request to the coordinator reporting the deadlock. The last
+column is what shipping every site's edges to one detector would cost.
+
+    python benchmarks/bench_distributed.py --sites 2 4 8 16 --processes 1000 --spans 10
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from distributed import CoordinatorServer, SiteClient, SiteDetector
+from workloads import partitioned_ring
+
+QUIET = 0.2
+
+
+def site_process(name, port, events, closing, ready, go, stop, results):
+    asyncio.run(_site(name, port, events, closing, ready, go, stop, results))
+
+
+async def _site(name, port, events, closing, ready, go, stop, results):
+    loop = asyncio.get_running_loop()
+    site = SiteDetector(name)
+    site.detector.apply_events(events)
+    client = await SiteClient(site).connect("127.0.0.1", port)
+    ready.set()
+    await loop.run_in_executor(None, go.wait)
+    if closing is not None:
+        results.put(time.monotonic())
+        site.detector.apply_events([closing])
+        await client.sync()
+    await loop.run_in_executor(None, stop.wait)
+    await client.close()
+
+
+async def quiet(server):
+    """Waits until no report has arrived for QUIET seconds."""
+    seen = -1
+    while seen != server.messages_in:
+        seen = server.messages_in
+        await asyncio.sleep(QUIET)
+
+
+def traffic(server):
+    return server.messages_in + server.messages_out, server.bytes_in + server.bytes_out
+
+
+async def run(sites, processes, spans, seed):
+    events, (closing_site, closing) = partitioned_ring(sites, processes, spans, seed)
+    server = await CoordinatorServer().start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    context = multiprocessing.get_context("spawn")
+    ready = [context.Event() for _ in range(sites)]
+    go, stop, results = context.Event(), context.Event(), context.Queue()
+    workers = [
+        context.Process(target=site_process, args=(
+            f"S{i}", port, events[i], closing if i == closing_site else None,
+            ready[i], go, stop, results
+        ))
+        for i in range(sites)
+    ]
+    loop = asyncio.get_running_loop()
+    try:
+        for worker in workers:
+            worker.start()
+        for event in ready:
+            await loop.run_in_executor(None, event.wait)
+        await quiet(server)
+        setup = traffic(server)
+        go.set()
+        closed_at = await loop.run_in_executor(None, results.get)
+        while not server.coordinator.deadlocks():
+            await asyncio.sleep(0.0005)
+        latency = server.detected_at - closed_at
+        await quiet(server)
+        total = traffic(server)
+        summary_edges = server.coordinator.number_of_edges()
+    finally:
+        stop.set()
+        for worker in workers:
+            await loop.run_in_executor(None, worker.join)
+        await server.close()
+    full_graph = sum(len(json.dumps(site_events)) for site_events in events)
+    return {
+        "edges": sum(len(site_events) for site_events in events),
+        "setup_messages": setup[0],
+        "setup_bytes": setup[1],
+        "detect_messages": total[0] - setup[0],
+        "detect_bytes": total[1] - setup[1],
+        "latency": latency,
+        "summary_edges": summary_edges,
+        "full_graph_bytes": full_graph,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sites", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--processes", type=int, default=1000, help="local processes per site")
+    parser.add_argument("--spans", type=int, default=10, help="distributed transactions per site")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per site count (median latency)")
+    args = parser.parse_args()
+
+    print(f"{'sites':>6} {'edges':>9} {'setup msgs':>11} {'setup KB':>9} {'detect msgs':>12} "
+          f"{'detect KB':>10} {'latency ms':>11} {'summary':>8} {'full graph KB':>14}")
+    for sites in args.sites:
+        runs = [asyncio.run(run(sites, args.processes, args.spans, seed)) for seed in range(args.repeat)]
+        row = runs[0]
+        latency = statistics.median(result["latency"] for result in runs)
+        print(f"{sites:>6} {row['edges']:>9} {row['setup_messages']:>11} "
+              f"{row['setup_bytes'] / 1024:>9.1f} {row['detect_messages']:>12} "
+              f"{row['detect_bytes'] / 1024:>10.2f} {latency * 1e3:>11.2f} "
+              f"{row['summary_edges']:>8} {row['full_graph_bytes'] / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Measures event log write throughput and replay time.
+
+    python benchmarks/bench_event_log.py --live 50000 --replay 10000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_incremental import lock_ordered_edges
+from deadlock_detector import DeadlockDetector
+from event_log import ADD, REMOVE, EventLog, LogReader
+
+
+def bench_live(path, size):
+    """Replays edges into a detector, logged through its change events when path is set."""
+    detector = DeadlockDetector(incremental=True)
+    log = None
+    if path is not None:
+        log = EventLog(path)
+        log.attach(detector)
+    edges = list(lock_ordered_edges(size))
+    start = time.perf_counter()
+    for kind, process, resource in edges:
+        if kind == "allocate":
+            detector.allocate_resource(process, resource)
+        else:
+            detector.add_dependency(process, resource)
+    if log is not None:
+        log.close()
+    return time.perf_counter() - start
+
+
+def bench_replay(path, size, nodes, seed=0):
+    """Writes `size` synthetic records in bulk, then replays to the end and to the middle."""
+    rng = np.random.default_rng(seed)
+    log = EventLog(path)
+    log.intern(f"N{i}" for i in range(nodes))
+    start = time.perf_counter()
+    log.append_arrays(
+        np.arange(size, dtype=np.float64),
+        rng.choice([ADD, REMOVE], size, p=[0.6, 0.4]).astype(np.uint8),
+        rng.integers(0, nodes, size, dtype=np.uint32),
+        rng.integers(0, nodes, size, dtype=np.uint32),
+    )
+    log.close()
+    written = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reader = LogReader(path)
+    final = reader.edges_at()
+    replay_end = time.perf_counter() - start
+    start = time.perf_counter()
+    reader.edges_at(size / 2)
+    replay_middle = time.perf_counter() - start
+    return written, replay_end, replay_middle, len(final)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--live", type=int, default=50000, help="edges replayed through a logged detector")
+    parser.add_argument("--replay", type=int, default=10000000, help="records replayed")
+    parser.add_argument("--nodes", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        plain = bench_live(None, args.live)
+        logged = bench_live(os.path.join(directory, "live"), args.live)
+        print(f"live logging: {args.live} edges in {logged:.3f}s, "
+              f"{plain:.3f}s without the log ({logged - plain:+.3f}s)")
+
+        written, end, middle, edges = bench_replay(
+            os.path.join(directory, "replay"), args.replay, args.nodes
+        )
+        print(f"bulk write:   {args.replay} records in {written:.3f}s")
+        print(f"replay:       to end {end:.3f}s ({args.replay / end:,.0f} records/sec), "
+              f"to middle {middle:.3f}s, {edges} edges at end")
+
+
+if __name__ == "__main__":
+    main()
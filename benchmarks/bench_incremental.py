@@ -0,0 +1,76 @@
+"""
+Compares incremental cycle detection against the full-scan path.
+
+Builds an acyclic wait-for graph (processes acquire resources in a fixed
+lock order), then times edge insertions each followed by detect_deadlock().
+
+    python benchmarks/bench_incremental.py --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deadlock_detector import DeadlockDetector
+
+
+def lock_ordered_edges(num_edges, seed=0):
+    """Yields (kind, process, resource) tuples that never form a cycle."""
+    rng = random.Random(seed)
+    num_resources = max(2, num_edges // 4)
+    num_processes = max(1, num_edges // 2)
+    for i in range(num_edges // 2):
+        process = f"P{i % num_processes}"
+        held = rng.randrange(num_resources - 1)
+        wanted = rng.randrange(held + 1, num_resources)
+        yield "allocate", process, f"R{held}"
+        yield "request", process, f"R{wanted}"
+
+
+def build(incremental, edges):
+    detector = DeadlockDetector(incremental=incremental)
+    for kind, process, resource in edges:
+        if kind == "allocate":
+            detector.allocate_resource(process, resource)
+        else:
+            detector.add_dependency(process, resource)
+    return detector
+
+
+def time_updates(detector, updates):
+    start = time.perf_counter()
+    for kind, process, resource in updates:
+        if kind == "allocate":
+            detector.allocate_resource(process, resource)
+        else:
+            detector.add_dependency(process, resource)
+        detector.detect_deadlock()
+    return (time.perf_counter() - start) / len(updates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--full-updates", type=int, default=20,
+                        help="updates timed on the full-scan path (each is O(V+E))")
+    args = parser.parse_args()
+
+    print(f"{'edges':>10} {'mode':>12} {'build s':>10} {'per update us':>15}")
+    for size in args.sizes:
+        edges = list(lock_ordered_edges(size))
+        extra = list(lock_ordered_edges(2 * args.updates, seed=size))
+        for incremental, count in ((True, args.updates), (False, args.full_updates)):
+            start = time.perf_counter()
+            detector = build(incremental, edges)
+            build_time = time.perf_counter() - start
+            per_update = time_updates(detector, extra[:count])
+            mode = "incremental" if incremental else "full-scan"
+            print(f"{size:>10} {mode:>12} {build_time:>10.2f} {per_update * 1e6:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
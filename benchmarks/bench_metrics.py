@@ -0,0 +1,47 @@
+"""
+Cost of instrumentation: per-operation time with and without Metrics.
+
+    python benchmarks/bench_metrics.py --size 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deadlock_detector import DeadlockDetector
+from metrics import Metrics
+
+
+def run(size, metrics=None):
+    detector = DeadlockDetector(incremental=True)
+    if metrics is not None:
+        metrics.instrument(detector)
+    start = time.perf_counter()
+    for i in range(size):
+        detector.allocate_resource(f"P{i}", f"R{i}")
+        detector.add_dependency(f"P{i}", f"R{i + 1}")
+        detector.detect_deadlock()
+    return (time.perf_counter() - start) / (3 * size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=100000)
+    args = parser.parse_args()
+
+    plain = run(args.size)
+    metrics = Metrics()
+    instrumented = run(args.size, metrics)
+    print(f"{'':>14} {'us/op':>8}")
+    print(f"{'plain':>14} {plain * 1e6:>8.2f}")
+    print(f"{'instrumented':>14} {instrumented * 1e6:>8.2f}")
+    print(f"{'overhead':>14} {(instrumented - plain) * 1e6:>8.2f}")
+    for name, histogram in sorted(metrics.histograms.items()):
+        print(f"{name:>20} count={histogram.count} p50<={histogram.quantile(0.5):.1e}s "
+              f"p99<={histogram.quantile(0.99):.1e}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Measures parallel detection over many independent components against one process.
+
+    python benchmarks/bench_parallel.py --components 20000 --size 50 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parallel_detection import find_cyclic_components, partition
+
+
+def component_graph(components, size, seed=0):
+    """
+    CSR graph of `components` disjoint lock-ordered chains of `size` nodes,
+    every tenth closed into a cycle by one backward edge.
+    """
+    rng = np.random.default_rng(seed)
+    count = components * size
+    base = np.repeat(np.arange(components) * size, size - 1)
+    offset = np.tile(np.arange(size - 1), components)
+    src = base + offset
+    dst = src + 1
+    extra = rng.integers(0, size - 1, (components, 2))
+    low, high = np.sort(extra, axis=1).T
+    base = np.arange(components) * size
+    src = np.concatenate([src, base + low])
+    dst = np.concatenate([dst, base + high + 1])
+    closed = np.arange(0, components, 10)
+    src = np.concatenate([src, closed * size + size - 1])
+    dst = np.concatenate([dst, closed * size])
+    order = np.argsort(src, kind="stable")
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(src, minlength=count))])
+    return count, indptr, dst[order]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--components", type=int, default=20000)
+    parser.add_argument("--size", type=int, default=50)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    count, indptr, indices = component_graph(args.components, args.size)
+    print(f"{count} nodes, {len(indices)} edges, {os.cpu_count()} cores")
+    start = time.perf_counter()
+    partition(count, indptr, indices)
+    print(f"partition: {time.perf_counter() - start:.3f}s")
+
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8} {'cycles':>8}")
+    baseline = None
+    for workers in args.workers:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Warm the pool so process start-up is not timed.
+            list(executor.map(abs, range(workers)))
+            start = time.perf_counter()
+            found = find_cyclic_components(
+                count, indptr, indices, workers=workers,
+                executor=executor if workers > 1 else None
+            )
+            elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>10.3f} {baseline / elapsed:>7.2f}x {len(found):>8}")
+
+
+if __name__ == "__main__":
+    main()
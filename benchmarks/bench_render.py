@@ -0,0 +1,53 @@
+"""
+Render time and output size of the large-graph renderer.
+
+    python benchmarks/bench_render.py --sizes 10000 100000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph_visualizer import render_large_graph
+
+
+def synthetic_graph(num_nodes, deadlocks=5, seed=0):
+    """Many small independent lock chains plus a few two-process deadlocks."""
+    rng = random.Random(seed)
+    half = num_nodes // 2
+    nodes = [f"P{i}" for i in range(half)] + [f"R{i}" for i in range(half)]
+    edges = []
+    for i in range(half):
+        edges.append((f"R{i}", f"P{i}"))
+        if i % 10 and rng.random() < 0.8:
+            edges.append((f"P{i}", f"R{i - 1}"))
+    for d in range(deadlocks):
+        p, q = rng.sample(range(half), 2)
+        edges.append((f"P{p}", f"R{q}"))
+        edges.append((f"P{q}", f"R{p}"))
+    return nodes, edges
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'nodes':>10} {'edges':>10} {'seconds':>10} {'file MB':>10}")
+    for size in args.sizes:
+        nodes, edges = synthetic_graph(size)
+        output = os.path.join(tempfile.gettempdir(), f"bench_render_{size}.html")
+        start = time.perf_counter()
+        render_large_graph(nodes, edges, output_file=output, open_browser=False,
+                           processes=nodes[:size // 2])
+        elapsed = time.perf_counter() - start
+        print(f"{size:>10} {len(edges):>10} {elapsed:>10.2f} {os.path.getsize(output) / 2**20:>10.1f}")
+        os.remove(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Local load generator for event_server: many concurrent clients over loopback.
+
+    python benchmarks/bench_server.py --clients 1000 --events 200 --protocol binary
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_server import BINARY_MAGIC, DeadlockServer, encode_frame
+
+
+def client_events(client, count):
+    """Each client acquires resources in lock order, so the graph stays acyclic."""
+    process = f"P{client}"
+    for i in range(count // 2):
+        yield f"R{client + i}", process, "allocate"
+        yield process, f"R{client + i + 1}", "request"
+
+
+async def run_client(port, client, count, protocol):
+    _, writer = await asyncio.open_connection("127.0.0.1", port)
+    if protocol == "binary":
+        payload = BINARY_MAGIC + b"".join(
+            encode_frame(*event) for event in client_events(client, count)
+        )
+    else:
+        payload = "".join(
+            f"{kind} {dst} {src}\n" if kind == "allocate" else f"{kind} {src} {dst}\n"
+            for src, dst, kind in client_events(client, count)
+        ).encode()
+    writer.write(payload)
+    await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def main(args):
+    server = await DeadlockServer(max_batch=args.batch).start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_client(port, client, args.events, args.protocol) for client in range(args.clients)
+    ))
+    sent = time.perf_counter() - start
+    expected = args.clients * (args.events // 2 * 2)
+    while server.events_applied < expected:
+        await asyncio.sleep(0.01)
+    await server.drain()
+    total = time.perf_counter() - start
+    await server.close()
+    events = server.events_applied
+    print(f"clients={args.clients} protocol={args.protocol} events={events} "
+          f"batches={server.batches_applied}")
+    print(f"sent in {sent:.2f}s, applied in {total:.2f}s -> {events / total:,.0f} events/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=200, help="events per client")
+    parser.add_argument("--protocol", choices=["binary", "text"], default="binary")
+    parser.add_argument("--batch", type=int, default=10000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,93 @@
+"""
+Compares detection CPU under churn of short-lived waits, per event versus by wait age.
+
+Background processes hold and wait on locks; most crossing waits are
+transient and time out within --wait-ms, a few are real deadlocks that stay.
+Time is simulated at one millisecond per event.
+
+    python benchmarks/bench_wait_age.py --episodes 20000 --threshold 1.0
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deadlock_detector import DeadlockDetector
+from wait_scheduler import WaitAgeScheduler
+
+TICK = 0.001
+
+
+def churn(episodes, background=2000, wait_ms=50, stuck_every=1000, seed=0):
+    """
+    Yields (op, process, resource) steps. Each episode makes two processes
+    take a lock each and then wait on the other's; unless the episode is one
+    of the stuck ones, one wait times out after up to wait_ms events.
+    """
+    rng = random.Random(seed)
+    for i in range(background):
+        yield "allocate", f"B{i}", f"Q{i}"
+        yield "request", f"B{i}", f"Q{(i + 1) % background}" if i % 7 else f"Q{i}x"
+    pending = []
+    for episode in range(episodes):
+        a, b = f"P{episode}a", f"P{episode}b"
+        ra, rb = f"R{episode}a", f"R{episode}b"
+        yield "allocate", a, ra
+        yield "allocate", b, rb
+        yield "request", a, rb
+        yield "request", b, ra
+        if episode % stuck_every:
+            pending.append((episode * 4 + rng.randrange(1, wait_ms), a, rb))
+        pending.sort()
+        while pending and pending[0][0] <= episode * 4:
+            _, process, resource = pending.pop(0)
+            yield "release", process, resource
+
+
+def replay(steps, mode, threshold):
+    now = [0.0]
+    detector = DeadlockDetector(incremental=mode != "full scan", clock=lambda: now[0])
+    scheduler = WaitAgeScheduler(detector, threshold) if mode == "wait age" else None
+    apply = {
+        "allocate": detector.allocate_resource,
+        "request": detector.add_dependency,
+        "release": detector.release_resource,
+    }
+    reported = set()
+    start = time.process_time()
+    for op, process, resource in steps:
+        now[0] += TICK
+        apply[op](process, resource)
+        if scheduler is not None:
+            deadlocks = scheduler.poll()
+        else:
+            deadlocks = detector.find_deadlocks() if detector.detect_deadlock()[0] else []
+        reported.update(frozenset(d.processes) for d in deadlocks)
+    elapsed = time.process_time() - start
+    scans = scheduler.full_scans if scheduler is not None else None
+    return elapsed, len(reported), scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--episodes", type=int, default=20000)
+    parser.add_argument("--threshold", type=float, default=1.0, help="wait age in seconds")
+    parser.add_argument("--wait-ms", type=int, default=50, help="longest transient wait")
+    parser.add_argument("--full-scan-episodes", type=int, default=2000,
+                        help="episodes replayed with a full scan per event")
+    args = parser.parse_args()
+
+    print(f"{'mode':>12} {'episodes':>9} {'cpu s':>8} {'us/event':>9} {'reported':>9} {'scans':>6}")
+    for mode in ("full scan", "incremental", "wait age"):
+        episodes = args.full_scan_episodes if mode == "full scan" else args.episodes
+        steps = list(churn(episodes, wait_ms=args.wait_ms))
+        elapsed, reported, scans = replay(steps, mode, args.threshold)
+        print(f"{mode:>12} {episodes:>9} {elapsed:>8.3f} {elapsed / len(steps) * 1e6:>9.1f} "
+              f"{reported:>9} {'-' if scans is None else scans:>6}")
+
+
+if __name__ == "__main__":
+    main()
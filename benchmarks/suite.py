@@ -0,0 +1,217 @@
+"""
+Benchmark suite: detection latency, throughput, peak memory and render time.
+
+Runs every workload generator at every size and every churn scenario, and
+writes one JSON document so results can be compared between commits.
+
+    python benchmarks/suite.py --sizes 1000 10000 --output results.json
+    python benchmarks/suite.py --compare baseline.json --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deadlock_detector import DeadlockDetector
+from graph_visualizer import render_large_graph
+from workloads import GENERATORS, churn
+
+SCENARIOS = ("steady", "burst", "contention")
+
+
+def measure_graph(name, size, seed, repeats, max_render):
+    """Yields (metric, value, unit) for one generated graph."""
+    events = GENERATORS[name](size, seed=seed)
+    yield "events", len(events), "count"
+
+    detector = DeadlockDetector(incremental=True)
+    start = time.perf_counter()
+    detector.apply_events(events)
+    elapsed = time.perf_counter() - start
+    yield "build", elapsed, "s"
+    yield "build_throughput", len(events) / elapsed if elapsed else None, "events/s"
+
+    tracemalloc.start()
+    DeadlockDetector(incremental=True).apply_events(events)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    yield "build_peak_memory", peak / 2**20, "MiB"
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        detector.detect_deadlock()
+        samples.append(time.perf_counter() - start)
+    yield "detect_latency_p50", statistics.median(samples) * 1e6, "us"
+
+    start = time.perf_counter()
+    deadlocks = detector.find_deadlocks()
+    yield "find_deadlocks", (time.perf_counter() - start) * 1e3, "ms"
+    yield "deadlocks", len(deadlocks), "count"
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        detector.find_deadlocks()
+    yield "find_deadlocks_cached", (time.perf_counter() - start) / repeats * 1e6, "us"
+
+    detector.add_dependency("P_benchmark", "R_benchmark")
+    start = time.perf_counter()
+    detector.find_deadlocks()
+    yield "find_deadlocks_after_edit", (time.perf_counter() - start) * 1e3, "ms"
+
+    full = DeadlockDetector.from_snapshot(detector.snapshot())
+    start = time.perf_counter()
+    full.find_deadlocks()
+    yield "find_deadlocks_full_scan", (time.perf_counter() - start) * 1e3, "ms"
+
+    if size <= max_render:
+        deadlocked = set().union(*(d.processes | d.resources for d in deadlocks))
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "graph.html")
+            start = time.perf_counter()
+            render_large_graph(detector.nodes(), detector.edges(), deadlocked, output_file=output,
+                               open_browser=False, processes=detector.processes())
+            yield "render", time.perf_counter() - start, "s"
+            yield "render_size", os.path.getsize(output) / 2**20, "MiB"
+
+
+def measure_history(name, size, seed):
+    """Yields (metric, value, unit) for the history panel, or nothing without a display."""
+    import tkinter as tk
+    from history_panel import HistoryPanel
+
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return
+    try:
+        events = GENERATORS[name](size, seed=seed)
+        detector = DeadlockDetector(incremental=True)
+        detector.apply_events(events)
+        panel = HistoryPanel(root)
+        start = time.perf_counter()
+        panel.attach(detector)
+        root.update_idletasks()
+        yield "history_attach", time.perf_counter() - start, "s"
+        start = time.perf_counter()
+        for i in range(100):
+            detector.add_dependency(f"P_history{i}", f"R_history{i}")
+        root.update_idletasks()
+        yield "history_update", (time.perf_counter() - start) / 100 * 1e6, "us"
+    finally:
+        root.destroy()
+
+
+def measure_churn(scenario, steps, seed):
+    """Yields (metric, value, unit) for one churn scenario, detecting after every step."""
+    ops = list(churn(steps, seed=seed, scenario=scenario))
+    detector = DeadlockDetector(incremental=True)
+    apply = {
+        "request": detector.add_dependency,
+        "allocate": detector.allocate_resource,
+        "release": detector.release_resource,
+    }
+    latencies = []
+    deadlocked_steps = 0
+    clock = time.perf_counter
+    for op, process, resource in ops:
+        start = clock()
+        apply[op](process, resource)
+        deadlocked, _ = detector.detect_deadlock()
+        latencies.append(clock() - start)
+        deadlocked_steps += deadlocked
+    total = sum(latencies)
+    latencies.sort()
+    yield "steps", len(ops), "count"
+    yield "throughput", len(ops) / total if total else None, "ops/s"
+    yield "step_latency_p50", latencies[len(latencies) // 2] * 1e6, "us"
+    yield "step_latency_p99", latencies[int(len(latencies) * 0.99)] * 1e6, "us"
+    yield "deadlocked_steps", deadlocked_steps, "count"
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Prints each metric next to the baseline's, with the ratio new / old."""
+    old = {(r["workload"], r["size"], r["metric"]): r["value"] for r in baseline["results"]}
+    print(f"{'workload':>14} {'size':>8} {'metric':>26} {'old':>12} {'new':>12} {'ratio':>7}",
+          file=sys.stderr)
+    for r in results:
+        before = old.get((r["workload"], r["size"], r["metric"]))
+        if before is None or r["value"] is None or r["unit"] == "count":
+            continue
+        ratio = r["value"] / before if before else float("inf")
+        print(f"{r['workload']:>14} {r['size']:>8} {r['metric']:>26} "
+              f"{before:>12.4g} {r['value']:>12.4g} {ratio:>7.2f}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--workloads", nargs="+", choices=sorted(GENERATORS),
+                        default=list(GENERATORS))
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--churn-steps", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=200, help="detect_deadlock() samples")
+    parser.add_argument("--max-render", type=int, default=10000,
+                        help="largest size rendered to HTML")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON from an earlier run")
+    args = parser.parse_args()
+
+    results = []
+
+    def record(workload, size, metrics):
+        for metric, value, unit in metrics:
+            results.append({"workload": workload, "size": size, "metric": metric,
+                            "value": value, "unit": unit})
+            shown = "-" if value is None else f"{value:.6g}"
+            print(f"{workload:>14} {size:>8} {metric:>26} {shown:>12} {unit}", file=sys.stderr)
+
+    for name in args.workloads:
+        for size in args.sizes:
+            record(name, size, measure_graph(name, size, args.seed, args.repeats, args.max_render))
+            record(name, size, measure_history(name, size, args.seed))
+    for scenario in args.scenarios:
+        record(f"churn_{scenario}", args.churn_steps, measure_churn(scenario, args.churn_steps, args.seed))
+
+    document = {
+        "meta": {
+            "commit": git_commit(),
+            "time": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            compare(results, json.load(file))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(document, file, indent=2)
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
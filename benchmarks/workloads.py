@@ -0,0 +1,228 @@
+"""
+Seeded resource-allocation workloads shared by the benchmarks.
+
+Graph generators return (src, dst, kind) events in graph orientation, ready
+for DeadlockDetector.apply_events(): "allocate" is Resource → Process and
+"request" is Process → Resource. Churn scenarios yield (op, process,
+resource) steps for the detector's add_dependency / allocate_resource /
+release_resource methods.
+"""
+import random
+from collections import deque
+from itertools import accumulate
+
+
+def random_graph(processes, seed=0, resources=None, holds=1, requests=1):
+    """Every process holds and requests a few uniformly random resources."""
+    rng = random.Random(seed)
+    resources = resources or processes
+    owner = {}
+    events = []
+    for p in range(processes):
+        for _ in range(holds):
+            r = rng.randrange(resources)
+            if r not in owner:
+                owner[r] = p
+                events.append((f"R{r}", f"P{p}", "allocate"))
+    for p in range(processes):
+        for _ in range(requests):
+            r = rng.randrange(resources)
+            if owner.get(r, p) != p:
+                events.append((f"P{p}", f"R{r}", "request"))
+    return events
+
+
+def dining_philosophers(processes, seed=0, deadlocked=True):
+    """
+    Philosophers around one table, each holding the left fork and waiting on
+    the right one. Unless deadlocked, the last one reaches for the left fork
+    first, so the ring never closes.
+    """
+    events = []
+    for p in range(processes):
+        left, right = f"R{p}", f"R{(p + 1) % processes}"
+        if not deadlocked and p == processes - 1:
+            events.append((f"P{p}", right, "request"))
+            continue
+        events.append((left, f"P{p}", "allocate"))
+        events.append((f"P{p}", right, "request"))
+    return events
+
+
+def lock_chains(processes, seed=0, chain=8, rows=None, out_of_order=0.01):
+    """
+    Database transactions locking rows in key order: each holds a run of
+    consecutive rows and waits on the next row, held by another transaction.
+    A small fraction lock out of order, which is where deadlocks come from.
+    """
+    rng = random.Random(seed)
+    rows = rows or processes * chain
+    owner = {}
+    events = []
+    for p in range(processes):
+        start = rng.randrange(rows)
+        for offset in range(chain):
+            row = (start + offset) % rows
+            if row in owner:
+                break
+            owner[row] = p
+            events.append((f"R{row}", f"P{p}", "allocate"))
+        wanted = rng.randrange(rows) if rng.random() < out_of_order else (start + chain) % rows
+        if owner.get(wanted, p) != p:
+            events.append((f"P{p}", f"R{wanted}", "request"))
+    return events
+
+
+def hot_resources(processes, seed=0, resources=None, skew=1.2, requests=2):
+    """
+    Long-tail contention: resource popularity follows a Zipf-like law, so a
+    few hot resources collect most of the waiters.
+    """
+    rng = random.Random(seed)
+    resources = resources or max(2, processes // 4)
+    weights = [1 / (rank + 1) ** skew for rank in range(resources)]
+    owner = {}
+    events = []
+    for r in range(resources):
+        p = rng.randrange(processes)
+        owner[r] = p
+        events.append((f"R{r}", f"P{p}", "allocate"))
+    for p in range(processes):
+        for r in set(rng.choices(range(resources), weights, k=requests)):
+            if owner[r] != p:
+                events.append((f"P{p}", f"R{r}", "request"))
+    return events
+
+
+GENERATORS = {
+    "random": random_graph,
+    "philosophers": dining_philosophers,
+    "lock_chains": lock_chains,
+    "hot_resources": hot_resources,
+}
+
+
+def graph_nodes(events):
+    """Returns the distinct node names of a list of events, in first-seen order."""
+    return list(dict.fromkeys(node for src, dst, _ in events for node in (src, dst)))
+
+
+def partitioned_ring(sites, processes=1000, spans=10, seed=0):
+    """
+    Lock tables of several sites, for distributed detection. Each site holds
+    acyclic lock_chains traffic over its own rows plus `spans` distributed
+    transactions: T{i}.{k} holds S{i}.G{k} and waits on S{i+1}.G{k}, an
+    edge recorded by site i+1. Only chain 0 closes into a ring across all
+    sites, and its closing request, T{sites-1}.0 -> S0.G0, is returned
+    separately.
+
+    Returns:
+        tuple: (per-site event lists, (site, closing event))
+    """
+    events = []
+    for site in range(sites):
+        local = [
+            tuple(f"S{site}.{node}" for node in (src, dst)) + (kind,)
+            for src, dst, kind in lock_chains(processes, seed + site, chain=4, out_of_order=0)
+        ]
+        for k in range(spans):
+            local.append((f"S{site}.G{k}", f"T{site}.{k}", "allocate"))
+            if site > 0:
+                local.append((f"T{site - 1}.{k}", f"S{site}.G{k}", "request"))
+        events.append(local)
+    return events, (0, (f"T{sites - 1}.0", "S0.G0", "request"))
+
+
+class LockTable:
+    """
+    Minimal single-instance lock manager that turns acquire and release
+    decisions into detector operations: a free resource is allocated, a
+    held one queues a request, and a release hands the resource to the
+    first waiter.
+    """
+
+    def __init__(self):
+        self.owner = {}
+        self.waiters = {}
+        self.held = {}
+        self.waiting = {}
+
+    def acquire(self, process, resource):
+        if self.owner.get(resource) == process:
+            return
+        if resource not in self.owner:
+            self.owner[resource] = process
+            self.held.setdefault(process, set()).add(resource)
+            yield "allocate", process, resource
+        else:
+            waiting = self.waiting.setdefault(process, set())
+            if resource not in waiting:
+                waiting.add(resource)
+                self.waiters.setdefault(resource, deque()).append(process)
+                yield "request", process, resource
+
+    def release(self, process, resource):
+        if self.owner.get(resource) != process:
+            return
+        del self.owner[resource]
+        self.held[process].discard(resource)
+        yield "release", process, resource
+        queue = self.waiters.get(resource)
+        if queue:
+            waiter = queue.popleft()
+            self.waiting[waiter].discard(resource)
+            self.owner[resource] = waiter
+            self.held.setdefault(waiter, set()).add(resource)
+            yield "allocate", waiter, resource
+
+    def abandon(self, process, resource):
+        """Gives up a pending request, as a lock timeout would."""
+        waiting = self.waiting.get(process)
+        if waiting and resource in waiting:
+            waiting.discard(resource)
+            self.waiters[resource].remove(process)
+            yield "release", process, resource
+
+
+def churn(steps, processes=1000, resources=1000, seed=0, scenario="steady"):
+    """
+    Drives a LockTable with random acquire / release / timeout traffic.
+
+    Scenarios:
+        steady: uniform resources, acquires and releases balanced
+        burst: alternating phases of mostly acquires and mostly releases
+        contention: Zipf-distributed resources, so waits pile up on hot ones
+
+    Yields:
+        tuple: (op, process, resource) with op "request", "allocate" or
+            "release"
+    """
+    if scenario not in ("steady", "burst", "contention"):
+        raise ValueError(f"Unknown churn scenario: {scenario!r}")
+    rng = random.Random(seed)
+    table = LockTable()
+    cumulative = None
+    if scenario == "contention":
+        cumulative = list(accumulate(1 / (rank + 1) ** 1.2 for rank in range(resources)))
+    produced = 0
+    while produced < steps:
+        acquire_share = 0.55
+        if scenario == "burst":
+            acquire_share = 0.9 if (produced // 1000) % 2 == 0 else 0.2
+        process = f"P{rng.randrange(processes)}"
+        roll = rng.random()
+        if roll < acquire_share:
+            if cumulative:
+                index = rng.choices(range(resources), cum_weights=cumulative)[0]
+            else:
+                index = rng.randrange(resources)
+            ops = table.acquire(process, f"R{index}")
+        elif roll < acquire_share + 0.05:
+            waiting = table.waiting.get(process)
+            ops = table.abandon(process, rng.choice(sorted(waiting))) if waiting else ()
+        else:
+            held = table.held.get(process)
+            ops = table.release(process, rng.choice(sorted(held))) if held else ()
+        for op in ops:
+            produced += 1
+            yield op
@@ -0,0 +1,117 @@
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+from deadlock_detector import ALLOCATE, EXCLUSIVE, RELEASE, REQUEST, DeadlockDetector
+
+Snapshot = namedtuple("Snapshot", ["version", "deadlocked", "deadlocks", "edge_count"])
+_Query = namedtuple("_Query", ["function", "future"])
+_CLOSE = object()
+
+class ConcurrentDeadlockDetector:
+    """
+    DeadlockDetector that many threads can mutate at once.
+
+    Writers only append to a queue; one background thread owns the detector,
+    applies queued events in batches and publishes an immutable Snapshot of
+    the detection result after each batch. Readers take the latest snapshot
+    without locking, so neither side ever waits on the other.
+
+    An invalid event (an unknown kind, a node named in the wrong role) is
+    dropped on its own; the rest of its batch still applies. Dropped events
+    are counted in events_rejected, and the latest is kept with its error
+    in last_rejected.
+
+    Args:
+        backend (str): Graph backend for the underlying detector
+        max_batch (int): Most events applied per detection pass
+    """
+
+    def __init__(self, backend="compact", max_batch=10000):
+        self.detector = DeadlockDetector(incremental=True, backend=backend)
+        self.max_batch = max_batch
+        self.snapshot = Snapshot(0, False, (), 0)
+        self.events_rejected = 0
+        self.last_rejected = None
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="deadlock-writer", daemon=True)
+        self._thread.start()
+
+    def add_dependency(self, process, resource, mode=EXCLUSIVE):
+        self._queue.put((process, resource, REQUEST, mode))
+
+    def allocate_resource(self, process, resource, mode=EXCLUSIVE):
+        self._queue.put((resource, process, ALLOCATE, mode))
+
+    def release_resource(self, process, resource):
+        self._queue.put((process, resource, RELEASE))
+
+    def apply_events(self, events):
+        """Queues a batch of (src, dst, kind[, mode]) events; see DeadlockDetector.apply_events."""
+        for event in events:
+            self._queue.put(event)
+
+    def detect_deadlock(self):
+        """Returns the latest published result, in the same shape as DeadlockDetector."""
+        snapshot = self.snapshot
+        if not snapshot.deadlocked:
+            return False, None
+        deadlock = snapshot.deadlocks[0]
+        return True, deadlock.processes | deadlock.resources
+
+    def find_deadlocks(self):
+        return list(self.snapshot.deadlocks)
+
+    def query(self, function):
+        """
+        Runs function(detector) on the writer thread after every event queued
+        so far, and returns its result. Use it for consistent reads of the graph.
+        """
+        future = Future()
+        self._queue.put(_Query(function, future))
+        return future.result()
+
+    def flush(self):
+        """Waits until every event queued so far is applied and published."""
+        self.query(lambda detector: None)
+        return self.snapshot
+
+    def close(self):
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = []
+            while item is not None and item is not _CLOSE and type(item) is not _Query:
+                batch.append(item)
+                item = None
+                if len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        pass
+            if batch:
+                self._apply(batch)
+            if item is _CLOSE:
+                return
+            if item is not None:
+                try:
+                    item.future.set_result(item.function(self.detector))
+                except Exception as error:
+                    item.future.set_exception(error)
+
+    def _apply(self, batch):
+        (deadlocked, _), rejected = self.detector.apply_valid_events(batch, errors=Exception)
+        if rejected:
+            self.events_rejected += len(rejected)
+            _, event, error = rejected[-1]
+            self.last_rejected = (event, error)
+        deadlocks = tuple(self.detector.find_deadlocks()) if deadlocked else ()
+        self.snapshot = Snapshot(
+            self.snapshot.version + 1,
+            deadlocked,
+            deadlocks,
+            self.detector.store.number_of_edges()
+        )
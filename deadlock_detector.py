@@ -1,24 +1,629 @@
-import networkx as nx
+import time
+from collections import namedtuple
+from graph_backend import create_backend
+from scc import cyclic_components, find_cycle
+from topological_order import DynamicTopologicalOrder
+
+Deadlock = namedtuple("Deadlock", ["processes", "resources"])
+# info holds an EdgeInfo per edge; None stands for exclusive edges of unknown age.
+GraphSnapshot = namedtuple("GraphSnapshot", ["nodes", "edges", "kinds", "info"], defaults=(None,))
+EdgeInfo = namedtuple("EdgeInfo", ["since", "kind", "mode"])
+
+REQUEST, ALLOCATE, RELEASE, REMOVE = 0, 1, 2, 3
+EVENT_KINDS = {
+    "request": REQUEST,
+    "allocate": ALLOCATE,
+    "release": RELEASE,
+    "remove": REMOVE,
+    REQUEST: REQUEST,
+    ALLOCATE: ALLOCATE,
+    RELEASE: RELEASE,
+    REMOVE: REMOVE,
+}
+# A plain (N, 3) NumPy array of names and codes has a string dtype, so its
+# codes arrive as "0".."3".
+EVENT_KINDS.update({str(code): code for code in (REQUEST, ALLOCATE, RELEASE, REMOVE)})
+
+SHARED, EXCLUSIVE = "shared", "exclusive"
+LOCK_MODES = (SHARED, EXCLUSIVE)
+# Edge flags as stored by the graph backend. The edge kind is not stored:
+# edges out of a process are requests, edges out of a resource allocations.
+SHARED_FLAG = 1
+
+PROCESS, RESOURCE = "process", "resource"
+NODE_KINDS = (PROCESS, RESOURCE)
+KIND_CODES = {kind: code for code, kind in enumerate(NODE_KINDS, 1)}
+# Kinds of the (source, target) nodes of each edge kind.
+EDGE_ENDS = {REQUEST: (PROCESS, RESOURCE), ALLOCATE: (RESOURCE, PROCESS)}
+
+# A batch adding more than this fraction of the graph rebuilds the order in
+# one linear pass instead of inserting edge by edge.
+REBUILD_FRACTION = 0.5
+
+class NodeKinds:
+    """
+    Side table tagging every node id of a graph backend with its kind.
+
+    Dense integer ids (the compact backend) index a bytearray, one byte per
+    node; other backends fall back to a dict. The ids of each kind are also
+    listed in tagging order, so either side of the bipartite graph can be
+    walked without filtering the other.
+    """
+    __slots__ = ("_codes", "_members")
+
+    def __init__(self, dense=True):
+        self._codes = bytearray() if dense else {}
+        self._members = tuple([] for _ in NODE_KINDS)
+
+    def get(self, node):
+        """Returns the kind of a node id, or None if it is untagged."""
+        try:
+            code = self._codes[node]
+        except (IndexError, KeyError):
+            return None
+        return NODE_KINDS[code - 1] if code else None
+
+    def tag(self, node, kind):
+        """Tags an untagged node id."""
+        code = KIND_CODES[kind]
+        codes = self._codes
+        if type(codes) is bytearray and node >= len(codes):
+            if node > len(codes):
+                codes.extend(bytes(node - len(codes)))
+            codes.append(code)
+        else:
+            codes[node] = code
+        self._members[code - 1].append(node)
+
+    def members(self, kind):
+        """Returns the ids of every node of a kind (the live list, do not modify)."""
+        return self._members[KIND_CODES[kind] - 1]
+
 
 class DeadlockDetector:
-    def __init__(self):
-        self.graph = nx.DiGraph()
+    """
+    Resource allocation graph with deadlock detection.
+
+    Args:
+        incremental (bool): Maintain cycles incrementally as edges change
+        backend (str): Graph storage, "compact" (integer-indexed) or "networkx"
+        clock (callable): Timestamp source for edge ages
+
+    Every node is tagged as a process or a resource by the first edge that
+    names it (see NodeKinds); naming it later in the other role is a
+    ValueError. Every edge carries an EdgeInfo: when it appeared, whether it
+    is a request or an allocation, and its lock mode. The backend stores
+    the time and mode next to the adjacency as a timestamp and a flags byte
+    (see SHARED_FLAG), and the kind follows from the source node's kind,
+    so no Python object is kept per edge. Two shared locks on a
+    resource do not wait on each other, so detection only follows a shared
+    request into a resource's exclusive holders.
+
+    version counts the changes to the graph. detect_deadlock() and
+    find_deadlocks() remember their last result for the current version, so
+    asking again about an unchanged graph costs nothing; in incremental mode
+    find_deadlocks() also reuses the Deadlock of every component the changes
+    did not touch.
+    """
+
+    def __init__(self, incremental=False, backend="compact", clock=time.monotonic):
+        self.store = create_backend(backend)
+        self.kinds = NodeKinds(dense=getattr(self.store, "dense_ids", False))
+        self.incremental = incremental
+        self.clock = clock
+        self._shared = 0
+        self._listeners = []
+        self.version = 0
+        self._detection = None
+        self._found = None
+        self._component_deadlocks = {}
+        self._order = None
+        if incremental:
+            self._order = DynamicTopologicalOrder(
+                self.store.successors,
+                self.store.predecessors
+            )
+
+    def subscribe(self, listener):
+        """
+        Registers listener(event, source, target), called after every change:
+        ("node", name, None) for a new node, ("add", u, v) and ("remove", u, v)
+        for edges, and ("mode", u, v) when an existing edge changes lock mode.
+        """
+        self._listeners.append(listener)
 
-    def add_dependency(self, process, resource):
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    @property
+    def graph(self):
+        """
+        The graph as an nx.DiGraph (converted on demand for the compact
+        backend), each node with a "kind" attribute of PROCESS or RESOURCE.
+        """
+        graph = self.store.to_networkx()
+        name = self.store.name
+        for kind in NODE_KINDS:
+            for node in self.kinds.members(kind):
+                graph.nodes[name(node)]["kind"] = kind
+        return graph
+
+    def nodes(self):
+        """Returns the names of all processes and resources."""
+        name = self.store.name
+        return [name(node) for node in self.store.nodes()]
+
+    def processes(self):
+        """Returns the names of all processes, in the order they appeared."""
+        name = self.store.name
+        return [name(node) for node in self.kinds.members(PROCESS)]
+
+    def resources(self):
+        """Returns the names of all resources, in the order they appeared."""
+        name = self.store.name
+        return [name(node) for node in self.kinds.members(RESOURCE)]
+
+    def node_kind(self, name):
+        """Returns PROCESS or RESOURCE for a node name, or None if unknown."""
+        node = self.store.lookup(name)
+        return None if node is None else self.kinds.get(node)
+
+    def edges(self):
+        """Returns all (source, target) edges by name."""
+        name = self.store.name
+        return [(name(u), name(v)) for u, v in self.store.edges()]
+
+    def snapshot(self):
+        """Returns an immutable copy of the graph, safe to hand to another thread."""
+        kind, name = self.kinds.get, self.store.name
+        edges, info = [], []
+        for u in self.store.nodes():
+            for v, edge in self.successor_info(u):
+                edges.append((name(u), name(v)))
+                info.append(edge)
+        return GraphSnapshot(
+            tuple(self.nodes()),
+            tuple(edges),
+            tuple(kind(node) for node in self.store.nodes()),
+            tuple(info)
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot, incremental=False, backend="compact", clock=time.monotonic):
+        """
+        Builds a new detector holding the graph of a snapshot, with the
+        snapshot's edge ages and lock modes. Ages are measured on `clock`,
+        which should be the clock of the detector the snapshot came from.
+        """
+        detector = cls(incremental=incremental, backend=backend, clock=clock)
+        store, kinds = detector.store, detector.kinds
+        for node, kind in zip(snapshot.nodes, snapshot.kinds):
+            node = store.node_id(node)
+            if kind is not None:
+                kinds.tag(node, kind)
+        info = snapshot.info or [None] * len(snapshot.edges)
+        for (source, target), edge in zip(snapshot.edges, info):
+            code = ALLOCATE if detector.node_kind(source) == RESOURCE else REQUEST
+            mode = EXCLUSIVE if edge is None else edge.mode
+            detector._add_edge(source, target, update_order=False, kind=code, mode=mode)
+            if edge is not None:
+                store.set_edge_data(
+                    store.lookup(source), store.lookup(target),
+                    edge.since, SHARED_FLAG if mode == SHARED else 0
+                )
+        if incremental:
+            detector._order.rebuild(store.nodes())
+        return detector
+
+    def has_edge(self, source, target):
+        u, v = self.store.lookup(source), self.store.lookup(target)
+        return u is not None and v is not None and self.store.has_edge(u, v)
+
+    def edge_info(self, source, target):
+        """Returns the EdgeInfo of an edge, or None if it does not exist."""
+        u, v = self.store.lookup(source), self.store.lookup(target)
+        if u is None or v is None:
+            return None
+        return self.edge_info_by_id(u, v)
+
+    def edge_info_by_id(self, u, v):
+        """Like edge_info(), for node ids of the backend."""
+        data = self.store.edge_data(u, v)
+        return None if data is None else _edge_info(data[0], self._edge_kind(u), data[1])
+
+    def successor_info(self, node):
+        """Yields (successor id, EdgeInfo) for every edge out of a node id."""
+        kind = self._edge_kind(node)
+        for succ, since, flags in self.store.successor_data(node):
+            yield succ, _edge_info(since, kind, flags)
+
+    def add_dependency(self, process, resource, mode=EXCLUSIVE):
         """Adds a dependency between a process and a resource."""
-        self.graph.add_edge(process, resource)
+        _check_mode(mode)
+        self._add_edge(process, resource, kind=REQUEST, mode=mode)
+
+    def allocate_resource(self, process, resource, mode=EXCLUSIVE):
+        """Turns a pending request into an allocation (Resource → Process)."""
+        _check_mode(mode)
+        # A request edge between the two already implies the right kinds,
+        # so _add_edge still rejects a misused name before anything changes.
+        self._remove_edge(process, resource)
+        self._add_edge(resource, process, kind=ALLOCATE, mode=mode)
 
     def release_resource(self, process, resource):
         """Removes a process-resource dependency (resource released)."""
-        if self.graph.has_edge(process, resource):
-            self.graph.remove_edge(process, resource)
+        self._remove_edge(process, resource)
+        self._remove_edge(resource, process)
 
-    def detect_deadlock(self):
-        """Detects if a deadlock is present in the system."""
+    def add_dependencies_bulk(self, pairs):
+        """
+        Adds many process → resource requests, then runs detection once.
+
+        Args:
+            pairs: Iterable or (N, 2) NumPy array of (process, resource)
+
+        Returns:
+            tuple: The detect_deadlock() result for the final graph
+        """
+        if hasattr(pairs, "tolist"):
+            pairs = pairs.tolist()
+        return self.apply_events((process, resource, REQUEST) for process, resource in pairs)
+
+    def apply_events(self, events):
+        """
+        Applies a batch of edge events atomically, then runs detection once.
+
+        Events are (src, dst, kind) in graph orientation: "request" adds
+        src → dst, "allocate" adds src → dst and drops the request dst → src,
+        "release" drops the edge in both directions and "remove" drops
+        src → dst only. Kinds may also be the REQUEST/ALLOCATE/RELEASE/REMOVE
+        codes, e.g. in an (N, 3) NumPy array of strings or a structured array
+        with an integer kind field. An optional fourth field gives
+        the lock mode (default exclusive). The batch is validated, lock modes
+        and node kinds included, before anything is applied.
+
+        Returns:
+            tuple: The detect_deadlock() result for the final graph
+        """
+        self._apply_batch(events)
+        return self.detect_deadlock()
+
+    def apply_valid_events(self, events, errors=(ValueError, TypeError)):
+        """
+        Like apply_events(), but a batch that fails is applied again one
+        event at a time, so only the failing events are skipped. A batch has
+        the net effect of its events in order, so events the failed attempt
+        already applied end up as if applied once.
+
+        Args:
+            events: As for apply_events()
+            errors: Exception types that reject an event. The default covers
+                invalid (ValueError) and malformed (TypeError) events;
+                ingestion loops that must outlive any failure pass Exception.
+
+        Returns:
+            tuple: (detect_deadlock() result, list of (index, event,
+                error) for every rejected event)
+        """
+        if hasattr(events, "tolist"):
+            events = events.tolist()
+        events = list(events)
         try:
-            cycle = nx.find_cycle(self.graph, orientation="original")
-            deadlocked_nodes = {node for edge in cycle for node in edge}
-            return True, deadlocked_nodes  # Deadlock detected
-        except nx.NetworkXNoCycle:
-            return False, None  # No deadlock
+            return self.apply_events(events), []
+        except errors:
+            pass
+        rejected = []
+        for index, event in enumerate(events):
+            try:
+                self._apply_batch((event,))
+            except errors as error:
+                rejected.append((index, event, error))
+        return self.detect_deadlock(), rejected
+
+    def _apply_batch(self, events):
+        if hasattr(events, "tolist"):
+            events = events.tolist()
+        final = {}
+        for event in events:
+            if len(event) == 3:
+                src, dst, kind = event
+                mode = EXCLUSIVE
+            else:
+                src, dst, kind, mode = event
+                _check_mode(mode)
+            code = EVENT_KINDS.get(kind)
+            if code is None:
+                raise ValueError(f"Unknown event kind: {kind!r}")
+            if code == RELEASE:
+                final[(src, dst)] = None
+                final[(dst, src)] = None
+            elif code == REMOVE:
+                final[(src, dst)] = None
+            else:
+                if code == ALLOCATE:
+                    final[(dst, src)] = None
+                final[(src, dst)] = (code, mode)
+
+        additions = [(edge, added) for edge, added in final.items() if added is not None]
+        seen = {}
+        for (src, dst), (code, _) in additions:
+            for name, expected in zip((src, dst), EDGE_ENDS[code]):
+                actual = seen.get(name)
+                if actual is None:
+                    actual = seen[name] = self.node_kind(name) or expected
+                if actual != expected:
+                    raise ValueError(_kind_error(name, actual, expected))
+        rebuild = self.incremental and (
+            len(additions) > REBUILD_FRACTION * self.store.number_of_edges()
+        )
+        for (src, dst), added in final.items():
+            if added is None:
+                self._remove_edge(src, dst, update_order=not rebuild)
+        for (src, dst), (code, mode) in additions:
+            self._add_edge(src, dst, update_order=not rebuild, kind=code, mode=mode)
+        if rebuild:
+            self._order.rebuild(self.store.nodes())
+
+    def detect_deadlock(self):
+        """
+        Detects if a deadlock is present in the system.
+
+        In incremental mode the reported nodes are a whole deadlocked component.
+        The node set is a frozenset, shared by calls until the graph changes.
+        """
+        if self._detection is not None and self._detection[0] == self.version:
+            return self._detection[1]
+        if self._shared:
+            deadlocks = self.find_deadlocks()
+            result = (True, deadlocks[0].processes | deadlocks[0].resources) if deadlocks else (False, None)
+        else:
+            if self.incremental:
+                cycle = self._order.find_cycle()
+            else:
+                cycle = find_cycle(self.store.nodes(), self.store.successors)
+            # No deadlock, or the nodes of one
+            result = (False, None) if cycle is None else (True, frozenset(self._names(cycle)))
+        self._detection = (self.version, result)
+        return result
+
+    def on_cycle(self, source, target):
+        """
+        Returns True if the edge source → target lies on a cycle, ignoring lock
+        modes and wait ages. A constant-time lookup in incremental mode.
+        """
+        u, v = self.store.lookup(source), self.store.lookup(target)
+        if u is None or v is None or not self.store.has_edge(u, v):
+            return False
+        if self.incremental:
+            return u == v or self._order.component_of(u) == self._order.component_of(v)
+        successors = self.store.successors
+        seen = {v}
+        stack = [v]
+        while stack:
+            node = stack.pop()
+            if node == u:
+                return True
+            for succ in successors(node):
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append(succ)
+        return False
+
+    def find_deadlocks(self, min_age=None, now=None):
+        """
+        Reports every deadlocked cluster at once.
+
+        Args:
+            min_age (float, optional): Only count requests waiting at least
+                this long, so short-lived waits are not reported
+            now (float, optional): Current time on the detector's clock
+
+        Returns:
+            list: One Deadlock(processes, resources) of frozensets per
+                strongly connected component that contains a cycle
+        """
+        if min_age is not None:
+            return self._deadlocks(self._blocking_components(min_age, now))
+        if self._found is not None and self._found[0] == self.version:
+            return list(self._found[1])
+        if self._shared:
+            deadlocks = self._deadlocks(self._blocking_components(None, now))
+        elif self.incremental:
+            deadlocks = self._component_cached_deadlocks()
+        else:
+            deadlocks = self._deadlocks(cyclic_components(self.store.nodes(), self.store.successors))
+        self._found = (self.version, deadlocks)
+        return list(deadlocks)
+
+    def find_deadlocks_parallel(self, workers=None, executor=None):
+        """
+        Like find_deadlocks(), but splits the graph into weakly connected
+        components and searches them in worker processes. The CSR arrays are
+        shared with the workers through shared memory rather than pickled.
+        The workers only see plain adjacency, so while any shared lock is
+        held this falls back to find_deadlocks().
+
+        Args:
+            workers (int): Worker processes (default: os.cpu_count())
+            executor: A ProcessPoolExecutor to reuse across calls
+        """
+        if self._shared:
+            return self.find_deadlocks()
+        from parallel_detection import find_cyclic_components
+
+        store = self.store
+        if hasattr(store, "to_csr"):
+            nodes = None
+            indptr, indices = store.to_csr()
+        else:
+            nodes = list(store.nodes())
+            index = {node: i for i, node in enumerate(nodes)}
+            indptr, indices = [0], []
+            for node in nodes:
+                indices.extend(index[succ] for succ in store.successors(node))
+                indptr.append(len(indices))
+        components = find_cyclic_components(
+            store.number_of_nodes(), indptr, indices, workers=workers, executor=executor
+        )
+        if nodes is not None:
+            components = [[nodes[i] for i in component] for component in components]
+        return self._deadlocks(components)
+
+    def _blocking_components(self, min_age, now):
+        """
+        Cyclic components of the graph of real waits: requests at least
+        min_age old, and shared requests only into exclusive holders. A
+        resource entered by a shared request is visited as its own copy,
+        the 1-tuple (node,), which skips the resource's shared holders.
+        """
+        successor_data, kind_of = self.store.successor_data, self.kinds.get
+        cutoff = None
+        if min_age is not None:
+            cutoff = (self.clock() if now is None else now) - min_age
+        if self.incremental:
+            # Every real cycle lies inside a cycle of the raw graph.
+            allowed = set().union(*self._order.components())
+            nodes = allowed
+        else:
+            allowed = None
+            nodes = self.store.nodes()
+
+        def successors(node):
+            shared_entry = type(node) is tuple
+            if shared_entry:
+                node = node[0]
+            found = []
+            allocations = kind_of(node) == RESOURCE
+            for succ, since, flags in successor_data(node):
+                if allowed is not None and succ not in allowed:
+                    continue
+                if allocations:
+                    if not (shared_entry and flags & SHARED_FLAG):
+                        found.append(succ)
+                elif cutoff is None or since <= cutoff:
+                    found.append((succ,) if flags & SHARED_FLAG else succ)
+            return found
+
+        return [
+            {node[0] if type(node) is tuple else node for node in component}
+            for component in cyclic_components(nodes, successors)
+        ]
+
+    def _deadlocks(self, components):
+        return [self._deadlock(component) for component in components]
+
+    def _deadlock(self, component):
+        name, kind = self.store.name, self.kinds.get
+        processes = frozenset(name(node) for node in component if kind(node) == PROCESS)
+        return Deadlock(processes, frozenset(self._names(component)) - processes)
+
+    def _component_cached_deadlocks(self):
+        """
+        find_deadlocks() of an incremental detector. A component only ever
+        grows in place (a merge) or is replaced (a split), so its key and size
+        tell whether its cached Deadlock is still current.
+        """
+        cached = self._component_deadlocks
+        current = {}
+        for key, members in self._order.keyed_components():
+            entry = cached.get(key)
+            if entry is None or entry[0] != len(members):
+                entry = (len(members), self._deadlock(members))
+            current[key] = entry
+        self._component_deadlocks = current
+        return [deadlock for _, deadlock in current.values()]
+
+    def _names(self, nodes):
+        name = self.store.name
+        return {name(node) for node in nodes}
+
+    def _nodes(self, source, u, source_kind, target, v, target_kind):
+        """
+        Slow path of _add_edge: checks both ends against their kinds before
+        either changes, then adds or tags them. Returns their ids.
+        """
+        kind_of = self.kinds.get
+        if u is not None and kind_of(u) not in (None, source_kind):
+            raise ValueError(_kind_error(source, kind_of(u), source_kind))
+        if v is not None and kind_of(v) not in (None, target_kind):
+            raise ValueError(_kind_error(target, kind_of(v), target_kind))
+        return self._node(source, u, source_kind), self._node(target, v, target_kind)
+
+    def _node(self, name, node, kind):
+        """Returns the id of a node looked up as node, adding or tagging it with kind."""
+        if node is None:
+            node = self.store.node_id(name)
+            self.kinds.tag(node, kind)
+            if self._listeners:
+                self._emit("node", name, None)
+        elif self.kinds.get(node) is None:
+            self.kinds.tag(node, kind)
+            self._component_deadlocks.clear()  # they may list it as a resource
+        return node
+
+    def _add_edge(self, source, target, update_order=True, kind=REQUEST, mode=EXCLUSIVE):
+        source_kind, target_kind = EDGE_ENDS[kind]
+        lookup, kind_of = self.store.lookup, self.kinds.get
+        u, v = lookup(source), lookup(target)
+        if u is None or v is None or kind_of(u) != source_kind or kind_of(v) != target_kind:
+            u, v = self._nodes(source, u, source_kind, target, v, target_kind)
+        flags = SHARED_FLAG if mode == SHARED else 0
+        store = self.store
+        if not store.add_edge(u, v, self.clock(), flags):
+            since, old = store.edge_data(u, v)
+            if old != flags:
+                # Same edge, new mode: the wait goes on, so keep its age.
+                store.set_edge_data(u, v, since, flags)
+                self._shared += 1 if flags & SHARED_FLAG else -1
+                self.version += 1
+                if self._listeners:
+                    self._emit("mode", source, target)
+            return
+        self.version += 1
+        if flags & SHARED_FLAG:
+            self._shared += 1
+        if self.incremental and update_order:
+            self._order.insert_edge(u, v)
+        if self._listeners:
+            self._emit("add", source, target)
+
+    def _remove_edge(self, source, target, update_order=True):
+        u, v = self.store.lookup(source), self.store.lookup(target)
+        if u is None or v is None:
+            return
+        if self._shared:
+            # Only look the edge up when it might be one of the shared ones.
+            data = self.store.edge_data(u, v)
+            if data is None:
+                return
+            if data[1] & SHARED_FLAG:
+                self._shared -= 1
+        if not self.store.remove_edge(u, v):
+            return
+        self.version += 1
+        if self.incremental and update_order:
+            self._order.remove_edge(u, v)
+        if self._listeners:
+            self._emit("remove", source, target)
+
+    def _edge_kind(self, node):
+        return ALLOCATE if self.kinds.get(node) == RESOURCE else REQUEST
+
+    def _emit(self, event, source, target):
+        for listener in self._listeners:
+            listener(event, source, target)
+
+def _edge_info(since, kind, flags):
+    return EdgeInfo(since, kind, SHARED if flags & SHARED_FLAG else EXCLUSIVE)
+
+def _check_mode(mode):
+    if mode not in LOCK_MODES:
+        raise ValueError(f"Unknown lock mode: {mode!r}")
+
+def _kind_error(name, actual, expected):
+    return f"{name!r} is a {actual}, it cannot be used as a {expected}"
 
+if __name__ == "__main__":
+    import sys
+    from headless import main
+    sys.exit(main())
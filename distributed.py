@@ -0,0 +1,456 @@
+"""
+Distributed deadlock detection across several detector sites.
+
+Each site runs its own DeadlockDetector over the edges it sees, typically
+the lock table of the resources it owns. A process can span sites (a
+distributed transaction waits on one site while holding locks on another),
+so a global deadlock is a cycle whose pieces lie on different sites and
+meet at processes they share. Instead of shipping every edge to one place,
+each site periodically sends a coordinator a summary of its graph:
+
+    - the names of its processes, once each, so the coordinator can tell
+      which processes appear on more than one site (the shared ones), and
+    - the summary edges x -> y between shared processes such that the local
+      graph has a wait path from x to y through unshared nodes only, sent
+      as additions and removals against the previous report.
+
+The coordinator unions the summaries into a wait-for graph over shared
+processes, keeps its cycles with a DynamicTopologicalOrder, and tells each
+site which of its processes are shared. Every cycle of that graph is a
+deadlock, and every global deadlock shows up as one, while the traffic
+scales with the shared processes rather than with the size of the graphs.
+A deadlock that stays inside one site and touches no shared process is
+only visible to that site's own detector.
+
+Sites and the coordinator exchange newline-delimited JSON over TCP:
+
+    site -> coordinator         {"type": "report", "site": S, "processes": [...],
+                                 "add": [[x, y], ...], "remove": [[x, y], ...]}
+    coordinator -> site         {"type": "shared", "processes": [...]}
+    coordinator -> subscriber   {"event": "deadlock" | "resolved", "deadlocks": [...]}
+
+A connection sending the line "subscribe" receives the deadlock alerts.
+
+    python distributed.py coordinator [--listen HOST:PORT]
+    python distributed.py site NAME [FILE ...] [--coordinator HOST:PORT]
+"""
+import asyncio
+import json
+import sys
+import time
+from collections import namedtuple
+from deadlock_detector import ALLOCATE, PROCESS, SHARED, DeadlockDetector
+from event_server import broadcast
+from headless import AlertEmitter, parse_event
+from topological_order import DynamicTopologicalOrder
+
+GlobalDeadlock = namedtuple("GlobalDeadlock", ["processes", "sites"])
+
+
+class SiteDetector:
+    """
+    One site: a local DeadlockDetector plus the summary it owes the coordinator.
+
+    The summary follows real waits the way find_deadlocks() does: a shared
+    request only continues into a resource's exclusive holders. Wait ages
+    are not summarized.
+
+    Args:
+        name (str): Site name, unique among the coordinator's sites
+        detector (DeadlockDetector, optional): Local detector to summarize
+    """
+
+    def __init__(self, name, detector=None):
+        self.name = name
+        self.detector = detector or DeadlockDetector(incremental=True)
+        self.shared = set()
+        self._listed = 0
+        self._reported = set()
+        self._summary = None
+
+    def share(self, processes):
+        """Marks processes the coordinator has seen on other sites as well."""
+        self.shared.update(processes)
+
+    def restart(self):
+        """Forgets what was reported, so the next report starts from scratch."""
+        self._listed = 0
+        self._reported = set()
+
+    def summary(self):
+        """Returns the (x, y) summary edges between shared processes, by name."""
+        key = (self.detector.version, len(self.shared))
+        if self._summary is None or self._summary[0] != key:
+            self._summary = (key, self._summary_edges())
+        return self._summary[1]
+
+    def report(self):
+        """Returns the next report message, or None when the coordinator is up to date."""
+        members = self.detector.kinds.members(PROCESS)
+        name = self.detector.store.name
+        processes = [name(node) for node in members[self._listed:]]
+        self._listed = len(members)
+        summary = self.summary()
+        added, removed = summary - self._reported, self._reported - summary
+        if not (processes or added or removed):
+            return None
+        self._reported = summary
+        return {
+            "type": "report",
+            "site": self.name,
+            "processes": processes,
+            "add": [list(edge) for edge in added],
+            "remove": [list(edge) for edge in removed],
+        }
+
+    def _summary_edges(self):
+        detector = self.detector
+        lookup, name = detector.store.lookup, detector.store.name
+        shared = {node for node in map(lookup, self.shared) if node is not None}
+        edges = set()
+        for start in shared:
+            # States are (node, entered by a shared request), as in _blocking_components().
+            stack = [(start, False)]
+            seen = set(stack)
+            while stack:
+                node, shared_entry = stack.pop()
+                for succ, edge in detector.successor_info(node):
+                    if edge.kind == ALLOCATE:
+                        if shared_entry and edge.mode == SHARED:
+                            continue
+                        if succ in shared:
+                            edges.add((name(start), name(succ)))
+                            continue
+                        state = (succ, False)
+                    else:
+                        state = (succ, edge.mode == SHARED)
+                    if state not in seen:
+                        seen.add(state)
+                        stack.append(state)
+        return edges
+
+
+class Coordinator:
+    """
+    Merges site reports into a wait-for graph over shared processes.
+
+    An edge stays in the graph while at least one site reports it. Cycles
+    are maintained incrementally, so a report costs time in proportion to
+    the edges it changes, not to the size of the merged graph.
+    """
+
+    def __init__(self):
+        self._listed_by = {}
+        self._edges = {}
+        self._succ = {}
+        self._pred = {}
+        self._order = DynamicTopologicalOrder(
+            lambda node: self._succ.get(node, ()),
+            lambda node: self._pred.get(node, ())
+        )
+
+    def receive(self, report):
+        """
+        Applies one site report. Returns {site: [process, ...]} listing the
+        processes each site has to learn are shared.
+        """
+        site = report["site"]
+        shared = {}
+        for process in report["processes"]:
+            sites = self._listed_by.setdefault(process, set())
+            if site in sites:
+                continue
+            sites.add(site)
+            if len(sites) == 2:
+                for other in sites:
+                    shared.setdefault(other, []).append(process)
+            elif len(sites) > 2:
+                shared.setdefault(site, []).append(process)
+        for x, y in report["remove"]:
+            self._withdraw(site, x, y)
+        for x, y in report["add"]:
+            reporters = self._edges.setdefault((x, y), set())
+            if not reporters:
+                self._succ.setdefault(x, set()).add(y)
+                self._pred.setdefault(y, set()).add(x)
+                self._order.insert_edge(x, y)
+            reporters.add(site)
+        return shared
+
+    def forget(self, site):
+        """Drops everything a site reported, e.g. once it disconnects."""
+        for (x, y), reporters in list(self._edges.items()):
+            if site in reporters:
+                self._withdraw(site, x, y)
+        for sites in self._listed_by.values():
+            sites.discard(site)
+
+    def shared(self):
+        """Returns the names of the processes listed by more than one site."""
+        return {process for process, sites in self._listed_by.items() if len(sites) > 1}
+
+    def number_of_edges(self):
+        return len(self._edges)
+
+    def deadlocks(self):
+        """Returns a GlobalDeadlock per cycle, with the sites whose summaries form it."""
+        found = []
+        for members in self._order.components():
+            sites = set()
+            for x in members:
+                for y in self._succ.get(x, ()):
+                    if y in members:
+                        sites |= self._edges[(x, y)]
+            found.append(GlobalDeadlock(frozenset(members), frozenset(sites)))
+        return found
+
+    def _withdraw(self, site, x, y):
+        reporters = self._edges.get((x, y))
+        if reporters is None or site not in reporters:
+            return
+        reporters.discard(site)
+        if not reporters:
+            del self._edges[(x, y)]
+            self._succ[x].discard(y)
+            self._pred[y].discard(x)
+            self._order.remove_edge(x, y)
+
+
+class CoordinatorServer:
+    """
+    Serves a Coordinator over TCP and counts the traffic it sees.
+
+    messages_in/bytes_in count site reports, messages_out/bytes_out the
+    shared-process notices sent back; alerts are not counted. detected_at is
+    the time.monotonic() of the last change to the set of deadlocks, which
+    on Linux is comparable across local processes.
+
+    Args:
+        coordinator (Coordinator, optional): Coordinator to serve
+        output (file, optional): Also write every alert here
+    """
+
+    def __init__(self, coordinator=None, output=None):
+        self.coordinator = coordinator or Coordinator()
+        self.output = output
+        self.messages_in = 0
+        self.bytes_in = 0
+        self.messages_out = 0
+        self.bytes_out = 0
+        self.detected_at = None
+        self._sites = {}
+        self._subscribers = set()
+        self._last = frozenset()
+        self._servers = []
+        self._handlers = set()
+
+    async def start(self, host="127.0.0.1", port=7171):
+        self._servers.append(await asyncio.start_server(self._handle, host, port))
+        return self
+
+    @property
+    def sockets(self):
+        return [sock for server in self._servers for sock in server.sockets]
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+        # Handlers close their writers; wait_closed() waits for that on 3.12+.
+        for handler in list(self._handlers):
+            handler.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        for server in self._servers:
+            await server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        site = None
+        try:
+            line = await reader.readline()
+            while line:
+                text = line.decode(errors="replace").strip()
+                if text == "subscribe":
+                    self._subscribers.add(writer)
+                elif text:
+                    self.messages_in += 1
+                    self.bytes_in += len(line)
+                    try:
+                        message = json.loads(text)
+                        if message["type"] == "report":
+                            site = message["site"]
+                            self._sites[site] = writer
+                            self._receive(message)
+                    except (ValueError, KeyError, TypeError):
+                        pass  # malformed reports are dropped, like bad event lines
+                line = await reader.readline()
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            pass  # close() is shutting the connection down
+        finally:
+            self._handlers.discard(handler)
+            self._subscribers.discard(writer)
+            if site is not None and self._sites.get(site) is writer:
+                del self._sites[site]
+                self.coordinator.forget(site)
+                self._notify()
+            writer.close()
+
+    def _receive(self, message):
+        for site, processes in self.coordinator.receive(message).items():
+            writer = self._sites.get(site)
+            if writer is None:
+                continue
+            data = json.dumps({"type": "shared", "processes": processes}).encode() + b"\n"
+            writer.write(data)
+            self.messages_out += 1
+            self.bytes_out += len(data)
+        self._notify()
+
+    def _notify(self):
+        deadlocks = self.coordinator.deadlocks()
+        current = frozenset(deadlock.processes for deadlock in deadlocks)
+        if current == self._last:
+            return
+        self._last = current
+        self.detected_at = time.monotonic()
+        message = json.dumps({
+            "event": "deadlock" if deadlocks else "resolved",
+            "time": time.time(),
+            "deadlocks": [
+                {"processes": sorted(d.processes), "sites": sorted(d.sites)} for d in deadlocks
+            ],
+        }).encode() + b"\n"
+        if self.output is not None:
+            self.output.write(message.decode())
+            self.output.flush()
+        broadcast(self._subscribers, message)
+
+
+class SiteClient:
+    """
+    Keeps a coordinator up to date with a SiteDetector.
+
+    Call sync() after changing the local graph; it sends a report only when
+    something changed. A shared-process notice from the coordinator changes
+    the summary, so it is answered with a sync of its own.
+    """
+
+    def __init__(self, site):
+        self.site = site
+        self.messages_out = 0
+        self.bytes_out = 0
+        self._writer = None
+        self._listener = None
+
+    async def connect(self, host="127.0.0.1", port=7171):
+        reader, self._writer = await asyncio.open_connection(host, port)
+        self.site.restart()
+        self._listener = asyncio.create_task(self._listen(reader))
+        await self.sync()
+        return self
+
+    async def sync(self):
+        message = self.site.report()
+        if message is None:
+            return
+        data = json.dumps(message).encode() + b"\n"
+        self._writer.write(data)
+        self.messages_out += 1
+        self.bytes_out += len(data)
+        await self._writer.drain()
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+
+    async def _listen(self, reader):
+        line = await reader.readline()
+        while line:
+            message = json.loads(line)
+            if message.get("type") == "shared":
+                self.site.share(message["processes"])
+                await self.sync()
+            line = await reader.readline()
+
+
+async def run_coordinator(host, port):
+    server = await CoordinatorServer(output=sys.stdout).start(host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+async def run_site(name, host, port, lines, interval):
+    """Applies event lines to a site, reporting to the coordinator every interval seconds."""
+    site = SiteDetector(name)
+    emitter = AlertEmitter(site.detector, sys.stdout)
+    client = await SiteClient(site).connect(host, port)
+    loop = asyncio.get_running_loop()
+
+    async def report():
+        while True:
+            await asyncio.sleep(interval)
+            await client.sync()
+
+    reporter = asyncio.create_task(report())
+    try:
+        number = 0
+        line = await loop.run_in_executor(None, next, lines, None)
+        while line is not None:
+            number += 1
+            try:
+                event = parse_event(line)
+                if event is not None:
+                    emitter.update(site.detector.apply_events([event])[0])
+            except (ValueError, KeyError) as error:
+                sys.stderr.write(json.dumps({"event": "error", "line": number, "message": str(error)}) + "\n")
+            line = await loop.run_in_executor(None, next, lines, None)
+        await client.sync()
+        await asyncio.Event().wait()  # stay connected so the site's waits stay reported
+    finally:
+        reporter.cancel()
+        await client.close()
+
+
+def _address(text):
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def main(argv=None):
+    import argparse
+    from headless import read_lines
+
+    parser = argparse.ArgumentParser(description="Distributed deadlock detection over TCP.")
+    roles = parser.add_subparsers(dest="role", required=True)
+    coordinator = roles.add_parser("coordinator", help="merge site summaries, print global deadlocks")
+    coordinator.add_argument("--listen", default="127.0.0.1:7171", metavar="HOST:PORT")
+    site = roles.add_parser("site", help="run a local detector and report its summary")
+    site.add_argument("name")
+    site.add_argument("files", nargs="*", help="event files to read ('-' for stdin)")
+    site.add_argument("--coordinator", default="127.0.0.1:7171", metavar="HOST:PORT")
+    site.add_argument("--interval", type=float, default=0.1, metavar="SECONDS",
+                      help="seconds between summary reports (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.role == "coordinator":
+            asyncio.run(run_coordinator(*_address(args.listen)))
+        else:
+            args.listen = args.unix = None
+            lines = read_lines(args)
+            asyncio.run(run_site(args.name, *_address(args.coordinator), lines, args.interval))
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""
+Append-only binary log of detector mutations, with snapshots and replay.
+
+A log at PATH is three kinds of file:
+
+    PATH             fixed-size records: time f8, src u4, dst u4, kind u1, edge u1, mode u1
+    PATH.names       node names, each as a u2 length plus UTF-8 bytes
+    PATH.snap.N.npz  graph edges, their edge kinds, modes and ages after the first N records
+
+Records are edge-level (ADD, REMOVE, MODE) plus CLEAR, so replay reproduces
+the graph exactly whatever API produced the change. The edge field of an
+ADD is REQUEST or ALLOCATE, which tells replay which end is the process;
+the mode field is 0 for exclusive and 1 for shared locks. A MODE record
+changes the lock mode of an edge that already exists, keeping its age.
+"""
+import glob
+import os
+import struct
+import time
+import numpy as np
+from deadlock_detector import (
+    ALLOCATE, EXCLUSIVE, REQUEST, SHARED, DeadlockDetector, EdgeInfo, GraphSnapshot, PROCESS, RESOURCE
+)
+
+ADD, REMOVE, CLEAR, MODE = 0, 1, 2, 3
+MODE_CODES = {EXCLUSIVE: 0, SHARED: 1}
+
+RECORD = np.dtype([
+    ("time", "<f8"),
+    ("src", "<u4"),
+    ("dst", "<u4"),
+    ("kind", "u1"),
+    ("edge", "u1"),
+    ("mode", "u1"),
+    ("pad", "u1"),
+])
+NAME_LENGTH = struct.Struct("<H")
+
+
+class EventLog:
+    """
+    Records every change of attached detectors and answers time-travel queries.
+
+    Args:
+        path (str): Log file; created if missing, appended to otherwise
+        snapshot_every (int): Records between snapshots of the attached graph
+        buffer_size (int): Records kept in memory before they are written
+        clock (callable): Timestamp source
+    """
+
+    def __init__(self, path, snapshot_every=100000, buffer_size=4096, clock=time.time):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.buffer_size = buffer_size
+        self.clock = clock
+        self.detector = None
+        self._names = _read_names(path + ".names")
+        self._ids = {name: i for i, name in enumerate(self._names)}
+        self._records = open(path, "ab")
+        self._names_file = open(path + ".names", "ab")
+        self._buffer = np.zeros(buffer_size, dtype=RECORD)
+        self._buffered = 0
+        self._count = os.path.getsize(path) // RECORD.itemsize
+        self._since_snapshot = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count + self._buffered
+
+    def attach(self, detector):
+        """Logs a detector's changes from now on, starting with a CLEAR and its current edges."""
+        if self.detector is not None:
+            self.detector.unsubscribe(self._on_change)
+        self.detector = detector
+        self.append(CLEAR)
+        for source, target in detector.edges():
+            info = detector.edge_info(source, target)
+            self.append(ADD, source, target, edge=info.kind, mode=MODE_CODES[info.mode])
+        detector.subscribe(self._on_change)
+        if detector.store.number_of_edges():
+            # The ADD records above carry the time of attaching; the snapshot
+            # keeps how long each edge had really existed.
+            self.snapshot()
+
+    def append(self, kind, source=None, target=None, timestamp=None, edge=REQUEST, mode=0):
+        record = self._buffer[self._buffered]
+        record["time"] = self.clock() if timestamp is None else timestamp
+        record["kind"] = kind
+        record["edge"] = edge
+        record["mode"] = mode
+        if kind != CLEAR:
+            record["src"] = self._intern(source)
+            record["dst"] = self._intern(target)
+        self._buffered += 1
+        self._since_snapshot += 1
+        if self._buffered == self.buffer_size:
+            self.flush()
+        if self.detector is not None and self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def append_arrays(self, times, kinds, sources, targets, edges=REQUEST, modes=0):
+        """Bulk-appends records whose node ids are already interned."""
+        self.flush()
+        records = np.zeros(len(times), dtype=RECORD)
+        records["time"], records["kind"] = times, kinds
+        records["src"], records["dst"] = sources, targets
+        records["edge"], records["mode"] = edges, modes
+        self._records.write(records.tobytes())
+        self._count += len(records)
+
+    def intern(self, names):
+        """Returns the ids of node names, registering new ones."""
+        return [self._intern(name) for name in names]
+
+    def snapshot(self):
+        """Writes the attached detector's current edges as a snapshot."""
+        self.flush()
+        graph = self.detector.snapshot()
+        edges = np.array(
+            [(self._intern(u), self._intern(v)) for u, v in graph.edges], dtype=np.uint32
+        ).reshape(-1, 2)
+        kinds = np.array([info.kind for info in graph.info], dtype=np.uint8)
+        modes = np.array([MODE_CODES[info.mode] for info in graph.info], dtype=np.uint8)
+        # Edge ages move from the detector's clock to the log's.
+        now = self.clock()
+        offset = now - self.detector.clock()
+        since = np.array([info.since for info in graph.info], dtype=np.float64) + offset
+        np.savez(
+            f"{self.path}.snap.{self._count}.npz",
+            edges=edges, kinds=kinds, modes=modes, since=since, time=now
+        )
+        self._since_snapshot = 0
+
+    def flush(self):
+        if self._buffered:
+            self._records.write(self._buffer[:self._buffered].tobytes())
+            self._count += self._buffered
+            self._buffered = 0
+        self._names_file.flush()
+        self._records.flush()
+
+    def close(self):
+        self.flush()
+        if self.detector is not None:
+            self.detector.unsubscribe(self._on_change)
+        self._records.close()
+        self._names_file.close()
+
+    def _on_change(self, event, source, target):
+        if event == "add" or event == "mode":
+            info = self.detector.edge_info(source, target)
+            self.append(ADD if event == "add" else MODE, source, target,
+                        edge=info.kind, mode=MODE_CODES[info.mode])
+        elif event == "remove":
+            self.append(REMOVE, source, target)
+
+    def _intern(self, name):
+        node = self._ids.get(name)
+        if node is None:
+            node = self._ids[name] = len(self._names)
+            self._names.append(name)
+            data = str(name).encode("utf-8")
+            self._names_file.write(NAME_LENGTH.pack(len(data)) + data)
+        return node
+
+
+class LogReader:
+    """
+    Memory-maps a log for replay and time-travel queries.
+
+    Replay starts from the newest snapshot at or before the requested point
+    and folds the remaining records with vectorized NumPy operations, so
+    millions of records replay in seconds.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.names = _read_names(path + ".names")
+        size = os.path.getsize(path) // RECORD.itemsize
+        self.records = np.memmap(path, dtype=RECORD, mode="r", shape=(size,)) if size else np.zeros(0, RECORD)
+        self.snapshots = sorted(
+            (int(name.rsplit(".", 2)[-2]), name) for name in glob.glob(path + ".snap.*.npz")
+        )
+
+    def __len__(self):
+        return len(self.records)
+
+    def edges_at(self, timestamp=None, index=None):
+        """
+        Returns the (src, dst) id pairs present after the last record at or
+        before `timestamp`, or after the first `index` records.
+        """
+        return self._fold(timestamp, index)[0]
+
+    def graph_at(self, timestamp=None, index=None):
+        """
+        Returns the graph as a GraphSnapshot of names at a point in time. Edge
+        ages in its info are measured on the log's clock.
+        """
+        edges, edge_kinds, modes, since = self._fold(timestamp, index)
+        names = self.names
+        used = np.unique(edges)
+        # The process end of a request is its source, of an allocation its target.
+        allocation = edge_kinds == ALLOCATE
+        processes = np.where(allocation, edges[:, 1], edges[:, 0])
+        is_process = np.isin(used, processes)
+        return GraphSnapshot(
+            tuple(names[i] for i in used.tolist()),
+            tuple((names[u], names[v]) for u, v in edges.tolist()),
+            tuple(PROCESS if process else RESOURCE for process in is_process.tolist()),
+            tuple(
+                EdgeInfo(added, kind, SHARED if mode else EXCLUSIVE)
+                for added, kind, mode in zip(since.tolist(), edge_kinds.tolist(), modes.tolist())
+            )
+        )
+
+    def detector_at(self, timestamp=None, index=None, incremental=False):
+        """
+        Rebuilds a DeadlockDetector holding the graph at a point in time. Its
+        clock stands still at that time, so wait ages read as they were then.
+        """
+        times = self.records["time"]
+        if index is None and timestamp is None:
+            index = len(times)
+        if timestamp is None:
+            timestamp = float(times[index - 1]) if index else 0.0
+        return DeadlockDetector.from_snapshot(
+            self.graph_at(timestamp, index), incremental=incremental, clock=lambda: timestamp
+        )
+
+    def _fold(self, timestamp, index):
+        """
+        Returns the (src, dst) id pairs at a point in time with their
+        REQUEST/ALLOCATE kinds, mode codes and the times they were added.
+        """
+        times = self.records["time"]
+        if index is None:
+            index = len(times) if timestamp is None else int(np.searchsorted(times, timestamp, "right"))
+        start, edges = 0, np.zeros((0, 2), dtype=np.uint32)
+        edge_kinds = modes = np.zeros(0, dtype=np.uint8)
+        since = np.zeros(0, dtype=np.float64)
+        for position, name in reversed(self.snapshots):
+            if position <= index:
+                with np.load(name) as snapshot:
+                    start, edges = position, snapshot["edges"]
+                    edge_kinds, modes, since = snapshot["kinds"], snapshot["modes"], snapshot["since"]
+                break
+
+        window = self.records[start:index]
+        clears = np.flatnonzero(window["kind"] == CLEAR)
+        if len(clears):
+            window = window[clears[-1] + 1:]
+            edges = np.zeros((0, 2), dtype=np.uint32)
+            edge_kinds = modes = np.zeros(0, dtype=np.uint8)
+            since = np.zeros(0, dtype=np.float64)
+        if not len(window):
+            return edges, edge_kinds, modes, since
+        # Snapshot edges go first as additions; the last record per edge then
+        # decides whether it exists at the end of the window and its mode,
+        # and the last addition when it started.
+        keys = np.concatenate([_keys(edges[:, 0], edges[:, 1]), _keys(window["src"], window["dst"])])
+        kinds = np.concatenate([np.full(len(edges), ADD, dtype=np.uint8), window["kind"]])
+        order = np.argsort(keys, kind="stable")
+        ordered = keys[order]
+        starts = np.flatnonzero(np.concatenate([[True], ordered[1:] != ordered[:-1]]))
+        last = np.maximum.reduceat(order, starts)
+        added = np.maximum.reduceat(np.where(kinds[order] == ADD, order, -1), starts)
+        present = kinds[last] != REMOVE
+        last, added = last[present], added[present]
+        final = keys[last]
+        edges = np.stack([final >> np.uint64(32), final & np.uint64(0xFFFFFFFF)], axis=1).astype(np.uint32)
+        return (
+            edges,
+            np.concatenate([edge_kinds, window["edge"]])[last],
+            np.concatenate([modes, window["mode"]])[last],
+            np.concatenate([since, window["time"]])[added],
+        )
+
+
+def _keys(sources, targets):
+    return sources.astype(np.uint64) << np.uint64(32) | targets.astype(np.uint64)
+
+
+def _read_names(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as file:
+        data = file.read()
+    names = []
+    offset = 0
+    while offset < len(data):
+        (length,) = NAME_LENGTH.unpack_from(data, offset)
+        offset += NAME_LENGTH.size
+        names.append(data[offset:offset + length].decode("utf-8"))
+        offset += length
+    return names
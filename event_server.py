@@ -0,0 +1,252 @@
+"""
+Asyncio server that collects edge events from many clients into one detector.
+
+Clients send newline-delimited events (text or JSON, as read by headless.py)
+or, after sending the single byte 0x00, length-prefixed binary frames:
+
+    uint32 length | uint8 kind | uint16 src length | src | dst   (big-endian)
+
+with kind 0/1/2/3 for request/allocate/release/remove in graph orientation,
+plus SHARED_BIT (0x80) for a shared lock. Frames longer than MAX_FRAME_SIZE
+and lines longer than the stream limit (64 KiB) are rejected; an oversized
+frame also ends its connection. A client sending the line "subscribe"
+receives a JSON line whenever the set of deadlocks changes.
+"""
+import asyncio
+import json
+import struct
+from deadlock_detector import EVENT_KINDS, EXCLUSIVE, SHARED, DeadlockDetector
+from headless import parse_event
+
+BINARY_MAGIC = b"\x00"
+SUBSCRIBER_BUFFER_LIMIT = 1 << 20
+MAX_FRAME_SIZE = 1 << 16
+SHARED_BIT = 0x80
+FRAME_HEADER = struct.Struct(">I")
+EVENT_HEADER = struct.Struct(">BH")
+
+
+def encode_frame(src, dst, kind, mode=EXCLUSIVE):
+    """Encodes one event as a length-prefixed binary frame."""
+    src, dst = src.encode(), dst.encode()
+    code = EVENT_KINDS[kind] | (SHARED_BIT if mode == SHARED else 0)
+    body = EVENT_HEADER.pack(code, len(src)) + src + dst
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def decode_frame(body):
+    """Decodes a frame body into a (src, dst, kind, mode) event. Raises ValueError if malformed."""
+    start = EVENT_HEADER.size
+    if len(body) < start:
+        raise ValueError(f"Frame of {len(body)} bytes is shorter than its header")
+    code, src_length = EVENT_HEADER.unpack_from(body)
+    if start + src_length > len(body):
+        raise ValueError(f"Source of {src_length} bytes overruns a {len(body)}-byte frame")
+    src = body[start:start + src_length].decode()
+    dst = body[start + src_length:].decode()
+    return src, dst, code & ~SHARED_BIT, SHARED if code & SHARED_BIT else EXCLUSIVE
+
+
+def broadcast(subscribers, message):
+    """
+    Writes message to every subscriber in the set. Subscribers that stop
+    reading are dropped rather than buffered forever.
+    """
+    for writer in list(subscribers):
+        if writer.transport.get_write_buffer_size() > SUBSCRIBER_BUFFER_LIMIT:
+            subscribers.discard(writer)
+            writer.close()
+        else:
+            writer.write(message)
+
+
+class DeadlockServer:
+    """
+    Wraps a DeadlockDetector behind a TCP and/or Unix socket.
+
+    Events from all connections go through one bounded queue; when it is full,
+    readers stop reading their sockets, so backpressure reaches the clients
+    through TCP flow control. A single batcher drains the queue, coalescing up
+    to max_batch events, and runs each batch through apply_valid_events() in a
+    worker thread so the event loop keeps serving connections. An invalid
+    event, such as a node named in the wrong role, is skipped on its own:
+    rejected events are counted in events_rejected, and the latest is kept
+    with its error in last_rejected. Lines and frames that do not parse are
+    counted there too.
+
+    Args:
+        detector (DeadlockDetector, optional): Detector to feed
+        max_batch (int): Largest batch applied in one detection pass
+        max_pending (int): Queue size at which readers are paused
+        backlog (int): Listen backlog, sized for bursts of connecting clients
+    """
+
+    def __init__(self, detector=None, max_batch=10000, max_pending=100000, backlog=4096):
+        self.detector = detector or DeadlockDetector(incremental=True)
+        self.max_batch = max_batch
+        self.backlog = backlog
+        self.events_applied = 0
+        self.batches_applied = 0
+        self.events_rejected = 0
+        self.last_rejected = None
+        self._queue = asyncio.Queue(max_pending)
+        self._subscribers = set()
+        self._last = frozenset()
+        self._servers = []
+        self._handlers = set()
+        self._batcher = None
+
+    async def start(self, host=None, port=None, path=None):
+        """Starts listening on host:port and/or a Unix socket path."""
+        if self._batcher is None:
+            self._batcher = asyncio.create_task(self._run_batches())
+        if port is not None:
+            self._servers.append(await asyncio.start_server(
+                self._handle, host, port, backlog=self.backlog
+            ))
+        if path is not None:
+            self._servers.append(await asyncio.start_unix_server(
+                self._handle, path, backlog=self.backlog
+            ))
+        return self
+
+    @property
+    def sockets(self):
+        return [sock for server in self._servers for sock in server.sockets]
+
+    async def close(self):
+        """Stops listening, drops every connection and applies the queued events."""
+        for server in self._servers:
+            server.close()
+        # Since Python 3.12 wait_closed() also waits for open connections, so
+        # the handlers, which close their writers, have to go first.
+        for handler in list(self._handlers):
+            handler.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._batcher is not None:
+            await self._queue.join()
+            self._batcher.cancel()
+        for server in self._servers:
+            await server.wait_closed()
+
+    async def drain(self):
+        """Waits until every queued event has been applied."""
+        await self._queue.join()
+
+    async def _handle(self, reader, writer):
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            first = await reader.read(1)
+            if first == BINARY_MAGIC:
+                await self._read_frames(reader)
+            elif first:
+                await self._read_lines(reader, writer, first)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # close() is shutting the connection down
+        finally:
+            self._handlers.discard(handler)
+            self._subscribers.discard(writer)
+            writer.close()
+
+    async def _read_lines(self, reader, writer, first):
+        line = first
+        while True:
+            try:
+                line += await reader.readline()
+            except ValueError:
+                # Over the stream limit; readline() has discarded it.
+                self.events_rejected += 1
+                line = b""
+                continue
+            if not line:
+                return
+            text = line.decode(errors="replace").strip()
+            line = b""
+            if text == "subscribe":
+                self._subscribers.add(writer)
+                continue
+            try:
+                event = parse_event(text)
+            except (ValueError, KeyError, TypeError):
+                self.events_rejected += 1
+                continue
+            if event is not None:
+                await self._queue.put(event)
+
+    async def _read_frames(self, reader):
+        while True:
+            try:
+                header = await reader.readexactly(FRAME_HEADER.size)
+            except asyncio.IncompleteReadError:
+                return
+            (length,) = FRAME_HEADER.unpack(header)
+            if length > MAX_FRAME_SIZE:
+                # The stream cannot be trusted past a bogus length.
+                self.events_rejected += 1
+                return
+            try:
+                event = decode_frame(await reader.readexactly(length))
+            except ValueError:
+                self.events_rejected += 1
+                continue
+            await self._queue.put(event)
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                deadlocks, rejected = await loop.run_in_executor(None, self._apply, batch)
+                self.events_applied += len(batch) - len(rejected)
+                self.batches_applied += 1
+                if rejected:
+                    self.events_rejected += len(rejected)
+                    _, event, error = rejected[-1]
+                    self.last_rejected = (event, error)
+                self._notify(deadlocks)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _apply(self, batch):
+        (deadlocked, _), rejected = self.detector.apply_valid_events(batch, errors=Exception)
+        return self.detector.find_deadlocks() if deadlocked else [], rejected
+
+    def _notify(self, deadlocks):
+        current = frozenset(frozenset(d.processes | d.resources) for d in deadlocks)
+        if current == self._last:
+            return
+        self._last = current
+        message = json.dumps({
+            "event": "deadlock" if deadlocks else "resolved",
+            "deadlocks": [
+                {"processes": sorted(d.processes), "resources": sorted(d.resources)}
+                for d in deadlocks
+            ],
+        }).encode() + b"\n"
+        broadcast(self._subscribers, message)
+
+
+async def serve(host="127.0.0.1", port=7070, path=None):
+    server = await DeadlockServer().start(host, port, path)
+    await asyncio.Event().wait()
+    await server.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Deadlock event ingestion server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7070)
+    parser.add_argument("--unix", metavar="PATH")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,243 @@
+from array import array
+from itertools import repeat
+
+
+class CompactGraph:
+    """
+    Directed graph that interns node names to integer ids and keeps adjacency
+    in per-node integer arrays, a fraction of the size of an nx.DiGraph.
+
+    Node ids are dense (0..n-1) and never reused, so they can index arrays.
+    Every edge also carries a timestamp and a flags byte, kept in arrays
+    parallel to its source's successor array and swap-removed with it. The
+    flags array of a node only exists once one of its edges has flags set.
+    """
+    __slots__ = ("_ids", "_names", "_succ", "_pred", "_since", "_flags", "_edge_count")
+    dense_ids = True
+
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+        self._succ = []
+        self._pred = []
+        self._since = []
+        self._flags = []
+        self._edge_count = 0
+
+    def node_id(self, name):
+        """Returns the id of a node, adding the node if it is new."""
+        node = self._ids.get(name)
+        if node is None:
+            node = self._ids[name] = len(self._names)
+            self._names.append(name)
+            self._succ.append(None)
+            self._pred.append(None)
+            self._since.append(None)
+            self._flags.append(None)
+        return node
+
+    def lookup(self, name):
+        """Returns the id of an existing node, or None."""
+        return self._ids.get(name)
+
+    def name(self, node):
+        return self._names[node]
+
+    def add_edge(self, u, v, since=0.0, flags=0):
+        """Adds edge u -> v with its data. Returns False if it was already present."""
+        succ = self._succ[u]
+        if succ is None:
+            succ = self._succ[u] = array("i")
+            self._since[u] = array("d")
+        elif v in succ:
+            return False
+        succ.append(v)
+        self._since[u].append(since)
+        node_flags = self._flags[u]
+        if node_flags is not None:
+            node_flags.append(flags)
+        elif flags:
+            node_flags = self._flags[u] = bytearray(len(succ))
+            node_flags[-1] = flags
+        pred = self._pred[v]
+        if pred is None:
+            pred = self._pred[v] = array("i")
+        pred.append(u)
+        self._edge_count += 1
+        return True
+
+    def remove_edge(self, u, v):
+        """Removes edge u -> v. Returns False if it was not present."""
+        succ = self._succ[u]
+        if not succ or v not in succ:
+            return False
+        index = succ.index(v)
+        _swap_remove_at(succ, index)
+        _swap_remove_at(self._since[u], index)
+        if self._flags[u] is not None:
+            _swap_remove_at(self._flags[u], index)
+        _swap_remove_at(self._pred[v], self._pred[v].index(u))
+        self._edge_count -= 1
+        return True
+
+    def has_edge(self, u, v):
+        succ = self._succ[u]
+        return succ is not None and v in succ
+
+    def edge_data(self, u, v):
+        """Returns (since, flags) of edge u -> v, or None if it does not exist."""
+        succ = self._succ[u]
+        if not succ:
+            return None
+        try:
+            index = succ.index(v)
+        except ValueError:
+            return None
+        node_flags = self._flags[u]
+        return self._since[u][index], 0 if node_flags is None else node_flags[index]
+
+    def set_edge_data(self, u, v, since, flags):
+        succ = self._succ[u]
+        index = succ.index(v)
+        self._since[u][index] = since
+        if self._flags[u] is None:
+            if not flags:
+                return
+            self._flags[u] = bytearray(len(succ))
+        self._flags[u][index] = flags
+
+    def successors(self, node):
+        return self._succ[node] or ()
+
+    def successor_data(self, node):
+        """Yields (successor, since, flags) for every edge out of a node."""
+        succ = self._succ[node]
+        if not succ:
+            return ()
+        return zip(succ, self._since[node], self._flags[node] or repeat(0))
+
+    def predecessors(self, node):
+        return self._pred[node] or ()
+
+    def nodes(self):
+        return range(len(self._names))
+
+    def edges(self):
+        for u, succ in enumerate(self._succ):
+            if succ:
+                for v in succ:
+                    yield u, v
+
+    def number_of_nodes(self):
+        return len(self._names)
+
+    def number_of_edges(self):
+        return self._edge_count
+
+    def to_csr(self):
+        """Returns (indptr, indices) arrays describing the successor lists."""
+        indptr = array("q", [0])
+        indices = array("i")
+        for succ in self._succ:
+            if succ:
+                indices.extend(succ)
+            indptr.append(len(indices))
+        return indptr, indices
+
+    def to_networkx(self):
+        """Builds an equivalent nx.DiGraph keyed by node name."""
+        import networkx as nx
+
+        graph = nx.DiGraph()
+        names = self._names
+        graph.add_nodes_from(names)
+        graph.add_edges_from((names[u], names[v]) for u, v in self.edges())
+        return graph
+
+
+class NetworkXGraph:
+    """Backend over a plain nx.DiGraph; node names double as node ids."""
+    __slots__ = ("graph",)
+    dense_ids = False
+
+    def __init__(self):
+        import networkx as nx
+
+        self.graph = nx.DiGraph()
+
+    def node_id(self, name):
+        if name not in self.graph:
+            self.graph.add_node(name)
+        return name
+
+    def lookup(self, name):
+        return name if name in self.graph else None
+
+    def name(self, node):
+        return node
+
+    def add_edge(self, u, v, since=0.0, flags=0):
+        if self.graph.has_edge(u, v):
+            return False
+        self.graph.add_edge(u, v, since=since, flags=flags)
+        return True
+
+    def remove_edge(self, u, v):
+        if not self.graph.has_edge(u, v):
+            return False
+        self.graph.remove_edge(u, v)
+        return True
+
+    def has_edge(self, u, v):
+        return self.graph.has_edge(u, v)
+
+    def edge_data(self, u, v):
+        data = self.graph.succ[u].get(v)
+        return None if data is None else (data["since"], data["flags"])
+
+    def set_edge_data(self, u, v, since, flags):
+        self.graph.succ[u][v].update(since=since, flags=flags)
+
+    def successors(self, node):
+        return self.graph.succ[node]
+
+    def successor_data(self, node):
+        return ((succ, data["since"], data["flags"]) for succ, data in self.graph.succ[node].items())
+
+    def predecessors(self, node):
+        return self.graph.pred[node]
+
+    def nodes(self):
+        return self.graph.nodes()
+
+    def edges(self):
+        return self.graph.edges()
+
+    def number_of_nodes(self):
+        return self.graph.number_of_nodes()
+
+    def number_of_edges(self):
+        return self.graph.number_of_edges()
+
+    def to_networkx(self):
+        return self.graph
+
+
+BACKENDS = {
+    "compact": CompactGraph,
+    "networkx": NetworkXGraph,
+}
+
+
+def create_backend(name):
+    """Instantiates a graph backend by name ("compact" or "networkx")."""
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown graph backend: {name}") from None
+
+
+def _swap_remove_at(values, index):
+    last = values.pop()
+    if index < len(values):
+        values[index] = last
@@ -1,18 +1,90 @@
-from pyvis.network import Network
-import networkx as nx
 import webbrowser
 import os
 import tempfile
 from datetime import datetime
 
-def visualize_graph(graph, deadlocked_nodes=None):
+# Custom CSS for better appearance
+CUSTOM_CSS = """
+<style>
+    body { 
+        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+        margin: 0;
+        padding: 0;
+        background-color: #2E3440;
+        color: #ECEFF4;
+    }
+    #mynetwork {
+        border: 1px solid #4C566A;
+        border-radius: 8px;
+        box-shadow: 0 4px 12px rgba(0,0,0,0.5);
+    }
+    .header {
+        padding: 10px 20px;
+        background-color: #3B4252;
+        border-bottom: 1px solid #4C566A;
+        margin-bottom: 20px;
+    }
+    .container {
+        max-width: 1200px;
+        margin: 0 auto;
+        padding: 20px;
+    }
+    .legend {
+        background-color: #3B4252;
+        padding: 15px;
+        border-radius: 8px;
+        margin-top: 20px;
+        display: flex;
+        flex-wrap: wrap;
+        gap: 15px;
+    }
+    .legend-item {
+        display: flex;
+        align-items: center;
+        margin-right: 15px;
+    }
+    .legend-color {
+        width: 20px;
+        height: 20px;
+        margin-right: 8px;
+        border-radius: 4px;
+    }
+    h1, h2 {
+        color: #88C0D0;
+    }
+    .info-box {
+        background-color: #3B4252;
+        padding: 15px;
+        border-radius: 8px;
+        margin-top: 20px;
+    }
+</style>
+"""
+
+# Graphs with more nodes than this are drawn with render_large_graph()
+LARGE_GRAPH_THRESHOLD = 2000
+
+def visualize_graph(graph, deadlocked_nodes=None, large=None):
     """
     Displays interactive dependency graph with deadlock detection and enhanced visuals.
     
     Args:
-        graph (nx.DiGraph): NetworkX directed graph of processes and resources
+        graph (nx.DiGraph): NetworkX directed graph of processes and resources,
+            nodes tagged with a "kind" attribute as DeadlockDetector.graph does
+            (untagged nodes are drawn as resources)
         deadlocked_nodes (set, optional): Set of nodes involved in deadlock
+        large (bool, optional): Force the large-graph renderer on or off;
+            by default it is used above LARGE_GRAPH_THRESHOLD nodes
     """
+    if large is None:
+        large = graph.number_of_nodes() > LARGE_GRAPH_THRESHOLD
+    if large:
+        nodes = list(graph.nodes(data="kind"))
+        return render_large_graph([node for node, _ in nodes], list(graph.edges()), deadlocked_nodes,
+                                  processes=[node for node, kind in nodes if kind == "process"])
+
+    from pyvis.network import Network
+
     # Create a PyVis network with improved styling
     net = Network(
         height="800px", 
@@ -51,14 +123,15 @@ def visualize_graph(graph, deadlocked_nodes=None):
     """)
     
     # Add nodes with styled appearance
-    for node in graph.nodes():
+    for node, kind in graph.nodes(data="kind"):
+        is_process = kind == "process"
         # Set node attributes based on type and deadlock status
         if deadlocked_nodes and node in deadlocked_nodes:
             color = "#BF616A"  # Red for deadlocked nodes
             border_color = "#D08770"
             size = 30
             title = f"{node} (DEADLOCKED)"
-        elif node.startswith("P"):
+        elif is_process:
             color = "#5E81AC"  # Blue for processes
             border_color = "#81A1C1"
             size = 25
@@ -77,13 +150,14 @@ def visualize_graph(graph, deadlocked_nodes=None):
             border_color=border_color,
             size=size,
             title=title,
-            shape="dot" if node.startswith("P") else "square"
+            shape="dot" if is_process else "square"
         )
     
     # Add edges with styling
+    kinds = graph.nodes
     for source, target in graph.edges():
         # Determine edge type and style accordingly
-        if source.startswith("P") and target.startswith("R"):
+        if kinds[source].get("kind") == "process":
             # Request edge (Process → Resource)
             color = "#EBCB8B"  # Yellow
             title = f"Request: {source} → {target}"
@@ -124,66 +198,9 @@ def visualize_graph(graph, deadlocked_nodes=None):
     with open(output_file, 'r', encoding='utf-8') as file:
         content = file.read()
     
-    # Add custom CSS for better appearance
-    custom_css = """
-    <style>
-        body { 
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 0;
-            background-color: #2E3440;
-            color: #ECEFF4;
-        }
-        #mynetwork {
-            border: 1px solid #4C566A;
-            border-radius: 8px;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.5);
-        }
-        .header {
-            padding: 10px 20px;
-            background-color: #3B4252;
-            border-bottom: 1px solid #4C566A;
-            margin-bottom: 20px;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 20px;
-        }
-        .legend {
-            background-color: #3B4252;
-            padding: 15px;
-            border-radius: 8px;
-            margin-top: 20px;
-            display: flex;
-            flex-wrap: wrap;
-            gap: 15px;
-        }
-        .legend-item {
-            display: flex;
-            align-items: center;
-            margin-right: 15px;
-        }
-        .legend-color {
-            width: 20px;
-            height: 20px;
-            margin-right: 8px;
-            border-radius: 4px;
-        }
-        h1, h2 {
-            color: #88C0D0;
-        }
-        .info-box {
-            background-color: #3B4252;
-            padding: 15px;
-            border-radius: 8px;
-            margin-top: 20px;
-        }
-    </style>
-    """
     
     # Replace closing head tag with our custom CSS
-    content = content.replace('</head>', f'{custom_css}</head>')
+    content = content.replace('</head>', f'{CUSTOM_CSS}</head>')
     
     # Write the modified content back to the file
     with open(output_file, 'w', encoding='utf-8') as file:
@@ -193,3 +210,260 @@ def visualize_graph(graph, deadlocked_nodes=None):
     webbrowser.open('file://' + os.path.abspath(output_file))
     
     return output_file
+
+
+# Above this many visible nodes the layout falls back from forces to a spiral
+MAX_FORCE_LAYOUT_NODES = 1500
+
+NODE_STYLES = {
+    "process": {"color": "#5E81AC", "border": "#81A1C1", "shape": "dot", "size": 25},
+    "resource": {"color": "#A3BE8C", "border": "#B8C88A", "shape": "square", "size": 25},
+    "deadlocked": {"color": "#BF616A", "border": "#D08770", "size": 30},
+    "aggregate": {"color": "#4C566A", "border": "#D8DEE9", "shape": "hexagon"},
+}
+# NODE_STYLES key of a node, indexed by whether it is a process
+KINDS = ("resource", "process")
+
+def render_large_graph(nodes, edges, deadlocked_nodes=None, output_file=None,
+                       open_browser=True, max_aggregates=200, processes=()):
+    """
+    Renders graphs with tens of thousands of nodes as a static, physics-free page.
+
+    Only deadlocked components and their direct neighbours are drawn node by
+    node. Everything else is collapsed into one aggregate node per weakly
+    connected region (the smallest regions share an "other" aggregate);
+    double-clicking an aggregate expands it in place. Positions are computed
+    here with NumPy and the page is written in a single streamed pass.
+
+    Args:
+        nodes (list): Node names
+        edges (list): (source, target) pairs
+        deadlocked_nodes (set, optional): Nodes to highlight; computed from
+            the strongly connected components when omitted
+        output_file (str, optional): Where to write the HTML
+        open_browser (bool): Open the result in the browser
+        max_aggregates (int): Most aggregate nodes drawn
+        processes (iterable): Nodes drawn as processes; the rest are resources
+
+    Returns:
+        str: Path of the written HTML file
+    """
+    import json
+    import numpy as np
+    from scc import cyclic_components
+
+    index = {node: i for i, node in enumerate(nodes)}
+    count = len(nodes)
+    src = np.fromiter((index[u] for u, _ in edges), dtype=np.int64, count=len(edges))
+    dst = np.fromiter((index[v] for _, v in edges), dtype=np.int64, count=len(edges))
+
+    deadlocked = np.zeros(count, dtype=bool)
+    if deadlocked_nodes is None:
+        successors = [[] for _ in range(count)]
+        for u, v in zip(src.tolist(), dst.tolist()):
+            successors[u].append(v)
+        for component in cyclic_components(range(count), successors.__getitem__):
+            deadlocked[component] = True
+    else:
+        deadlocked[[index[node] for node in deadlocked_nodes if node in index]] = True
+    is_process = np.zeros(count, dtype=bool)
+    is_process[[index[node] for node in processes if node in index]] = True
+
+    # Deadlocked nodes plus their direct neighbours are drawn individually.
+    focus = deadlocked.copy()
+    touching = deadlocked[src] | deadlocked[dst]
+    focus[src[touching]] = True
+    focus[dst[touching]] = True
+
+    region = _weak_components(count, src, dst, ~focus)
+    group_of, groups = _bucket_regions(region, ~focus, max_aggregates)
+
+    visible = np.flatnonzero(focus)
+    slot = np.full(count, -1, dtype=np.int64)
+    slot[visible] = np.arange(len(visible))
+    group_slot = len(visible) + np.arange(len(groups))
+
+    # Visible edges: focus-focus edges as they are, focus-region edges merged per aggregate.
+    a = np.where(focus[src], slot[src], group_slot[group_of[src]] if len(groups) else -1)
+    b = np.where(focus[dst], slot[dst], group_slot[group_of[dst]] if len(groups) else -1)
+    keep = focus[src] | focus[dst]
+    pairs, weights = np.unique(np.stack([a[keep], b[keep]], axis=1), axis=0, return_counts=True)
+
+    positions = _layout(len(visible) + len(groups), pairs, np.array([len(g) for g in groups]))
+    names = [str(node) for node in nodes]
+
+    def node_record(i, x, y):
+        process = int(is_process[i])
+        return [names[i], "deadlocked" if deadlocked[i] else KINDS[process],
+                round(float(x), 1), round(float(y), 1), process]
+
+    visible_nodes = [node_record(i, *positions[k]) for k, i in enumerate(visible.tolist())]
+    # Each edge touching a region belongs to that region's expansion.
+    edge_group = np.where(~focus[src], group_of[src], np.where(~focus[dst], group_of[dst], -1))
+    order = np.argsort(edge_group, kind="stable")
+    bounds = np.searchsorted(edge_group[order], np.arange(len(groups) + 1))
+    aggregates = []
+    expansions = {}
+    for k, members in enumerate(groups):
+        gx, gy = positions[len(visible) + k]
+        group_id = f"group:{k}"
+        process_count = int(is_process[members].sum())
+        aggregates.append([group_id, len(members), process_count, round(float(gx), 1), round(float(gy), 1)])
+        spiral = _spiral(len(members), spacing=40) + (gx, gy)
+        incident = order[bounds[k]:bounds[k + 1]]
+        expansions[group_id] = {
+            "nodes": [node_record(i, *spiral[j]) for j, i in enumerate(members)],
+            "edges": [[names[u], names[v]] for u, v in zip(src[incident].tolist(), dst[incident].tolist())],
+        }
+    labels = [r[0] for r in visible_nodes] + [g[0] for g in aggregates]
+    visible_edges = [
+        [labels[u], labels[v], int(w)] for (u, v), w in zip(pairs.tolist(), weights.tolist())
+    ]
+
+    if output_file is None:
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        output_file = os.path.join(tempfile.gettempdir(), f"resource_graph_{timestamp}_large.html")
+    heading = f"Resource Allocation Graph Analysis - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    summary = (f"{count} nodes, {len(edges)} edges, {int(deadlocked.sum())} deadlocked; "
+               f"{len(aggregates)} aggregates (double-click to expand)")
+    with open(output_file, "w", encoding="utf-8") as file:
+        file.write(_LARGE_PAGE_HEAD.format(css=CUSTOM_CSS, heading=heading, summary=summary))
+        for name, value in (("styles", NODE_STYLES), ("visibleNodes", visible_nodes),
+                            ("aggregates", aggregates), ("visibleEdges", visible_edges),
+                            ("expansions", expansions)):
+            file.write(f"const {name} = ")
+            json.dump(value, file, separators=(",", ":"))
+            file.write(";\n")
+        file.write(_LARGE_PAGE_TAIL)
+
+    if open_browser:
+        webbrowser.open('file://' + os.path.abspath(output_file))
+    return output_file
+
+def _weak_components(count, src, dst, mask):
+    """Labels the weakly connected components of the subgraph induced by mask (union-find)."""
+    parent = list(range(count))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    inside = mask[src] & mask[dst]
+    for u, v in zip(src[inside].tolist(), dst[inside].tolist()):
+        ru, rv = find(u), find(v)
+        if ru != rv:
+            parent[ru] = rv
+    return [find(x) for x in range(count)]
+
+def _bucket_regions(region, mask, max_aggregates):
+    """Groups masked nodes by region, folding the smallest regions into one bucket."""
+    import numpy as np
+
+    members = {}
+    for node in np.flatnonzero(mask).tolist():
+        members.setdefault(region[node], []).append(node)
+    regions = sorted(members.values(), key=len, reverse=True)
+    if len(regions) > max_aggregates:
+        tail = [node for group in regions[max_aggregates - 1:] for node in group]
+        regions = regions[:max_aggregates - 1] + [tail]
+    group_of = np.zeros(len(region), dtype=np.int64)
+    for k, group in enumerate(regions):
+        group_of[group] = k
+    return group_of, regions
+
+def _spiral(count, spacing):
+    """Evenly spread points on a sunflower spiral, vectorized."""
+    import numpy as np
+
+    i = np.arange(count) + 0.5
+    radius = spacing * np.sqrt(i)
+    angle = i * np.pi * (3 - np.sqrt(5))
+    return np.stack([radius * np.cos(angle), radius * np.sin(angle)], axis=1)
+
+def _layout(count, pairs, aggregate_sizes, iterations=60, seed=0):
+    """Fruchterman-Reingold layout over the visible graph, fully vectorized with NumPy."""
+    import numpy as np
+
+    if count == 0:
+        return np.zeros((0, 2))
+    if count > MAX_FORCE_LAYOUT_NODES:
+        return _spiral(count, spacing=80)
+    rng = np.random.default_rng(seed)
+    k = 120.0
+    pos = rng.uniform(-1, 1, size=(count, 2)) * k * np.sqrt(count)
+    radius = np.full(count, k)
+    radius[count - len(aggregate_sizes):] += 10 * np.sqrt(aggregate_sizes)
+    u, v = (pairs[:, 0], pairs[:, 1]) if len(pairs) else (np.zeros(0, int), np.zeros(0, int))
+    temperature = k * np.sqrt(count)
+    for _ in range(iterations):
+        delta = pos[:, None, :] - pos[None, :, :]
+        distance = np.maximum(np.linalg.norm(delta, axis=2), 1.0)
+        repulsion = (radius[:, None] * radius[None, :]) / distance ** 2
+        force = (delta * repulsion[:, :, None]).sum(axis=1)
+        pull = pos[u] - pos[v]
+        length = np.maximum(np.linalg.norm(pull, axis=1), 1.0)
+        pull *= (length / k)[:, None]
+        np.add.at(force, u, -pull)
+        np.add.at(force, v, pull)
+        force -= pos * 0.05  # gravity keeps disconnected pieces on screen
+        step = np.maximum(np.linalg.norm(force, axis=1), 1e-9)
+        pos += force / step[:, None] * np.minimum(step, temperature)[:, None]
+        temperature *= 0.92
+    return pos - pos.mean(axis=0)
+
+_LARGE_PAGE_HEAD = """<html>
+<head>
+<meta charset="utf-8">
+<title>{heading}</title>
+<script src="https://unpkg.com/vis-network@9.1.2/standalone/umd/vis-network.min.js"></script>
+{css}</head>
+<body>
+<div class="header"><h2>{heading}</h2><div>{summary}</div></div>
+<div id="mynetwork" style="height: 800px; width: 100%;"></div>
+<script>
+"""
+
+_LARGE_PAGE_TAIL = """
+const processIds = new Set();
+function styleNode([id, kind, x, y, process]) {
+    const style = styles[kind] || styles.resource;
+    const shape = style.shape || (process ? "dot" : "square");
+    if (process) processIds.add(id);
+    return {id: id, label: id, x: x, y: y, shape: shape, size: style.size,
+            color: {background: style.color, border: style.border},
+            title: kind === "deadlocked" ? id + " (DEADLOCKED)" : id};
+}
+function styleEdge([from, to, weight]) {
+    const request = processIds.has(from);
+    return {from: from, to: to, arrows: "to", width: weight ? Math.min(1 + Math.log2(weight), 8) : 2,
+            color: request ? "#EBCB8B" : "#88C0D0",
+            title: weight > 1 ? weight + " edges" : (request ? "Request" : "Allocation")};
+}
+const nodes = new vis.DataSet(visibleNodes.map(styleNode));
+nodes.add(aggregates.map(([id, size, processes, x, y]) => ({
+    id: id, x: x, y: y, shape: styles.aggregate.shape, size: 20 + 4 * Math.sqrt(size),
+    color: {background: styles.aggregate.color, border: styles.aggregate.border},
+    label: size + " nodes", title: processes + " processes, " + (size - processes) + " resources"
+})));
+const edges = new vis.DataSet(visibleEdges.map(styleEdge));
+const network = new vis.Network(document.getElementById("mynetwork"), {nodes: nodes, edges: edges}, {
+    physics: {enabled: false},
+    edges: {smooth: false},
+    interaction: {hover: true, navigationButtons: true, keyboard: true, hideEdgesOnDrag: true}
+});
+network.on("doubleClick", (params) => {
+    const id = params.nodes[0];
+    const group = expansions[id];
+    if (!group) return;
+    delete expansions[id];
+    edges.remove(network.getConnectedEdges(id));
+    nodes.remove(id);
+    nodes.add(group.nodes.map(styleNode));
+    edges.add(group.edges.map(styleEdge));
+});
+</script>
+</body>
+</html>
+"""
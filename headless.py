@@ -0,0 +1,286 @@
+"""
+Headless deadlock detection: reads edge events, emits JSON alerts.
+
+    python -m deadlock_detector [FILE ...] [--listen HOST:PORT | --unix PATH]
+
+Each input line is either text, "<kind> <process> <resource> [mode]", or
+JSON, {"kind": ..., "process": ..., "resource": ..., "mode": ...}, with kind
+one of request, allocate or release and the optional mode shared or
+exclusive. Alerts go to stdout, one JSON object per line.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from queue import Empty, Queue
+from deadlock_detector import EXCLUSIVE, LOCK_MODES, DeadlockDetector
+
+KINDS = ("request", "allocate", "release")
+
+
+def parse_event(line):
+    """
+    Turns one input line into a (src, dst, kind, mode) event, or None for
+    blank lines. The lock mode is optional and defaults to exclusive.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        record = json.loads(line)
+        kind, process, resource = record["kind"], record["process"], record["resource"]
+        mode = record.get("mode", EXCLUSIVE)
+    else:
+        fields = line.split()
+        if len(fields) not in (3, 4):
+            raise ValueError(f"Expected '<kind> <process> <resource> [mode]': {line!r}")
+        kind, process, resource = fields[:3]
+        mode = fields[3] if len(fields) == 4 else EXCLUSIVE
+    if kind not in KINDS:
+        raise ValueError(f"Unknown event kind: {kind!r}")
+    if mode not in LOCK_MODES:
+        raise ValueError(f"Unknown lock mode: {mode!r}")
+    if kind == "allocate":
+        return resource, process, kind, mode
+    return process, resource, kind, mode
+
+
+def read_lines(args):
+    """Yields input lines from the configured files, stdin or socket."""
+    if args.listen or args.unix:
+        yield from _socket_lines(args)
+        return
+    for path in args.files or ["-"]:
+        if path == "-":
+            yield from sys.stdin
+        else:
+            with open(path, encoding="utf-8") as file:
+                yield from file
+
+
+def _socket_lines(args):
+    import socket
+
+    if args.unix:
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(args.unix)
+    else:
+        host, _, port = args.listen.rpartition(":")
+        server = socket.create_server((host or "127.0.0.1", int(port)))
+    with server:
+        server.listen()
+        while True:
+            connection, _ = server.accept()
+            with connection, connection.makefile("r", encoding="utf-8") as stream:
+                yield from stream
+
+
+class AlertEmitter:
+    """
+    Writes a JSON alert whenever the set of deadlocks changes.
+
+    With a WaitAgeScheduler, deadlocks come from its poll() instead, so only
+    waits older than its threshold are reported.
+    """
+
+    def __init__(self, detector, output, scheduler=None):
+        self.detector = detector
+        self.output = output
+        self.scheduler = scheduler
+        self._last = frozenset()
+
+    def update(self, deadlocked):
+        if self.scheduler is not None:
+            deadlocks = self.scheduler.poll()
+        else:
+            deadlocks = self.detector.find_deadlocks() if deadlocked else []
+        current = frozenset(
+            frozenset(deadlock.processes | deadlock.resources) for deadlock in deadlocks
+        )
+        if current == self._last:
+            return
+        if current:
+            alert = {
+                "event": "deadlock",
+                "time": time.time(),
+                "deadlocks": [
+                    {"processes": sorted(d.processes), "resources": sorted(d.resources)}
+                    for d in deadlocks
+                ],
+            }
+        else:
+            alert = {"event": "resolved", "time": time.time()}
+        self._last = current
+        self.output.write(json.dumps(alert) + "\n")
+        self.output.flush()
+
+
+def run(lines, detector, emitter, batch_size=1):
+    """Feeds lines into the detector in batches. Returns the number of events applied."""
+    count = 0
+    batch, numbers = [], []
+    for number, line in enumerate(lines, 1):
+        try:
+            event = parse_event(line)
+        except (ValueError, KeyError) as error:
+            _report(number, error)
+            continue
+        if event is None:
+            continue
+        batch.append(event)
+        numbers.append(number)
+        if len(batch) >= batch_size:
+            count += _apply(detector, emitter, batch, numbers)
+            batch, numbers = [], []
+    if batch:
+        count += _apply(detector, emitter, batch, numbers)
+    return count
+
+
+def _apply(detector, emitter, batch, numbers):
+    """Applies one batch; an event naming a node in the wrong role is skipped on its own."""
+    (deadlocked, _), rejected = detector.apply_valid_events(batch)
+    for index, _, error in rejected:
+        _report(numbers[index], error)
+    emitter.update(deadlocked)
+    return len(batch) - len(rejected)
+
+
+def _report(number, error):
+    sys.stderr.write(json.dumps({"event": "error", "line": number, "message": str(error)}) + "\n")
+
+
+def _polled(lines, emitter):
+    """
+    Passes lines through, reading them on a thread of their own so that the
+    scheduler's pending analyses still run while input is idle. When input
+    ends, waits for the analyses still pending and polls a last time, so a
+    deadlock that came of age after the last event is reported too.
+    """
+    scheduler, clock = emitter.scheduler, emitter.detector.clock
+    queue, end, failure = Queue(maxsize=1024), object(), []
+
+    def read():
+        try:
+            for line in lines:
+                queue.put(line)
+        except Exception as error:
+            failure.append(error)
+        finally:
+            queue.put(end)
+
+    threading.Thread(target=read, name="headless-reader", daemon=True).start()
+    while True:
+        due = scheduler.next_due()
+        try:
+            line = queue.get(timeout=None if due is None else max(0.0, due - clock()))
+        except Empty:
+            emitter.update(True)
+            continue
+        if line is end:
+            break
+        yield line
+    if failure:
+        raise failure[0]
+    due = scheduler.next_due()
+    while due is not None:
+        time.sleep(max(0.0, due - clock()))
+        emitter.update(True)
+        due = scheduler.next_due()
+    emitter.update(True)
+
+
+def _profiled(lines, seconds, memory):
+    """Passes lines through, profiling until seconds have passed or input ends."""
+    from metrics import ProfileCapture
+
+    capture = ProfileCapture(memory=memory).start()
+    deadline = time.perf_counter() + seconds
+    try:
+        for line in lines:
+            if capture is not None and time.perf_counter() >= deadline:
+                sys.stderr.write(capture.stop().report())
+                capture = None
+            yield line
+    finally:
+        if capture is not None:
+            sys.stderr.write(capture.stop().report())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m deadlock_detector",
+        description="Run deadlock detection over a stream of edge events."
+    )
+    parser.add_argument("files", nargs="*", help="event files to read ('-' for stdin)")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--listen", metavar="HOST:PORT", help="accept events over TCP")
+    source.add_argument("--unix", metavar="PATH", help="accept events over a Unix socket")
+    parser.add_argument("--batch", type=int, default=1,
+                        help="events applied per detection pass (default: 1)")
+    parser.add_argument("--backend", default="compact", help="graph backend (default: compact)")
+    parser.add_argument("--throughput", action="store_true",
+                        help="report events/sec on stderr when input ends")
+    parser.add_argument("--min-wait", type=float, metavar="SECONDS",
+                        help="only report deadlocks whose waits are at least this old, "
+                             "checking on a timer while input is idle")
+    parser.add_argument("--event-log", metavar="PATH",
+                        help="append every change to a replayable event log")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve Prometheus metrics at http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-json", metavar="PATH",
+                        help="dump metrics as JSON to PATH periodically and on exit")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, metavar="SECONDS",
+                        help="seconds between JSON metric dumps (default: 10)")
+    parser.add_argument("--profile", type=float, metavar="SECONDS",
+                        help="profile the first SECONDS of input with cProfile, report on stderr")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="also trace allocations with tracemalloc while profiling")
+    args = parser.parse_args(argv)
+
+    detector = DeadlockDetector(incremental=True, backend=args.backend)
+    event_log = None
+    if args.event_log:
+        from event_log import EventLog
+        event_log = EventLog(args.event_log)
+        event_log.attach(detector)
+    scheduler = None
+    if args.min_wait is not None:
+        from wait_scheduler import WaitAgeScheduler
+        scheduler = WaitAgeScheduler(detector, args.min_wait)
+    exporters = []
+    if args.metrics_port is not None or args.metrics_json:
+        from metrics import JsonDumpExporter, Metrics, PrometheusExporter
+        metrics = Metrics()
+        metrics.instrument(detector)
+        if args.metrics_port is not None:
+            exporters.append(PrometheusExporter(metrics, port=args.metrics_port).start())
+        if args.metrics_json:
+            exporters.append(JsonDumpExporter(metrics, args.metrics_json, args.metrics_interval).start())
+    emitter = AlertEmitter(detector, sys.stdout, scheduler)
+    lines = read_lines(args)
+    if args.profile is not None:
+        lines = _profiled(lines, args.profile, args.profile_memory)
+    if scheduler is not None:
+        lines = _polled(lines, emitter)
+    start = time.perf_counter()
+    try:
+        count = run(lines, detector, emitter, max(1, args.batch))
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        lines.close()
+        if event_log is not None:
+            event_log.close()
+        for exporter in exporters:
+            exporter.close()
+    if args.throughput:
+        elapsed = time.perf_counter() - start
+        sys.stderr.write(json.dumps({
+            "event": "throughput",
+            "events": count,
+            "seconds": round(elapsed, 6),
+            "events_per_sec": round(count / elapsed, 1) if elapsed else None,
+        }) + "\n")
+    return 0
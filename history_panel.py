@@ -0,0 +1,142 @@
+import tkinter as tk
+from tkinter import ttk
+from deadlock_detector import PROCESS
+
+# Rows materialized per section before the rest is paged in on demand
+PAGE_SIZE = 200
+
+SECTIONS = (
+    ("processes", "Processes"),
+    ("resources", "Resources"),
+    ("requests", "Requests (Process → Resource)"),
+    ("allocations", "Allocations (Resource → Process)"),
+    ("activity", "Activity"),
+)
+
+class HistoryPanel:
+    """
+    Resource allocation history as a paged ttk.Treeview.
+
+    The panel listens to DeadlockDetector change events and inserts or
+    deletes single rows, so an action costs the same however large the graph
+    is. Each section materializes at most PAGE_SIZE rows; the rest stay in
+    memory behind a "more" row that loads the next page on double-click.
+    Rows appear in the order the changes happened rather than sorted.
+    """
+
+    def __init__(self, parent, **tree_options):
+        self.tree = ttk.Treeview(parent, show="tree", selectmode="browse", **tree_options)
+        self.tree.tag_configure("more", foreground="#88C0D0")
+        self.tree.bind("<Double-1>", self._on_double_click)
+        self.detector = None
+        self._items = {}
+        self._shown = {}
+        self._more = {}
+        for key, _ in SECTIONS:
+            self.tree.insert("", tk.END, iid=key, open=True)
+        self._clear_sections()
+
+    def attach(self, detector):
+        """Shows the state of a detector and follows its changes from now on."""
+        if self.detector is not None:
+            self.detector.unsubscribe(self._on_change)
+        self.detector = detector
+        self._clear_sections()
+        for node in detector.processes():
+            self._add("processes", node, node)
+        for node in detector.resources():
+            self._add("resources", node, node)
+        for source, target in detector.edges():
+            self._on_change("add", source, target)
+        detector.subscribe(self._on_change)
+
+    def log(self, message):
+        key = len(self._items["activity"])
+        self._add("activity", key, f"• {message}")
+        if key in self._shown["activity"]:
+            self.tree.see(self._row_id("activity", key))
+
+    def _clear_sections(self):
+        for key, _ in SECTIONS:
+            self.tree.delete(*self.tree.get_children(key))
+            self._items[key] = {}
+            self._shown[key] = set()
+            self._more[key] = None
+            self._update_heading(key)
+
+    def _on_change(self, event, source, target):
+        if event == "node":
+            self._add(self._node_section(source), source, source)
+            return
+        section = "requests" if self._node_section(source) == "processes" else "allocations"
+        if event == "add":
+            self._add(section, (source, target), f"{source} → {target}")
+        elif event == "remove":
+            self._remove(section, (source, target))
+
+    def _node_section(self, node):
+        return "processes" if self.detector.node_kind(node) == PROCESS else "resources"
+
+    def _add(self, section, key, text):
+        items = self._items[section]
+        if key in items:
+            return
+        items[key] = text
+        if len(self._shown[section]) < PAGE_SIZE:
+            self._show(section, key)
+        self._update_heading(section)
+        self._update_more(section)
+
+    def _remove(self, section, key):
+        if self._items[section].pop(key, None) is None:
+            return
+        if key in self._shown[section]:
+            self._shown[section].discard(key)
+            self.tree.delete(self._row_id(section, key))
+        self._update_heading(section)
+        self._update_more(section)
+
+    def _show(self, section, key):
+        self._shown[section].add(key)
+        index = tk.END if self._more[section] is None else self.tree.index(self._more[section])
+        self.tree.insert(section, index, iid=self._row_id(section, key),
+                         text=self._items[section][key])
+
+    def _load_page(self, section):
+        """Materializes the next page of hidden rows (only on explicit request)."""
+        shown = self._shown[section]
+        loaded = 0
+        for key in self._items[section]:
+            if loaded == PAGE_SIZE:
+                break
+            if key not in shown:
+                self._show(section, key)
+                loaded += 1
+        self._update_more(section)
+
+    def _update_heading(self, section):
+        title = dict(SECTIONS)[section]
+        self.tree.item(section, text=f"{title} ({len(self._items[section])})")
+
+    def _update_more(self, section):
+        hidden = len(self._items[section]) - len(self._shown[section])
+        more = self._more[section]
+        if hidden and more is None:
+            more = self._more[section] = f"{section}:more"
+            self.tree.insert(section, tk.END, iid=more, tags=("more",))
+        if more is not None:
+            if hidden:
+                self.tree.item(more, text=f"… {hidden} more (double-click to load)")
+            else:
+                self.tree.delete(more)
+                self._more[section] = None
+
+    def _row_id(self, section, key):
+        return f"{section}:{key!r}"
+
+    def _on_double_click(self, _event):
+        focus = self.tree.focus()
+        for section, _ in SECTIONS:
+            if focus == self._more[section]:
+                self._load_page(section)
+                return
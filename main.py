@@ -1,24 +1,63 @@
+import os
+import time
+import webbrowser
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
+from background import BackgroundRunner
 from deadlock_detector import DeadlockDetector
 from graph_visualizer import visualize_graph
+from history_panel import HistoryPanel
+from resolution import ResolutionPlanner
+
+def detect_job(snapshot, metrics=None, clock=time.monotonic):
+    """
+    Builds a job that finds every deadlocked node of a graph snapshot and
+    plans a resolution. clock is the live detector's, so the planner weighs
+    each wait by its real age rather than the time of the snapshot.
+    """
+    def job(progress, cancelled):
+        progress("Analyzing resource allocation graph...")
+        detector = DeadlockDetector.from_snapshot(snapshot, clock=clock)
+        if metrics is not None:
+            metrics.instrument(detector, gauges=False)
+        deadlocks = detector.find_deadlocks()
+        plan = None
+        if deadlocks and not cancelled():
+            progress("Planning a resolution...")
+            plan = ResolutionPlanner(detector).plan(deadlocks=deadlocks)
+        return set().union(*(d.processes | d.resources for d in deadlocks)), plan
+    return job
+
+def render_job(snapshot, deadlocked_nodes=None, metrics=None):
+    """Builds a job that renders a graph snapshot to HTML and opens it."""
+    def job(progress, cancelled):
+        progress("Rendering graph...")
+        graph = DeadlockDetector.from_snapshot(snapshot).graph
+        if cancelled():
+            return None
+        render = visualize_graph if metrics is None else metrics.timed("visualize_graph", visualize_graph)
+        return render(graph, deadlocked_nodes)
+    return job
 
 class DeadlockDetectionApp:
-    def __init__(self, root):
+    def __init__(self, root, event_log=None, metrics=None):
         self.root = root
         self.root.title("Deadlock Detection Simulator")
         self.root.geometry("800x600")
         self.style = tb.Style(theme="darkly")
         
-        self.detector = DeadlockDetector()
+        self.runner = BackgroundRunner(self.root)
+        self.event_log = event_log
+        self.metrics = metrics
+        self.detector = self.new_detector()
         self.processes = []
         self.resources = []
         
         self.create_gui()
-        self.update_history()
+        self.history.attach(self.detector)
     
     def create_gui(self):
         """Create the main GUI layout with the modern design"""
@@ -127,7 +166,7 @@ class DeadlockDetectionApp:
         tb.Button(
             detect_frame, 
             text="Visualize Graph",
-            command=lambda: visualize_graph(self.detector.graph),
+            command=self.visualize,
             bootstyle="primary",
             width=20
         ).pack(side=tk.LEFT, padx=5)
@@ -141,6 +180,8 @@ class DeadlockDetectionApp:
         )
         self.status_label.pack(fill=tk.X, pady=10, padx=5)
         
+        self.progress = tb.Progressbar(left_panel, mode="indeterminate", bootstyle="info-striped")
+        
         right_panel = tb.Frame(panel_frame, bootstyle="light")
         right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(7.5, 0))
         
@@ -153,17 +194,9 @@ class DeadlockDetectionApp:
         scroll_y = tb.Scrollbar(scroll_frame, orient="vertical", bootstyle="round")
         scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
         
-        self.history_text = tk.Text(
-            scroll_frame, 
-            height=20, 
-            bg="#2E3440", 
-            fg="#D8DEE9",
-            font=("Consolas", 10),
-            wrap=tk.WORD,
-            yscrollcommand=scroll_y.set
-        )
-        self.history_text.pack(fill=tk.BOTH, expand=True)
-        scroll_y.config(command=self.history_text.yview)
+        self.history = HistoryPanel(scroll_frame, height=20, yscrollcommand=scroll_y.set)
+        self.history.tree.pack(fill=tk.BOTH, expand=True)
+        scroll_y.config(command=self.history.tree.yview)
         
         control_frame = tb.Frame(right_panel)
         control_frame.pack(fill=tk.X, pady=5, padx=5)
@@ -199,11 +232,12 @@ class DeadlockDetectionApp:
         if not process or not resource:
             self.show_error("Please select both Process and Resource")
             return
-        process = f"P{process}" if not process.startswith("P") else process
-        resource = f"R{resource}" if not resource.startswith("R") else resource
-        self.detector.add_dependency(process, resource)
+        try:
+            self.detector.add_dependency(process, resource)
+        except ValueError as error:
+            self.show_error(str(error))
+            return
         self.update_status(f"Process {process} requested {resource}", "info")
-        self.update_history()
         self.check_for_deadlock_silent()
     
     def allocate_resource(self):
@@ -212,17 +246,13 @@ class DeadlockDetectionApp:
         if not process or not resource:
             self.show_error("Please select both Process and Resource")
             return
-        process = f"P{process}" if not process.startswith("P") else process
-        resource = f"R{resource}" if not resource.startswith("R") else resource
         try:
-            if self.detector.graph.has_edge(process, resource):
-                self.detector.graph.remove_edge(process, resource)
-            self.detector.graph.add_edge(resource, process)
-            self.update_status(f"Resource {resource} allocated to {process}", "success")
-            self.update_history()
-            self.check_for_deadlock_silent()
-        except AttributeError:
-            self.show_error("Error: Unable to allocate resource.")
+            self.detector.allocate_resource(process, resource)
+        except ValueError as error:
+            self.show_error(str(error))
+            return
+        self.update_status(f"Resource {resource} allocated to {process}", "success")
+        self.check_for_deadlock_silent()
     
     def release_resource(self):
         process = self.process_var.get().strip()
@@ -230,23 +260,105 @@ class DeadlockDetectionApp:
         if not process or not resource:
             self.show_error("Please select both Process and Resource")
             return
-        process = f"P{process}" if not process.startswith("P") else process
-        resource = f"R{resource}" if not resource.startswith("R") else resource
         self.detector.release_resource(process, resource)
         self.update_status(f"Released {resource} from {process}", "warning")
-        self.update_history()
+    
+    def new_detector(self):
+        # Results cached by graph version, which starts over with the detector
+        self._analysis = None
+        self._rendered = None
+        detector = DeadlockDetector(incremental=True)
+        # Any edit makes queued or running analysis of the old graph stale
+        detector.subscribe(lambda *change: self.runner.cancel_pending())
+        if self.event_log is not None:
+            # Logged as a CLEAR, so replay sees the reset
+            self.event_log.attach(detector)
+        if self.metrics is not None:
+            self.metrics.instrument(detector)
+        return detector
     
     def check_deadlock(self):
-        is_deadlocked, deadlocked_nodes = self.detector.detect_deadlock()
-        if is_deadlocked:
+        version = self.detector.version
+        if self._analysis is not None and self._analysis[0] == version:
+            self.show_deadlock_result(self._analysis[1])
+            return
+        
+        def done(result):
+            self._analysis = (version, result)
+            self.show_deadlock_result(result)
+        
+        self.run_in_background(detect_job(self.detector.snapshot(), self.metrics, self.detector.clock), done)
+    
+    def show_deadlock_result(self, result):
+        deadlocked_nodes, plan = result
+        if deadlocked_nodes:
             deadlocked_list = ", ".join(sorted(deadlocked_nodes))
             self.update_status(f"DEADLOCK DETECTED! Involving: {deadlocked_list}", "danger")
-            messagebox.showwarning("Deadlock Detected", 
-                                  f"A deadlock has been detected involving nodes:\n{deadlocked_list}")
+            message = f"A deadlock has been detected involving nodes:\n{deadlocked_list}"
+            if plan is not None and plan.victims:
+                victims = ", ".join(sorted(plan.victims))
+                if messagebox.askyesno("Deadlock Detected",
+                                       f"{message}\n\nProposed resolution: abort {victims} "
+                                       f"(cost {plan.cost:.1f}).\nApply it now?"):
+                    self.apply_resolution(plan)
+                    return
+            else:
+                messagebox.showwarning("Deadlock Detected", message)
         else:
             self.update_status("No deadlock detected in the system", "success")
-        visualize_graph(self.detector.graph)  # Removed deadlocked_nodes as it’s handled in visualize_graph
-        self.update_history()
+        self.visualize(deadlocked_nodes)
+    
+    def apply_resolution(self, plan):
+        victims = ", ".join(sorted(plan.victims))
+        deadlocked, _ = ResolutionPlanner(self.detector).apply(plan)
+        self.log_action(f"Aborted {victims} to resolve a deadlock")
+        if deadlocked:
+            self.update_status(f"Aborted {victims}, but a deadlock remains", "danger")
+        else:
+            self.update_status(f"Deadlock resolved by aborting {victims}", "success")
+        self.visualize()
+    
+    def visualize(self, deadlocked_nodes=None):
+        key = (self.detector.version, frozenset(deadlocked_nodes or ()))
+        if self._rendered is not None and self._rendered[0] == key and os.path.exists(self._rendered[1]):
+            # Same graph, same highlights: reopen the page instead of laying it out again
+            webbrowser.open('file://' + os.path.abspath(self._rendered[1]))
+            return
+        
+        def done(output_file):
+            if output_file is not None:
+                self._rendered = (key, output_file)
+        
+        self.run_in_background(
+            render_job(self.detector.snapshot(), deadlocked_nodes, self.metrics),
+            done
+        )
+    
+    def run_in_background(self, job, on_done):
+        def done(result):
+            self.stop_progress()
+            on_done(result)
+        
+        def failed(error):
+            self.stop_progress()
+            self.show_error(f"Analysis failed: {error}")
+        
+        self.progress.pack(fill=tk.X, padx=5)
+        self.progress.start(16)
+        self.runner.submit(job, done, on_progress=lambda message: self.update_status(message, "info"),
+                           on_error=failed)
+        self.root.after(self.runner.poll_interval, self.watch_progress)
+    
+    def watch_progress(self):
+        # Hide the bar once cancelled jobs have drained without a callback
+        if self.runner.busy:
+            self.root.after(100, self.watch_progress)
+        else:
+            self.stop_progress()
+    
+    def stop_progress(self):
+        self.progress.stop()
+        self.progress.pack_forget()
     
     def check_for_deadlock_silent(self):
         is_deadlocked, deadlocked_nodes = self.detector.detect_deadlock()
@@ -256,55 +368,57 @@ class DeadlockDetectionApp:
     
     def clear_all(self):
         if messagebox.askyesno("Confirm Reset", "Are you sure you want to clear all data?"):
-            self.detector = DeadlockDetector()
+            self.runner.cancel_pending()
+            self.detector = self.new_detector()
+            self.history.attach(self.detector)
             self.update_status("System reset successfully", "secondary")
-            self.update_history()
     
     def update_status(self, message, status_type):
         self.status_var.set(f"System Status: {message}")
         self.status_label.configure(bootstyle=status_type)
     
-    def update_history(self):
-        self.history_text.config(state=tk.NORMAL)
-        self.history_text.delete(1.0, tk.END)
-        nodes = list(self.detector.graph.nodes())
-        edges = list(self.detector.graph.edges())
-        self.history_text.insert(tk.END, "==== CURRENT SYSTEM STATE ====\n\n")
-        if not nodes:
-            self.history_text.insert(tk.END, "No processes or resources added yet.\n")
-        else:
-            processes = sorted([n for n in nodes if n.startswith("P")])
-            self.history_text.insert(tk.END, f"Processes ({len(processes)}):\n")
-            self.history_text.insert(tk.END, ", ".join(processes) + "\n\n")
-            resources = sorted([n for n in nodes if n.startswith("R")])
-            self.history_text.insert(tk.END, f"Resources ({len(resources)}):\n")
-            self.history_text.insert(tk.END, ", ".join(resources) + "\n\n")
-            if edges:
-                self.history_text.insert(tk.END, "Relationships:\n")
-                requests = [(s, t) for s, t in edges if s.startswith("P") and t.startswith("R")]
-                if requests:
-                    self.history_text.insert(tk.END, "Requests (Process → Resource):\n")
-                    for s, t in sorted(requests):
-                        self.history_text.insert(tk.END, f"  • {s} → {t}\n")
-                allocations = [(s, t) for s, t in edges if s.startswith("R") and t.startswith("P")]
-                if allocations:
-                    self.history_text.insert(tk.END, "\nAllocations (Resource → Process):\n")
-                    for s, t in sorted(allocations):
-                        self.history_text.insert(tk.END, f"  • {s} → {t}\n")
-            else:
-                self.history_text.insert(tk.END, "No relationships defined yet.\n")
-        self.history_text.config(state=tk.DISABLED)
-    
     def log_action(self, message):
-        self.history_text.config(state=tk.NORMAL)
-        self.history_text.insert(tk.END, f"• {message}\n")
-        self.history_text.see(tk.END)
-        self.history_text.config(state=tk.DISABLED)
+        self.history.log(message)
     
     def show_error(self, message):
         messagebox.showerror("Error", message)
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Deadlock Detection Simulator")
+    parser.add_argument("--event-log", metavar="PATH",
+                        help="append every change to a replayable event log")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve Prometheus metrics at http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-json", metavar="PATH",
+                        help="dump metrics as JSON to PATH every 10 seconds and on exit")
+    parser.add_argument("--profile", type=float, metavar="SECONDS",
+                        help="profile the first SECONDS of the session, report on stderr")
+    args = parser.parse_args()
+    event_log = None
+    if args.event_log:
+        from event_log import EventLog
+        event_log = EventLog(args.event_log)
+    metrics = None
+    exporters = []
+    if args.metrics_port is not None or args.metrics_json:
+        from metrics import JsonDumpExporter, Metrics, PrometheusExporter
+        metrics = Metrics()
+        if args.metrics_port is not None:
+            exporters.append(PrometheusExporter(metrics, port=args.metrics_port).start())
+        if args.metrics_json:
+            exporters.append(JsonDumpExporter(metrics, args.metrics_json).start())
     root = tb.Window(themename="darkly")
-    app = DeadlockDetectionApp(root)
+    if args.profile is not None:
+        import sys
+        from metrics import ProfileCapture
+        # Stopped by root.after, on the Tk thread that started it
+        ProfileCapture(on_done=sys.stderr.write).capture_for(
+            args.profile, lambda seconds, callback: root.after(int(seconds * 1000), callback)
+        )
+    app = DeadlockDetectionApp(root, event_log, metrics)
     root.mainloop()
+    if event_log is not None:
+        event_log.close()
+    for exporter in exporters:
+        exporter.close()
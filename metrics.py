@@ -0,0 +1,376 @@
+"""
+Operation counters, latency histograms and graph gauges for the detector.
+
+Nothing here runs unless asked for: Metrics.instrument() wraps the methods
+of one detector instance, so uninstrumented detectors pay nothing at all,
+and exporters only read the registry when scraped or on their interval.
+
+    metrics = Metrics()
+    metrics.instrument(detector)
+    PrometheusExporter(metrics, port=9464).start()     # GET /metrics
+    JsonDumpExporter(metrics, "metrics.json").start()  # rewritten every 10s
+
+Updates from several threads are not locked; a concurrent increment can
+rarely be lost, which is acceptable for monitoring.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Detector methods timed by Metrics.instrument().
+OPERATIONS = (
+    "detect_deadlock", "find_deadlocks", "add_dependency", "allocate_resource",
+    "release_resource", "apply_events",
+)
+# Operations that count towards detections per second.
+DETECTIONS = ("detect_deadlock", "find_deadlocks")
+# Upper bounds of the latency buckets, in seconds: 1µs to 10s, three per decade.
+LATENCY_BUCKETS = tuple(m * 10.0 ** e for e in range(-6, 1) for m in (1, 2.5, 5)) + (10.0,)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus sense."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile, None when empty."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Rate:
+    """Events per second over a sliding window of one-second slots."""
+
+    def __init__(self, window=10, clock=time.monotonic):
+        self.window = window
+        self.clock = clock
+        self._slots = [0] * window
+        self._seconds = [None] * window
+
+    def mark(self, count=1):
+        second = int(self.clock())
+        index = second % self.window
+        if self._seconds[index] != second:
+            self._seconds[index] = second
+            self._slots[index] = 0
+        self._slots[index] += count
+
+    def per_second(self):
+        now = int(self.clock())
+        total = sum(
+            count for count, second in zip(self._slots, self._seconds)
+            if second is not None and now - self.window < second <= now
+        )
+        return total / self.window
+
+
+class Metrics:
+    """
+    Registry of counters, histograms and gauges.
+
+    Args:
+        rate_window (int): Seconds averaged by the detections-per-second gauge
+    """
+
+    def __init__(self, rate_window=10):
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+        self.detections = Rate(rate_window)
+        self.gauges["detections_per_second"] = self.detections.per_second
+
+    def increment(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+    def gauge(self, name, read):
+        """Registers read() as the current value of a gauge."""
+        self.gauges[name] = read
+
+    def timed(self, name, function):
+        """Wraps a function so each call is counted and its latency observed under name."""
+        detection = name in DETECTIONS
+        counters = self.counters
+        clock = time.perf_counter
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.observe(name, clock() - start)
+                counters[name] = counters.get(name, 0) + 1
+                if detection:
+                    self.detections.mark()
+        return wrapper
+
+    def instrument(self, detector, gauges=True):
+        """
+        Times the detector's operations (see OPERATIONS) on this instance
+        only. With gauges, graph_nodes and graph_edges follow its graph;
+        the most recently instrumented detector wins.
+        """
+        if any(name in vars(detector) for name in OPERATIONS):
+            return detector  # already instrumented
+        for name in OPERATIONS:
+            setattr(detector, name, self.timed(name, getattr(detector, name)))
+        if gauges:
+            self.gauge("graph_nodes", lambda: detector.store.number_of_nodes())
+            self.gauge("graph_edges", lambda: detector.store.number_of_edges())
+        return detector
+
+    def uninstrument(self, detector):
+        """Restores the detector's own methods."""
+        for name in OPERATIONS:
+            vars(detector).pop(name, None)
+
+    def snapshot(self):
+        """Returns every metric as plain JSON-ready data."""
+        return {
+            "time": time.time(),
+            "counters": dict(self.counters),
+            "gauges": {name: read() for name, read in list(self.gauges.items())},
+            "histograms": {
+                name: {
+                    "count": h.count,
+                    "sum": h.sum,
+                    "p50": h.quantile(0.5),
+                    "p99": h.quantile(0.99),
+                    "buckets": dict(zip([*map(str, h.buckets), "+Inf"], h.counts)),
+                }
+                for name, h in list(self.histograms.items())
+            },
+        }
+
+    def prometheus(self, prefix="deadlock_"):
+        """Renders every metric in the Prometheus text exposition format."""
+        lines = []
+        counters = dict(self.counters)
+        if counters:
+            lines.append(f"# TYPE {prefix}operations_total counter")
+            for name, value in sorted(counters.items()):
+                lines.append(f'{prefix}operations_total{{operation="{name}"}} {value}')
+        for name, read in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {prefix}{name} gauge")
+            lines.append(f"{prefix}{name} {read()}")
+        histograms = sorted(self.histograms.items())
+        if histograms:
+            metric = f"{prefix}operation_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for name, h in histograms:
+                label = f'operation="{name}"'
+                cumulative = 0
+                for bound, count in zip([*map(repr, h.buckets), "+Inf"], h.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f"{metric}_sum{{{label}}} {h.sum}")
+                lines.append(f"{metric}_count{{{label}}} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+class PrometheusExporter:
+    """
+    Serves Metrics.prometheus() at GET /metrics from a daemon thread.
+
+    Args:
+        metrics (Metrics): Registry to expose
+        host (str): Interface to bind
+        port (int): TCP port; 0 picks a free one (see .port after start())
+    """
+
+    def __init__(self, metrics, host="127.0.0.1", port=9464):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def start(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class JsonDumpExporter:
+    """
+    Rewrites Metrics.snapshot() as JSON to a file every interval seconds
+    from a daemon thread, and once more on close(). The file is replaced
+    atomically, so readers never see a partial dump.
+    """
+
+    def __init__(self, metrics, path, interval=10.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="metrics-json", daemon=True)
+        self._thread.start()
+        return self
+
+    def dump(self):
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(self.metrics.snapshot(), file, indent=2)
+        os.replace(temporary, self.path)
+
+    def close(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.dump()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.dump()
+
+
+class ProfileCapture:
+    """
+    Captures a cProfile and/or tracemalloc profile over a window.
+
+    Use as a context manager, call start() and stop(), or capture_for() to
+    stop after a number of seconds. cProfile only sees the thread that
+    called start(), and has to be stopped on that thread too.
+
+    Args:
+        cpu (bool): Run cProfile
+        memory (bool): Run tracemalloc and diff snapshots at start and stop
+        top (int): Entries kept in report()
+        on_done (callable, optional): Called with report() after a timed capture
+    """
+
+    def __init__(self, cpu=True, memory=False, top=20, on_done=None):
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.on_done = on_done
+        self.profile = None
+        self.memory_diff = None
+        self._before = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        if self.cpu:
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        if self.memory:
+            import tracemalloc
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            self._before = tracemalloc.take_snapshot()
+        return self
+
+    def stop(self):
+        if self.profile is not None:
+            self.profile.disable()
+        if self._before is not None:
+            import tracemalloc
+            after = tracemalloc.take_snapshot()
+            self.memory_diff = after.compare_to(self._before, "lineno")[:self.top]
+            self._before = None
+            if self._started_tracing:
+                tracemalloc.stop()
+        return self
+
+    def capture_for(self, seconds, schedule=None):
+        """
+        Starts now, stops after seconds, then calls on_done(report()).
+
+        schedule(seconds, callback) arranges the stop; a CPU capture needs
+        one that calls back on this thread, such as Tk's root.after. A
+        memory-only capture defaults to a timer thread.
+        """
+        if schedule is None:
+            if self.cpu:
+                raise ValueError("A timed CPU capture needs a schedule on the profiled thread")
+
+            def schedule(delay, callback):
+                timer = threading.Timer(delay, callback)
+                timer.daemon = True
+                timer.start()
+
+        def finish():
+            self.stop()
+            if self.on_done is not None:
+                self.on_done(self.report())
+
+        self.start()
+        schedule(seconds, finish)
+
+    def report(self):
+        """Returns the top functions by cumulative time and the top allocation changes."""
+        import io
+        import pstats
+
+        parts = []
+        if self.profile is not None:
+            stream = io.StringIO()
+            pstats.Stats(self.profile, stream=stream).sort_stats("cumulative").print_stats(self.top)
+            parts.append(stream.getvalue())
+        if self.memory_diff is not None:
+            parts.append("\n".join(str(stat) for stat in self.memory_diff))
+        return "\n".join(parts)
@@ -0,0 +1,169 @@
+"""
+Parallel deadlock detection over the weakly connected components of a graph.
+
+A cycle never leaves its weakly connected component, so components can be
+searched independently. The graph is split in one vectorized pass, the CSR
+arrays are placed in shared memory once, and worker processes receive only
+the shared-memory names plus the index ranges of the components they own.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from scc import strongly_connected_components
+
+# Below this many edges the pool costs more than it saves.
+MIN_PARALLEL_EDGES = 50000
+# Tasks per worker, so one large component does not leave the others idle.
+TASKS_PER_WORKER = 4
+
+
+def weak_components(count, indptr, indices):
+    """
+    Labels the weakly connected components of a CSR graph.
+
+    Hooks the larger root of every edge onto the smaller and compresses
+    paths until no edge joins two roots (Shiloach-Vishkin style, all
+    vectorized), so each round is one pass over the edge arrays.
+
+    Returns:
+        ndarray: The smallest node id of each node's component
+    """
+    src = np.repeat(np.arange(count, dtype=np.int64), np.diff(indptr))
+    dst = np.asarray(indices, dtype=np.int64)
+    parent = np.arange(count, dtype=np.int64)
+    while True:
+        pu, pv = parent[src], parent[dst]
+        split = pu != pv
+        if not split.any():
+            return parent
+        np.minimum.at(parent, np.maximum(pu[split], pv[split]), np.minimum(pu[split], pv[split]))
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+
+def partition(count, indptr, indices):
+    """
+    Groups nodes by weakly connected component, keeping only components that
+    can hold a cycle (at least as many edges as nodes).
+
+    Returns:
+        tuple: (members, bounds); component i is members[bounds[i]:bounds[i + 1]]
+    """
+    labels = weak_components(count, indptr, indices)
+    node_counts = np.bincount(labels, minlength=count)
+    edge_counts = np.bincount(labels, weights=np.diff(indptr), minlength=count)
+    # A weakly connected component with fewer edges than nodes is a tree.
+    cyclic = (node_counts > 0) & (edge_counts >= node_counts)
+    members = np.flatnonzero(cyclic[labels])
+    members = members[np.argsort(labels[members], kind="stable")]
+    bounds = np.flatnonzero(np.diff(labels[members])) + 1
+    bounds = np.concatenate([[0], bounds, [len(members)]]) if len(members) else np.zeros(1, np.int64)
+    return members, bounds
+
+
+def find_cyclic_components(count, indptr, indices, workers=None, executor=None,
+                           min_parallel_edges=MIN_PARALLEL_EDGES):
+    """
+    Finds every strongly connected component that contains a cycle.
+
+    Args:
+        count (int): Number of nodes, numbered 0..count-1
+        indptr, indices: CSR successor arrays
+        workers (int): Worker processes (default: os.cpu_count())
+        executor: A ProcessPoolExecutor to reuse instead of starting one
+        min_parallel_edges (int): Smaller graphs are searched in-process
+
+    Returns:
+        list: The node ids of each cyclic component
+    """
+    indptr = np.asarray(indptr, dtype=np.int64)
+    indices = np.asarray(indices, dtype=np.int64)
+    members, bounds = partition(count, indptr, indices)
+    ranges = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+    if not ranges:
+        return []
+    workers = workers or os.cpu_count() or 1
+    if len(indices) < min_parallel_edges or (workers == 1 and executor is None):
+        return _search(indptr, indices, members, ranges)
+
+    arrays = {"indptr": indptr, "indices": indices, "members": members}
+    blocks = {key: shared_memory.SharedMemory(create=True, size=max(1, value.nbytes))
+              for key, value in arrays.items()}
+    try:
+        layout = {}
+        for key, value in arrays.items():
+            np.ndarray(value.shape, value.dtype, buffer=blocks[key].buf)[:] = value
+            layout[key] = (blocks[key].name, value.shape, value.dtype.str)
+        tasks = _balance(ranges, workers * TASKS_PER_WORKER)
+        own = executor is None
+        if own:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            results = executor.map(_search_shared, [layout] * len(tasks), tasks)
+            return [component for result in results for component in result]
+        finally:
+            if own:
+                executor.shutdown()
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+
+def _balance(ranges, count):
+    """Deals component ranges out largest first, each to the lightest task."""
+    tasks = [[] for _ in range(min(count, len(ranges)))]
+    loads = [0] * len(tasks)
+    for start, stop in sorted(ranges, key=lambda r: r[0] - r[1]):
+        lightest = loads.index(min(loads))
+        tasks[lightest].append((start, stop))
+        loads[lightest] += stop - start
+    return tasks
+
+
+def _search_shared(layout, ranges):
+    blocks, arrays = [], {}
+    for key, (name, shape, dtype) in layout.items():
+        block = _attach(name)
+        blocks.append(block)
+        arrays[key] = np.ndarray(shape, dtype, buffer=block.buf)
+    try:
+        return _search(arrays["indptr"], arrays["indices"], arrays["members"], ranges)
+    finally:
+        arrays.clear()
+        for block in blocks:
+            block.close()
+
+
+def _attach(name):
+    """
+    Opens a block without registering it with this process's resource
+    tracker, which would otherwise unlink it (or warn) when the worker exits
+    although the parent owns it.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no track argument
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _search(indptr, indices, members, ranges):
+    found = []
+    for start, stop in ranges:
+        nodes = members[start:stop].tolist()
+        successors = {}
+        for node in nodes:
+            successors[node] = indices[indptr[node]:indptr[node + 1]].tolist()
+        for piece in strongly_connected_components(nodes, successors.__getitem__):
+            if len(piece) > 1 or piece[0] in successors[piece[0]]:
+                found.append(piece)
+    return found
@@ -1,4 +1,7 @@
+import os
+import threading
 import psutil
+from deadlock_detector import EXCLUSIVE, SHARED
 
 def get_system_processes():
     """Fetch running system processes"""
@@ -6,3 +9,153 @@ def get_system_processes():
     for proc in psutil.process_iter(attrs=['pid', 'name']):
         processes.append((proc.info['pid'], proc.info['name']))
     return processes
+
+def read_lock_edges(locks_path="/proc/locks"):
+    """
+    Parses the kernel lock table into wait-for edges in a single read.
+
+    Each held lock becomes a resource, named after its file (device:inode),
+    byte range and owner, e.g. "R08:01:555:0-10:100". Its holder gets an
+    allocation edge (Resource → Process). Blocked waiters, the "->" lines,
+    are listed right after the lock they are blocked by and get a request
+    edge (Process → Resource) to that lock, so holding one range of a file
+    while waiting on another never reads as a cycle. READ locks are shared
+    and WRITE locks exclusive. OFD locks, which have no owning pid, are
+    skipped together with their waiters.
+
+    Returns:
+        dict: (src, dst) → (kind, mode), with kind "allocate" or "request"
+    """
+    with open(locks_path, encoding="ascii", errors="replace") as file:
+        lines = file.read().splitlines()
+    edges = {}
+    blocker = None
+    for line in lines:
+        fields = line.split()
+        waiting = len(fields) > 1 and fields[1] == "->"
+        if waiting:
+            del fields[1]
+        if len(fields) < 8:
+            continue
+        mode = SHARED if fields[3] == "READ" else EXCLUSIVE
+        if not waiting:
+            blocker = None
+            if fields[4] == "-1":
+                continue
+            blocker = f"R{fields[5]}:{fields[6]}-{fields[7]}:{fields[4]}"
+            edge, kind = (blocker, f"P{fields[4]}"), "allocate"
+        elif blocker is None or fields[4] == "-1":
+            continue
+        else:
+            edge, kind = (f"P{fields[4]}", blocker), "request"
+        if edges.get(edge, (kind, SHARED))[1] == SHARED:
+            edges[edge] = (kind, mode)
+    return edges
+
+def resolve_lock_paths(edges, known=None):
+    """
+    Maps lock resources to file paths using the owners' open files.
+
+    Only resources missing from `known` are looked up, so repeated calls on a
+    mostly unchanged lock table touch very few processes.
+    """
+    known = {} if known is None else known
+    pending = {}
+    for (src, dst), (kind, _) in edges.items():
+        resource, process = (src, dst) if kind == "allocate" else (dst, src)
+        if resource not in known:
+            # The file part of "R<device>:<inode>:<range>:<owner>".
+            locked_file = resource.rsplit(":", 2)[0]
+            pending.setdefault(int(process[1:]), {}).setdefault(locked_file, []).append(resource)
+    for pid, files in pending.items():
+        try:
+            open_files = psutil.Process(pid).open_files()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+        for open_file in open_files:
+            try:
+                stat = os.stat(open_file.path)
+            except OSError:
+                continue
+            locked_file = "R{:02x}:{:02x}:{}".format(
+                os.major(stat.st_dev), os.minor(stat.st_dev), stat.st_ino
+            )
+            for resource in files.get(locked_file, ()):
+                known[resource] = open_file.path
+    return known
+
+class LockSampler:
+    """
+    Periodically samples host file locks into a DeadlockDetector.
+
+    Every tick reads /proc/locks once, diffs it edge by edge against the
+    previous snapshot and applies only the changes as one batch, in sorted
+    order so the result never depends on hashing.
+
+    Args:
+        detector (DeadlockDetector): Detector to keep in sync with the host
+        interval (float): Seconds between samples
+        locks_path (str): Lock table to read
+        resolve_paths (bool): Look up file paths for new lock resources
+        on_sample (callable, optional): Called with the detect_deadlock()
+            result after each tick that changed the graph
+        on_error (callable, optional): Called with the exception of a
+            background tick that failed; sampling goes on either way
+    """
+
+    def __init__(self, detector, interval=1.0, locks_path="/proc/locks",
+                 resolve_paths=True, on_sample=None, on_error=None):
+        self.detector = detector
+        self.interval = interval
+        self.locks_path = locks_path
+        self.resolve_paths = resolve_paths
+        self.on_sample = on_sample
+        self.on_error = on_error
+        self.errors = 0
+        self.paths = {}
+        self._edges = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def tick(self):
+        """Takes one sample and applies the difference. Returns the number of changed edges."""
+        edges = read_lock_edges(self.locks_path)
+        previous = self._edges
+        removed = sorted(edge for edge in previous if edge not in edges)
+        changed = sorted(edge for edge, value in edges.items() if previous.get(edge) != value)
+        if not removed and not changed:
+            return 0
+        events = [(src, dst, "remove") for src, dst in removed]
+        events.extend((src, dst) + edges[(src, dst)] for src, dst in changed)
+        result = self.detector.apply_events(events)
+        self._edges = edges
+        if self.resolve_paths and changed:
+            resolve_lock_paths({edge: edges[edge] for edge in changed}, self.paths)
+        if self.on_sample is not None:
+            self.on_sample(result)
+        return len(removed) + len(changed)
+
+    def start(self):
+        """Starts sampling on a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="lock-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as error:
+                # The previous snapshot is kept, so the next tick retries the same diff.
+                self.errors += 1
+                if self.on_error is not None:
+                    self.on_error(error)
+            self._stop.wait(self.interval)
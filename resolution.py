@@ -0,0 +1,362 @@
+import heapq
+import time
+from collections import namedtuple
+from scc import cyclic_components
+
+ResolutionPlan = namedtuple("ResolutionPlan", ["victims", "cost", "complete", "strategy", "seconds"])
+
+PROCESSES, ALLOCATIONS = "processes", "allocations"
+
+# Deadline checks happen every this many greedy picks.
+CHECK_EVERY = 64
+
+
+class ResolutionPlanner:
+    """
+    Chooses what to preempt so that every deadlock cycle breaks.
+
+    Victims are either whole processes (a weighted feedback vertex set over
+    the processes of the deadlocked components) or single allocation edges
+    (a weighted feedback arc set), both found with the same greedy heuristic:
+    trim nodes that cannot be on a cycle, then repeatedly take the candidate
+    with the lowest cost per cycle it can break, cost / (in-degree *
+    out-degree). Whatever is left of the latency budget goes to dropping
+    victims that turned out to be redundant, most expensive first. If the
+    greedy pass itself runs out of budget, every remaining candidate becomes
+    a victim, which is always a valid (if costly) plan. The budget bounds the
+    search; collecting the deadlocked components beforehand is linear in
+    their size and always runs to completion.
+
+    Args:
+        detector (DeadlockDetector): Detector to plan for
+        priorities (dict, optional): Process name → priority (default 0)
+        priority_weight, held_weight, age_weight (float): Cost of a process
+            is 1 + priority_weight * priority + held_weight * resources held
+            + age_weight * seconds its oldest request has waited
+        budget (float): Default latency budget of plan() in seconds
+    """
+
+    def __init__(self, detector, priorities=None, priority_weight=1.0,
+                 held_weight=1.0, age_weight=0.1, budget=0.05):
+        self.detector = detector
+        self.priorities = {} if priorities is None else priorities
+        self.priority_weight = priority_weight
+        self.held_weight = held_weight
+        self.age_weight = age_weight
+        self.budget = budget
+
+    def cost(self, process, now=None):
+        """Returns the cost of preempting a process."""
+        node = self.detector.store.lookup(process)
+        if node is None:
+            return 1.0
+        return self._process_cost(node, self.detector.clock() if now is None else now)
+
+    def allocation_cost(self, resource, process, now=None):
+        """Returns the cost of taking a resource away from the process holding it."""
+        store = self.detector.store
+        u, v = store.lookup(resource), store.lookup(process)
+        if u is None or v is None:
+            return 1.0
+        return self._allocation_cost(u, v, self.detector.clock() if now is None else now)
+
+    def plan(self, target=PROCESSES, budget=None, deadlocks=None):
+        """
+        Plans a resolution of the current deadlocks.
+
+        Args:
+            target (str): "processes" to abort processes, "allocations" to
+                preempt single held resources
+            budget (float, optional): Seconds to spend (default self.budget)
+            deadlocks (list, optional): find_deadlocks() result to reuse
+
+        Returns:
+            ResolutionPlan: victims (process names, or (resource, process)
+                pairs), their total cost, whether every cycle breaks, the
+                strategy that produced it ("greedy", "refined" or
+                "fallback") and the seconds spent
+        """
+        if target not in (PROCESSES, ALLOCATIONS):
+            raise ValueError(f"Unknown resolution target: {target!r}")
+        start = time.perf_counter()
+        deadline = start + (self.budget if budget is None else budget)
+        if deadlocks is None:
+            deadlocks = self.detector.find_deadlocks()
+        successors, costs = self._working_graph(deadlocks, target)
+        predecessors = _reverse(successors)
+        # Cycles through no candidate (say, resource to resource edges) cannot be broken.
+        complete = not cyclic_components(
+            [node for node in successors if node not in costs],
+            lambda node: [succ for succ in successors[node] if succ not in costs]
+        )
+
+        if time.perf_counter() > deadline:
+            victims = [node for node in costs if successors[node] and predecessors[node]]
+            strategy = "fallback"
+        else:
+            victims, exhausted = _greedy(
+                {node: set(succ) for node, succ in successors.items()},
+                {node: set(pred) for node, pred in predecessors.items()},
+                costs, deadline
+            )
+            strategy = "fallback" if exhausted else "greedy"
+            if complete and not exhausted:
+                victims, finished = _drop_redundant(successors, predecessors, victims, costs, deadline)
+                if finished:
+                    strategy = "refined"
+
+        name = self.detector.store.name
+        return ResolutionPlan(
+            [(name(victim[0]), name(victim[1])) if isinstance(victim, tuple) else name(victim)
+             for victim in victims],
+            sum(costs[victim] for victim in victims),
+            complete,
+            strategy,
+            time.perf_counter() - start
+        )
+
+    def apply(self, plan):
+        """
+        Carries out a plan in one batch: aborted processes release everything
+        they hold and request, preempted allocations go back to being
+        requests. Returns the detect_deadlock() result afterwards.
+        """
+        store = self.detector.store
+        name = store.name
+        events = []
+        for victim in plan.victims:
+            if isinstance(victim, tuple):
+                resource, process = victim
+                events.append((process, resource, "release"))
+                events.append((process, resource, "request"))
+                continue
+            node = store.lookup(victim)
+            if node is None:
+                continue
+            for resource in list(store.successors(node)) + list(store.predecessors(node)):
+                events.append((victim, name(resource), "release"))
+        return self.detector.apply_events(events)
+
+    def _process_cost(self, node, now):
+        store = self.detector.store
+        held = len(store.predecessors(node))
+        oldest = min((info.since for _, info in self.detector.successor_info(node)), default=now)
+        priority = self.priorities.get(store.name(node), 0)
+        return (1.0 + self.priority_weight * priority
+                + self.held_weight * held + self.age_weight * (now - oldest))
+
+    def _allocation_cost(self, resource, process, now):
+        since = self.detector.edge_info_by_id(resource, process).since
+        priority = self.priorities.get(self.detector.store.name(process), 0)
+        return 1.0 + self.priority_weight * priority + self.age_weight * (now - since)
+
+    def _working_graph(self, deadlocks, target):
+        """
+        Builds the deadlocked subgraph over store ids as adjacency sets, with
+        the cost of every candidate. In allocation mode each allocation edge
+        r → p becomes a node (r, p) between r and p.
+        """
+        store = self.detector.store
+        lookup = store.lookup
+        now = self.detector.clock()
+        successors, costs = {}, {}
+        for deadlock in deadlocks:
+            processes = {lookup(node) for node in deadlock.processes}
+            members = processes | {lookup(node) for node in deadlock.resources}
+            for node in members:
+                succs = {succ for succ in store.successors(node) if succ in members}
+                if node in processes:
+                    if target == PROCESSES:
+                        costs[node] = self._process_cost(node, now)
+                elif target == ALLOCATIONS:
+                    for succ in [succ for succ in succs if succ in processes]:
+                        edge = (node, succ)
+                        costs[edge] = self._allocation_cost(node, succ, now)
+                        successors[edge] = {succ}
+                        succs.discard(succ)
+                        succs.add(edge)
+                successors[node] = succs
+        return successors, costs
+
+
+def _reverse(successors):
+    predecessors = {node: set() for node in successors}
+    for node, succs in successors.items():
+        for succ in succs:
+            predecessors[succ].add(node)
+    return predecessors
+
+
+def _greedy(successors, predecessors, costs, deadline):
+    """
+    Greedy weighted feedback vertex set; mutates the adjacency sets.
+
+    Non-candidates with a single predecessor or successor are bypassed, so
+    a resource held by one process turns into direct process-to-process
+    waits and degrees count the waits a victim would really break.
+
+    Returns:
+        tuple: (victims, exhausted) where exhausted means the deadline hit
+            and every remaining candidate was taken as it stood
+    """
+    alive = set(successors)
+    victims = []
+    pending = list(alive)
+    heap = []
+
+    def push(node):
+        degree = len(successors[node]) * len(predecessors[node])
+        if degree:
+            heapq.heappush(heap, (costs[node] / degree, degree, node))
+
+    def touch(node):
+        pending.append(node)
+        if node in costs:
+            push(node)
+
+    def remove(node):
+        alive.discard(node)
+        for succ in successors.pop(node):
+            if succ != node:
+                predecessors[succ].discard(node)
+                touch(succ)
+        for pred in predecessors.pop(node):
+            if pred != node:
+                successors[pred].discard(node)
+                touch(pred)
+
+    def bypass(node):
+        preds, succs = list(predecessors[node]), list(successors[node])
+        remove(node)
+        for pred in preds:
+            for succ in succs:
+                if succ not in successors[pred]:
+                    successors[pred].add(succ)
+                    predecessors[succ].add(pred)
+                    touch(pred)
+                    touch(succ)
+
+    def reduce():
+        while pending:
+            node = pending.pop()
+            if node not in alive:
+                continue
+            succs, preds = successors[node], predecessors[node]
+            if not succs or not preds:
+                remove(node)
+            elif node in succs:
+                if node in costs:
+                    # A candidate waiting on itself has to go whatever it costs.
+                    victims.append(node)
+                    remove(node)
+            elif node not in costs and (len(succs) == 1 or len(preds) == 1):
+                bypass(node)
+
+    reduce()
+    for node in alive:
+        if node in costs:
+            push(node)
+
+    picks = 0
+    while heap:
+        picks += 1
+        if picks % CHECK_EVERY == 0 and time.perf_counter() > deadline:
+            victims.extend(node for node in alive if node in costs)
+            return victims, True
+        _, degree, node = heapq.heappop(heap)
+        if node not in alive or degree != len(successors[node]) * len(predecessors[node]):
+            continue  # stale entry; a fresh one was pushed when the degree changed
+        victims.append(node)
+        remove(node)
+        reduce()
+    return victims, False
+
+
+def _drop_redundant(successors, predecessors, victims, costs, deadline):
+    """
+    Puts victims back, most expensive first, whenever doing so closes no
+    cycle. A topological order of the graph without the victims answers
+    most checks from the victim's neighbours alone; otherwise only the
+    window of the order between its successors and predecessors is
+    searched and reordered (Pearce-Kelly).
+
+    Returns:
+        tuple: (victims, finished) where finished is False if the deadline
+            cut the pass short
+    """
+    removed = set(victims)
+    order = _topological_order(successors, removed)
+    for victim in sorted(victims, key=costs.__getitem__, reverse=True):
+        if time.perf_counter() > deadline:
+            return [v for v in victims if v in removed], False
+        if victim in successors[victim]:
+            continue
+        preds = [pred for pred in predecessors[victim] if pred not in removed]
+        succs = [succ for succ in successors[victim] if succ not in removed]
+        low = max((order[pred] for pred in preds), default=None)
+        high = min((order[succ] for succ in succs), default=None)
+        if low is None or high is None or low < high:
+            slot = _between(low, high)
+        else:
+            # Successors ordered before predecessors: search the window [high, low].
+            forward = _search(successors, succs, removed, order, high, low)
+            if not forward.isdisjoint(preds):
+                continue  # putting it back would close a cycle
+            backward = _search(predecessors, preds, removed, order, high, low)
+            slots = sorted(order[node] for node in forward | backward)
+            backward = sorted(backward, key=order.__getitem__)
+            forward = sorted(forward, key=order.__getitem__)
+            for node, value in zip(backward + forward, slots):
+                order[node] = value
+            slot = _between(slots[len(backward) - 1], slots[len(backward)])
+        removed.discard(victim)
+        if slot is None:
+            order = _topological_order(successors, removed)
+        else:
+            order[victim] = slot
+    return [v for v in victims if v in removed], True
+
+
+def _between(low, high):
+    """Returns an order value strictly between low and high, or None if floats ran out."""
+    if low is None and high is None:
+        return 0.0
+    if low is None:
+        return high - 1.0
+    if high is None:
+        return low + 1.0
+    middle = (low + high) / 2
+    return middle if low < middle < high else None
+
+
+def _topological_order(successors, removed):
+    """Kahn's algorithm over the nodes not removed; the graph must be acyclic there."""
+    indegree = dict.fromkeys(successors, 0)
+    for node, succs in successors.items():
+        if node not in removed:
+            for succ in succs:
+                indegree[succ] += 1
+    ready = [node for node, degree in indegree.items() if not degree and node not in removed]
+    order = {}
+    while ready:
+        node = ready.pop()
+        order[node] = float(len(order))
+        for succ in successors[node]:
+            if succ not in removed:
+                indegree[succ] -= 1
+                if not indegree[succ]:
+                    ready.append(succ)
+    return order
+
+
+def _search(neighbours, starts, removed, order, low, high):
+    """Collects the nodes reachable from starts through nodes ordered within [low, high]."""
+    seen = {start for start in starts if low <= order[start] <= high}
+    stack = list(seen)
+    while stack:
+        node = stack.pop()
+        for neighbour in neighbours[node]:
+            if neighbour not in seen and neighbour not in removed and low <= order[neighbour] <= high:
+                seen.add(neighbour)
+                stack.append(neighbour)
+    return seen
@@ -0,0 +1,92 @@
+def strongly_connected_components(nodes, successors):
+    """
+    Iterative Tarjan's algorithm, linear in nodes + edges and safe for deep graphs.
+
+    Args:
+        nodes (iterable): Nodes to visit
+        successors (callable): Returns the successors of a node
+
+    Returns:
+        list: Components as lists of nodes, in reverse topological order
+    """
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors(root)))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors(child))))
+                    break
+                if child in on_stack and index[child] < low[node]:
+                    low[node] = index[child]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def cyclic_components(nodes, successors):
+    """Returns the components that contain a cycle (more than one node or a self-loop)."""
+    return [
+        component for component in strongly_connected_components(nodes, successors)
+        if len(component) > 1 or component[0] in successors(component[0])
+    ]
+
+
+def find_cycle(nodes, successors):
+    """
+    Iterative depth-first search that stops at the first back edge.
+
+    Returns:
+        list: Nodes of one cycle, or None if the graph is acyclic
+    """
+    state = {}  # 1 while on the DFS path, 2 once finished
+    for root in nodes:
+        if root in state:
+            continue
+        state[root] = 1
+        path = [root]
+        work = [iter(successors(root))]
+        while work:
+            for child in work[-1]:
+                seen = state.get(child)
+                if seen == 1:
+                    return path[path.index(child):]
+                if seen is None:
+                    state[child] = 1
+                    path.append(child)
+                    work.append(iter(successors(child)))
+                    break
+            else:
+                work.pop()
+                state[path.pop()] = 2
+    return None
@@ -0,0 +1,56 @@
+"""
+Randomized differential tests of the Banker's safety check against brute force.
+"""
+import random
+from itertools import permutations
+import pytest
+from bankers import BankersAvoidance
+
+
+def brute_force_safe(available, allocation, max_claim):
+    """Tries every completion order of the processes."""
+    need = max_claim - allocation
+    for order in permutations(range(len(allocation))):
+        work = available.copy()
+        for process in order:
+            if (need[process] > work).any():
+                break
+            work += allocation[process]
+        else:
+            return True
+    return False
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_safety_matches_brute_force(seed):
+    rng = random.Random(seed)
+    banker = BankersAvoidance()
+    resources = [f"R{i}" for i in range(rng.randrange(1, 4))]
+    for resource in resources:
+        banker.add_resource(resource, rng.randrange(1, 6))
+    processes = [f"P{i}" for i in range(rng.randrange(1, 6))]
+    for process in processes:
+        banker.add_process(process, {resource: rng.randrange(0, 5) for resource in resources})
+
+    for _ in range(30):
+        process, resource = rng.choice(processes), rng.choice(resources)
+        row, col = banker.processes[process], banker.resources[resource]
+        if rng.random() < 0.2:
+            banker.release(process, resource)
+        elif banker.need[row, col] > 0 and banker.available[col] > 0:
+            amount = rng.randrange(1, min(banker.need[row, col], banker.available[col]) + 1)
+            allocation = banker.allocation.copy()
+            allocation[row, col] += amount
+            available = banker.available.copy()
+            available[col] -= amount
+            expected = brute_force_safe(available, allocation, banker.max_claim.copy())
+            assert banker.can_grant(process, resource, amount) == expected
+            assert banker.request(process, resource, amount) == expected
+        elif rng.random() < 0.3:
+            # Shrinking a pool, down to what is held, can make the state unsafe.
+            held = int(banker.allocation[:, col].sum())
+            banker.add_resource(resource, rng.randrange(held, held + 3))
+        assert banker.is_safe() == brute_force_safe(
+            banker.available.copy(), banker.allocation.copy(), banker.max_claim.copy()
+        )
+        assert (banker.available >= 0).all()
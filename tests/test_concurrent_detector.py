@@ -0,0 +1,86 @@
+"""
+Tests of the concurrent detector's writer thread.
+"""
+import random
+import threading
+import pytest
+from concurrent_detector import ConcurrentDeadlockDetector
+from deadlock_detector import EXCLUSIVE, SHARED, DeadlockDetector
+
+
+@pytest.fixture
+def detector():
+    detector = ConcurrentDeadlockDetector(max_batch=16)
+    yield detector
+    detector.close()
+
+
+def test_concurrent_producers_match_a_single_detector(detector):
+    rng = random.Random(0)
+    # Each thread owns its processes, so the final graph does not depend on interleaving.
+    scripts = [
+        [(rng.choice(("add_dependency", "allocate_resource", "release_resource")),
+          f"P{thread}.{rng.randrange(5)}", f"R{rng.randrange(10)}") for _ in range(300)]
+        for thread in range(4)
+    ]
+    threads = [
+        threading.Thread(target=lambda script=script: [getattr(detector, op)(p, r) for op, p, r in script])
+        for script in scripts
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    snapshot = detector.flush()
+
+    expected = DeadlockDetector()
+    for script in scripts:
+        for op, process, resource in script:
+            try:
+                getattr(expected, op)(process, resource)
+            except ValueError:
+                pass
+    assert sorted(detector.query(lambda live: live.edges())) == sorted(expected.edges())
+    assert snapshot.deadlocked == expected.detect_deadlock()[0]
+    assert snapshot.edge_count == len(expected.edges())
+
+
+def test_invalid_events_are_rejected_alone(detector):
+    detector.apply_events([
+        ("R1", "P1", "allocate"), ("P1", "R2", "bogus"), ("R1", "P2", "request"), ("P2", "R1"),
+        ("R2", "P2", "allocate"), ("P1", "R2", "request"), ("P2", "R1", "request"),
+    ])
+    snapshot = detector.flush()
+    assert detector.events_rejected == 3
+    assert snapshot.deadlocked
+
+
+def test_unexpected_failures_keep_the_writer_alive(detector, monkeypatch):
+    add_edge = detector.detector._add_edge
+
+    def failing(source, target, *args, **kwargs):
+        if source == "P9":
+            raise RuntimeError("disk on fire")
+        return add_edge(source, target, *args, **kwargs)
+
+    monkeypatch.setattr(detector.detector, "_add_edge", failing)
+    detector.apply_events([("R1", "P1", "allocate"), ("P9", "R1", "request"), ("P1", "R2", "request")])
+    detector.flush()
+    assert detector.events_rejected == 1
+    assert isinstance(detector.last_rejected[1], RuntimeError)
+    assert sorted(detector.query(lambda live: live.edges())) == [("P1", "R2"), ("R1", "P1")]
+    detector.add_dependency("P2", "R1")
+    assert detector.flush().edge_count == 3
+
+
+def test_shared_locks(detector):
+    detector.allocate_resource("P1", "R1", SHARED)
+    detector.allocate_resource("P2", "R2", SHARED)
+    detector.add_dependency("P1", "R2", SHARED)
+    detector.add_dependency("P2", "R1", SHARED)
+    assert not detector.flush().deadlocked
+    assert detector.query(lambda live: live.edge_info("R1", "P1").mode) == SHARED
+    # Upgrading both requests makes each wait on the other.
+    detector.add_dependency("P1", "R2", EXCLUSIVE)
+    detector.add_dependency("P2", "R1", EXCLUSIVE)
+    assert detector.flush().deadlocked
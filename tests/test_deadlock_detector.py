@@ -0,0 +1,200 @@
+"""
+Randomized differential tests of the detector against small reference models.
+"""
+import random
+import networkx as nx
+import numpy as np
+import pytest
+from deadlock_detector import ALLOCATE, EXCLUSIVE, RELEASE, REQUEST, SHARED, DeadlockDetector
+
+
+def random_event(rng, processes=6, resources=6):
+    process, resource = f"P{rng.randrange(processes)}", f"R{rng.randrange(resources)}"
+    mode = rng.choice((SHARED, EXCLUSIVE))
+    kind = rng.choice(("request", "request", "allocate", "allocate", "release", "remove"))
+    if kind == "allocate":
+        return resource, process, kind, mode
+    if kind in ("release", "remove") and rng.random() < 0.5:
+        return resource, process, kind, mode
+    return process, resource, kind, mode
+
+
+def apply_one(edges, event):
+    """Reference semantics of a single event on a {(src, dst): mode} dict."""
+    src, dst, kind, mode = event
+    if kind == "release":
+        edges.pop((src, dst), None)
+        edges.pop((dst, src), None)
+    elif kind == "remove":
+        edges.pop((src, dst), None)
+    else:
+        if kind == "allocate":
+            edges.pop((dst, src), None)
+        edges[(src, dst)] = mode
+
+
+def deadlocked_processes(edges, since=None, cutoff=None):
+    """
+    Processes on a cycle of real waits: a request waits on every holder of
+    its resource, unless both the request and the holding are shared.
+    """
+    waits = nx.DiGraph()
+    for (process, resource), mode in edges.items():
+        if not process.startswith("P"):
+            continue
+        if cutoff is not None and since[(process, resource)] > cutoff:
+            continue
+        for (holder_resource, holder), held in edges.items():
+            if holder_resource == resource and not (mode == SHARED and held == SHARED):
+                waits.add_edge(process, holder)
+    return {
+        node for component in nx.strongly_connected_components(waits)
+        if len(component) > 1 or any(waits.has_edge(node, node) for node in component)
+        for node in component
+    }
+
+
+def edge_modes(detector):
+    return {edge: detector.edge_info(*edge).mode for edge in detector.edges()}
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_apply_events_has_the_net_effect_of_its_events(seed):
+    rng = random.Random(seed)
+    detector = DeadlockDetector(incremental=seed % 2 == 0)
+    expected = {}
+    for _ in range(30):
+        batch = [random_event(rng) for _ in range(rng.randrange(1, 12))]
+        for event in batch:
+            apply_one(expected, event)
+        deadlocked, _ = detector.apply_events(batch)
+        assert edge_modes(detector) == expected
+        assert deadlocked == bool(deadlocked_processes(expected))
+
+
+def test_apply_events_accepts_numpy_arrays():
+    ring = [("R1", "P1", ALLOCATE), ("R2", "P2", ALLOCATE), ("P1", "R2", REQUEST), ("P2", "R1", REQUEST)]
+    plain = DeadlockDetector()
+    assert plain.apply_events(np.array(ring))[0]
+
+    records = np.array(ring, dtype=[("src", "U8"), ("dst", "U8"), ("kind", "u1")])
+    structured = DeadlockDetector()
+    assert structured.apply_events(records)[0]
+    assert sorted(structured.edges()) == sorted(plain.edges())
+
+    release = np.array([("P1", "R2", RELEASE)], dtype=records.dtype)
+    assert structured.apply_events(release) == (False, None)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_lock_modes_and_wait_ages_match_brute_force(seed):
+    rng = random.Random(seed)
+    now = [0.0]
+    detectors = [DeadlockDetector(incremental=incremental, clock=lambda: now[0]) for incremental in (False, True)]
+    expected, since = {}, {}
+    for _ in range(rng.randrange(1, 40)):
+        now[0] += 1
+        event = random_event(rng, processes=rng.randrange(2, 8), resources=rng.randrange(2, 8))
+        before = set(expected)
+        apply_one(expected, event)
+        for edge in set(expected) - before:
+            since[edge] = now[0]
+        for detector in detectors:
+            detector.apply_events([event])
+    for min_age in (None, 0, 3, 10):
+        cutoff = None if min_age is None else now[0] - min_age
+        wanted = deadlocked_processes(expected, since, cutoff)
+        for detector in detectors:
+            found = set().union(*(d.processes for d in detector.find_deadlocks(min_age=min_age)))
+            assert found == wanted
+            if min_age is None:
+                assert detector.detect_deadlock()[0] == bool(wanted)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_snapshot_keeps_modes_and_ages(seed):
+    rng = random.Random(seed)
+    now = [0.0]
+    detector = DeadlockDetector(clock=lambda: now[0])
+    for _ in range(40):
+        now[0] += 1
+        detector.apply_events([random_event(rng)])
+    copy = DeadlockDetector.from_snapshot(detector.snapshot(), incremental=True, clock=lambda: now[0])
+    assert {e: copy.edge_info(*e) for e in copy.edges()} == {e: detector.edge_info(*e) for e in detector.edges()}
+    assert copy.detect_deadlock()[0] == detector.detect_deadlock()[0]
+
+
+def test_mode_changes_keep_age_and_notify():
+    now = [1.0]
+    detector = DeadlockDetector(clock=lambda: now[0])
+    changes = []
+    detector.subscribe(lambda *change: changes.append(change))
+    detector.allocate_resource("P1", "R1", SHARED)
+    now[0] = 5.0
+    detector.allocate_resource("P1", "R1", EXCLUSIVE)
+    assert detector.edge_info("R1", "P1").since == 1.0
+    assert detector.edge_info("R1", "P1").mode == EXCLUSIVE
+    assert changes[-2:] == [("add", "R1", "P1"), ("mode", "R1", "P1")]
+
+
+def test_nodes_keep_the_role_they_were_first_given():
+    detector = DeadlockDetector()
+    detector.apply_events([("lock", "worker", "allocate")])
+    assert detector.node_kind("worker") == "process"
+    assert detector.node_kind("lock") == "resource"
+    with pytest.raises(ValueError, match="'worker' is a process"):
+        detector.apply_events([("worker", "lock", "allocate")])
+    assert detector.edges() == [("lock", "worker")]
+
+
+def test_apply_valid_events_skips_only_invalid_events():
+    detector = DeadlockDetector()
+    result, rejected = detector.apply_valid_events([
+        ("R1", "P1", "allocate"),
+        ("R1", "P2", "request"),
+        ("P1", "R2", "bogus"),
+        ("P1", "R2", "request"),
+    ])
+    assert [index for index, _, _ in rejected] == [1, 2]
+    assert sorted(detector.edges()) == [("P1", "R2"), ("R1", "P1")]
+    assert result == (False, None)
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_detection_is_cached_per_graph_version(incremental):
+    detector = DeadlockDetector(incremental=incremental)
+    detector.apply_events([
+        ("R1", "P1", "allocate"), ("R2", "P2", "allocate"),
+        ("P1", "R2", "request"), ("P2", "R1", "request"),
+    ])
+    version = detector.version
+    detected, found = detector.detect_deadlock(), detector.find_deadlocks()
+    assert detector.detect_deadlock() is detected
+    assert detector.find_deadlocks() == found
+
+    detector.add_dependency("P1", "R2")  # already there
+    assert detector.version == version
+    assert detector.detect_deadlock() is detected
+
+    # Unrelated changes still move the version on and report the same cycle.
+    for change in (
+        lambda: detector.add_dependency("P3", "R3"),
+        lambda: detector.allocate_resource("P3", "R4", SHARED),
+        lambda: detector.allocate_resource("P3", "R4", EXCLUSIVE),
+        lambda: detector.release_resource("P3", "R3"),
+    ):
+        change()
+        assert detector.version == version + 1
+        version = detector.version
+        assert detector.detect_deadlock()[0]
+        assert detector.find_deadlocks() == found
+    if incremental:
+        # No new nodes since the last scan, so the component kept its entry.
+        detector.add_dependency("P3", "R3")
+        kept = detector.find_deadlocks()[0]
+        detector.release_resource("P3", "R3")
+        assert detector.find_deadlocks()[0] is kept
+
+    detector.release_resource("P1", "R2")
+    assert detector.detect_deadlock() == (False, None)
+    assert detector.find_deadlocks() == []
@@ -0,0 +1,130 @@
+"""
+Tests of distributed detection: site summaries merged by a coordinator
+against one detector over every site's edges.
+"""
+import asyncio
+import json
+import random
+import pytest
+from deadlock_detector import DeadlockDetector
+from distributed import Coordinator, CoordinatorServer, SiteClient, SiteDetector
+
+RING = [
+    [("S0.R", "T0", "allocate"), ("T2", "S0.R", "request")],
+    [("S1.R", "T1", "allocate"), ("T0", "S1.R", "request")],
+    [("S2.R", "T2", "allocate"), ("T1", "S2.R", "request")],
+]
+
+
+def random_sites(rng, sites=3, processes=8, resources=4, events=12):
+    """Per-site events over site-local resources and processes shared by every site."""
+    tables = []
+    for site in range(sites):
+        holders = {}
+        local = []
+        for _ in range(events):
+            resource = f"S{site}.R{rng.randrange(resources)}"
+            process = f"P{rng.randrange(processes)}"
+            if resource not in holders:
+                holders[resource] = process
+                local.append((resource, process, "allocate"))
+            elif holders[resource] != process:
+                local.append((process, resource, "request"))
+        tables.append(local)
+    return tables
+
+
+def settle(sites, coordinator):
+    """Exchanges reports and shared-process notices until every site is up to date."""
+    by_name = {site.name: site for site in sites}
+    while True:
+        reports = [report for report in (site.report() for site in sites) if report]
+        if not reports:
+            return
+        for report in reports:
+            for name, processes in coordinator.receive(report).items():
+                by_name[name].share(processes)
+
+
+def globally_deadlocked(tables, shared):
+    """Shared processes on a cycle of the union of every site's graph."""
+    detector = DeadlockDetector()
+    for events in tables:
+        detector.apply_events(events)
+    return {process for deadlock in detector.find_deadlocks() for process in deadlock.processes} & shared
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_coordinator_matches_one_detector_over_every_site(seed):
+    rng = random.Random(seed)
+    tables = random_sites(rng)
+    sites = [SiteDetector(f"S{i}") for i in range(len(tables))]
+    coordinator = Coordinator()
+    for site, events in zip(sites, tables):
+        site.detector.apply_events(events)
+    settle(sites, coordinator)
+    found = {process for deadlock in coordinator.deadlocks() for process in deadlock.processes}
+    assert found == globally_deadlocked(tables, coordinator.shared())
+
+    # Summaries keep up with removals, and a site that leaves takes its edges along.
+    for site, events in zip(sites, tables):
+        site.detector.apply_events([(src, dst, "remove") for src, dst, _ in events[::2]])
+        del events[::2]
+    settle(sites, coordinator)
+    found = {process for deadlock in coordinator.deadlocks() for process in deadlock.processes}
+    assert found == globally_deadlocked(tables, coordinator.shared())
+    for site in sites:
+        coordinator.forget(site.name)
+    assert coordinator.number_of_edges() == 0
+
+
+def test_ring_across_sites_is_reported_with_its_sites():
+    sites = [SiteDetector(f"S{i}") for i in range(3)]
+    coordinator = Coordinator()
+    for site, events in zip(sites, RING):
+        site.detector.apply_events(events)
+        assert not site.detector.detect_deadlock()[0]
+    settle(sites, coordinator)
+    assert coordinator.shared() == {"T0", "T1", "T2"}
+    assert sites[0].summary() == {("T2", "T0")}
+    (deadlock,) = coordinator.deadlocks()
+    assert deadlock.processes == {"T0", "T1", "T2"}
+    assert deadlock.sites == {"S0", "S1", "S2"}
+
+    sites[1].detector.apply_events([("T0", "S1.R", "remove")])
+    settle(sites, coordinator)
+    assert coordinator.deadlocks() == []
+    assert all(site.report() is None for site in sites)
+
+
+def test_sites_and_subscribers_over_tcp():
+    async def body():
+        server = await CoordinatorServer().start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, subscriber = await asyncio.open_connection("127.0.0.1", port)
+        subscriber.write(b"subscribe\n")
+        await subscriber.drain()
+        while not server._subscribers:
+            await asyncio.sleep(0.01)
+        clients = []
+        try:
+            for i, events in enumerate(RING):
+                site = SiteDetector(f"S{i}")
+                site.detector.apply_events(events)
+                clients.append(await SiteClient(site).connect("127.0.0.1", port))
+            alert = json.loads(await asyncio.wait_for(reader.readline(), 5))
+            assert alert["event"] == "deadlock"
+            assert alert["deadlocks"] == [{"processes": ["T0", "T1", "T2"], "sites": ["S0", "S1", "S2"]}]
+
+            # A site that disconnects takes its part of the cycle along.
+            await clients.pop().close()
+            alert = json.loads(await asyncio.wait_for(reader.readline(), 5))
+            assert alert["event"] == "resolved"
+            assert server.messages_in >= 3
+        finally:
+            for client in clients:
+                await client.close()
+            subscriber.close()
+            await asyncio.wait_for(server.close(), 5)
+
+    asyncio.run(body())
@@ -0,0 +1,92 @@
+"""
+Tests of the asyncio event-ingestion server.
+"""
+import asyncio
+import json
+from deadlock_detector import ALLOCATE, SHARED
+from event_server import BINARY_MAGIC, MAX_FRAME_SIZE, DeadlockServer, decode_frame, encode_frame
+
+DEADLOCK = b"allocate P1 R1\nallocate P2 R2\nrequest P1 R2\nrequest P2 R1\n"
+
+
+def serve(test):
+    """Runs test(server, port) against a fresh server on a loopback port."""
+    async def body():
+        server = await DeadlockServer().start("127.0.0.1", 0)
+        try:
+            await asyncio.wait_for(test(server, server.sockets[0].getsockname()[1]), 10)
+        finally:
+            await asyncio.wait_for(server.close(), 5)
+    asyncio.run(body())
+
+
+def test_close_with_clients_still_connected():
+    async def test(server, port):
+        _, subscriber = await asyncio.open_connection("127.0.0.1", port)
+        subscriber.write(b"subscribe\n")
+        _, producer = await asyncio.open_connection("127.0.0.1", port)
+        producer.write(b"request P1 R1\n")
+        await producer.drain()
+        while not server._subscribers or not server.events_applied:
+            await asyncio.sleep(0.01)
+    serve(test)
+
+
+def test_lines_and_frames_reach_the_detector():
+    async def test(server, port):
+        reader, subscriber = await asyncio.open_connection("127.0.0.1", port)
+        subscriber.write(b"subscribe\n")
+        await subscriber.drain()
+        while not server._subscribers:
+            await asyncio.sleep(0.01)
+        _, lines = await asyncio.open_connection("127.0.0.1", port)
+        lines.write(DEADLOCK[:30])
+        _, frames = await asyncio.open_connection("127.0.0.1", port)
+        frames.write(BINARY_MAGIC + encode_frame("P1", "R2", "request") + encode_frame("P2", "R1", "request"))
+        alert = json.loads(await reader.readline())
+        assert alert == {"event": "deadlock", "deadlocks": [{"processes": ["P1", "P2"], "resources": ["R1", "R2"]}]}
+    serve(test)
+
+
+def test_shared_locks_over_frames():
+    assert decode_frame(encode_frame("R1", "P1", "allocate", SHARED)[4:]) == ("R1", "P1", ALLOCATE, SHARED)
+
+    async def test(server, port):
+        _, frames = await asyncio.open_connection("127.0.0.1", port)
+        frames.write(BINARY_MAGIC + b"".join(encode_frame(*event) for event in [
+            ("R1", "P1", "allocate", SHARED), ("R1", "P2", "allocate", SHARED),
+            ("P1", "R1", "request", SHARED),
+        ]))
+        while server.events_applied < 3:
+            await asyncio.sleep(0.01)
+        assert server.detector.edge_info("R1", "P2").mode == SHARED
+        assert server.detector.detect_deadlock() == (False, None)
+    serve(test)
+
+
+def test_malformed_input_is_counted_not_raised():
+    async def test(server, port):
+        _, lines = await asyncio.open_connection("127.0.0.1", port)
+        lines.write(b"request P1\n" + b"x" * (1 << 17) + b"\n" + b'{"kind": []}\n' + b"request P1 R1\n")
+        _, frames = await asyncio.open_connection("127.0.0.1", port)
+        frames.write(BINARY_MAGIC + b"\x00\x00\x00\x01\x00" + b"\x00\x00\x00\x04\x00\x00\x09P" + encode_frame("P2", "R2", "request"))
+        while server.events_applied < 2:
+            await asyncio.sleep(0.01)
+        assert server.events_rejected >= 4
+        # A frame longer than MAX_FRAME_SIZE ends the connection.
+        reader, huge = await asyncio.open_connection("127.0.0.1", port)
+        huge.write(BINARY_MAGIC + (MAX_FRAME_SIZE + 1).to_bytes(4, "big"))
+        assert await reader.read() == b""
+        assert sorted(server.detector.edges()) == [("P1", "R1"), ("P2", "R2")]
+    serve(test)
+
+
+def test_batches_count_only_their_rejected_events():
+    async def test(server, port):
+        _, lines = await asyncio.open_connection("127.0.0.1", port)
+        lines.write(b"allocate P1 R1\nrequest R1 P2\nrequest P2 R1\n")
+        while server.events_applied + server.events_rejected < 3:
+            await asyncio.sleep(0.01)
+        assert (server.events_applied, server.events_rejected) == (2, 1)
+        assert server.last_rejected[0] == ("R1", "P2", "request", "exclusive")
+    serve(test)
@@ -0,0 +1,64 @@
+"""
+Tests of the large-graph rendering mode.
+"""
+import json
+import random
+import pytest
+from graph_visualizer import render_large_graph
+
+
+def page_data(path):
+    """Returns the constants the large-graph page defines, by name."""
+    data = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.startswith("const ") and " = " in line and line.rstrip().endswith(";"):
+                name, _, value = line[len("const "):].rstrip().rstrip(";").partition(" = ")
+                try:
+                    data[name] = json.loads(value)
+                except ValueError:
+                    pass
+    return data
+
+
+def random_graph(seed, processes=300):
+    rng = random.Random(seed)
+    edges = set()
+    for p in range(processes):
+        edges.add((f"R{rng.randrange(processes)}", f"P{p}"))
+        edges.add((f"P{p}", f"R{rng.randrange(processes)}"))
+    # One certain deadlock: two processes each holding what the other wants.
+    edges |= {("RA", "PA"), ("PA", "RB"), ("RB", "PB"), ("PB", "RA")}
+    nodes = sorted({node for edge in edges for node in edge})
+    return nodes, sorted(edges)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_every_node_and_edge_is_drawn_or_aggregated(tmp_path, seed):
+    nodes, edges = random_graph(seed)
+    path = render_large_graph(
+        nodes, edges, output_file=str(tmp_path / "graph.html"), open_browser=False,
+        max_aggregates=20, processes=[node for node in nodes if node.startswith("P")]
+    )
+    data = page_data(path)
+    visible = {record[0]: record for record in data["visibleNodes"]}
+    assert {"PA", "PB", "RA", "RB"} <= {name for name, record in visible.items() if record[1] == "deadlocked"}
+    assert len(data["aggregates"]) <= 20
+
+    members = [record[0] for group in data["expansions"].values() for record in group["nodes"]]
+    assert sorted(list(visible) + members) == nodes
+    assert sum(size for _, size, _, _, _ in data["aggregates"]) == len(members)
+
+    drawn = [tuple(edge) for group in data["expansions"].values() for edge in group["edges"]]
+    drawn += [(u, v) for u, v, _ in data["visibleEdges"] if u in visible and v in visible]
+    assert sorted(drawn) == edges
+
+
+def test_given_deadlocked_nodes_are_highlighted(tmp_path):
+    nodes, edges = random_graph(0, processes=50)
+    path = render_large_graph(
+        nodes, edges, deadlocked_nodes={"P1", "missing"}, output_file=str(tmp_path / "graph.html"),
+        open_browser=False
+    )
+    kinds = {record[0]: record[1] for record in page_data(path)["visibleNodes"]}
+    assert [name for name, kind in kinds.items() if kind == "deadlocked"] == ["P1"]
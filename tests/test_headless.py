@@ -0,0 +1,56 @@
+"""
+Tests of headless event parsing and alerting.
+"""
+import io
+import json
+import pytest
+from deadlock_detector import EXCLUSIVE, SHARED, DeadlockDetector
+from headless import AlertEmitter, main, parse_event, run
+
+DEADLOCK = ["allocate P1 R1", "allocate P2 R2", "request P1 R2", "request P2 R1"]
+
+
+def test_parse_event():
+    assert parse_event("request P1 R1") == ("P1", "R1", "request", EXCLUSIVE)
+    assert parse_event("allocate P1 R1 shared") == ("R1", "P1", "allocate", SHARED)
+    assert parse_event('{"kind": "release", "process": "P1", "resource": "R1"}') == (
+        "P1", "R1", "release", EXCLUSIVE
+    )
+    assert parse_event("   ") is None
+    assert parse_event("# comment") is None
+    for line in ("request P1", "grab P1 R1", "request P1 R1 sometimes"):
+        with pytest.raises(ValueError):
+            parse_event(line)
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 100])
+def test_alerts_on_deadlock_and_resolution(batch_size):
+    detector = DeadlockDetector(incremental=True)
+    output = io.StringIO()
+    count = run(DEADLOCK + ["release P1 R1"], detector, AlertEmitter(detector, output), batch_size)
+    assert count == 5
+    alerts = [json.loads(line) for line in output.getvalue().splitlines()]
+    if batch_size >= 5:
+        assert alerts == []  # the deadlock came and went inside one batch
+        return
+    assert [alert["event"] for alert in alerts] == ["deadlock", "resolved"]
+    assert alerts[0]["deadlocks"] == [{"processes": ["P1", "P2"], "resources": ["R1", "R2"]}]
+
+
+def test_main_reads_files(tmp_path, capsys):
+    path = tmp_path / "events.txt"
+    path.write_text("\n".join(DEADLOCK) + "\n")
+    assert main([str(path), "--throughput"]) == 0
+    out, err = capsys.readouterr()
+    assert json.loads(out.splitlines()[-1])["event"] == "deadlock"
+    assert json.loads(err.splitlines()[-1])["events"] == 4
+
+
+def test_run_reports_bad_lines_and_goes_on(capsys):
+    detector = DeadlockDetector(incremental=True)
+    lines = ["allocate P1 R1", "grab P1 R2", "request R1 P1", "request P2 R1"]
+    assert run(lines, detector, AlertEmitter(detector, io.StringIO()), batch_size=100) == 2
+    errors = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    assert [error["line"] for error in errors] == [2, 3]
+    assert all(error["event"] == "error" for error in errors)
+    assert sorted(detector.edges()) == [("P2", "R1"), ("R1", "P1")]
@@ -0,0 +1,77 @@
+"""
+Tests of detector instrumentation and the metric exporters.
+"""
+import json
+import urllib.request
+import pytest
+from deadlock_detector import DeadlockDetector
+from metrics import Histogram, JsonDumpExporter, Metrics, PrometheusExporter, Rate
+
+
+def deadlocked_detector():
+    detector = DeadlockDetector(incremental=True)
+    detector.apply_events([
+        ("R1", "P1", "allocate"), ("R2", "P2", "allocate"),
+        ("P1", "R2", "request"), ("P2", "R1", "request"),
+    ])
+    return detector
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(0.001, 0.01, 0.1))
+    assert histogram.quantile(0.5) is None
+    for value in (0.0005, 0.005, 0.005, 0.05, 5.0):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.quantile(0.5) == 0.01
+    assert histogram.quantile(1.0) == float("inf")
+    assert histogram.sum == pytest.approx(5.0605)
+
+
+def test_rate_counts_a_sliding_window():
+    now = [100.0]
+    rate = Rate(window=10, clock=lambda: now[0])
+    rate.mark(5)
+    now[0] = 105.5
+    rate.mark(15)
+    assert rate.per_second() == 2.0
+    now[0] = 111.0
+    assert rate.per_second() == 1.5
+
+
+def test_instrument_counts_and_times_operations():
+    metrics = Metrics()
+    detector = metrics.instrument(deadlocked_detector())
+    detector.detect_deadlock()
+    detector.apply_events([("P3", "R3", "request")])
+    assert metrics.counters["apply_events"] == 1
+    assert metrics.counters["detect_deadlock"] >= 1
+    assert metrics.histograms["apply_events"].count == 1
+    snapshot = metrics.snapshot()
+    assert snapshot["gauges"]["graph_nodes"] == 6
+    assert snapshot["gauges"]["graph_edges"] == 5
+    json.dumps(snapshot)
+
+    metrics.uninstrument(detector)
+    calls = metrics.counters["detect_deadlock"]
+    detector.detect_deadlock()
+    assert metrics.counters["detect_deadlock"] == calls
+    # Other detectors were never touched.
+    assert "detect_deadlock" not in vars(DeadlockDetector())
+
+
+def test_exporters(tmp_path):
+    metrics = Metrics()
+    metrics.instrument(deadlocked_detector()).detect_deadlock()
+    exporter = PrometheusExporter(metrics, port=0).start()
+    try:
+        body = urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/metrics", timeout=5).read().decode()
+    finally:
+        exporter.close()
+    assert 'deadlock_operations_total{operation="detect_deadlock"} 1' in body
+    assert "deadlock_graph_edges 4" in body
+    assert 'deadlock_operation_seconds_count{operation="detect_deadlock"} 1' in body
+
+    path = tmp_path / "metrics.json"
+    JsonDumpExporter(metrics, str(path), interval=60).start().close()
+    assert json.loads(path.read_text())["counters"] == {"detect_deadlock": 1}
@@ -0,0 +1,72 @@
+"""
+Randomized differential tests of parallel detection against NetworkX.
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor
+import networkx as nx
+import numpy as np
+import pytest
+from deadlock_detector import DeadlockDetector, SHARED
+from parallel_detection import find_cyclic_components, weak_components
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def random_csr(seed, count=200):
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(count))
+    graph.add_edges_from((rng.randrange(count), rng.randrange(count)) for _ in range(rng.randrange(count // 2, count)))
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    indices = []
+    for node in range(count):
+        successors = sorted(graph.successors(node))
+        indices.extend(successors)
+        indptr[node + 1] = len(indices)
+    return graph, indptr, np.array(indices, dtype=np.int64)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_weak_components_match_networkx(seed):
+    graph, indptr, indices = random_csr(seed)
+    labels = weak_components(len(graph), indptr, indices)
+    for component in nx.weakly_connected_components(graph):
+        assert set(labels[list(component)].tolist()) == {min(component)}
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_cyclic_components_match_networkx(seed, executor):
+    graph, indptr, indices = random_csr(seed)
+    expected = sorted(
+        sorted(component) for component in nx.strongly_connected_components(graph)
+        if len(component) > 1 or any(graph.has_edge(node, node) for node in component)
+    )
+    for kwargs in ({}, {"executor": executor, "min_parallel_edges": 0}):
+        found = find_cyclic_components(len(graph), indptr, indices, **kwargs)
+        assert sorted(sorted(int(node) for node in component) for component in found) == expected
+
+
+@pytest.mark.parametrize("backend", ["compact", "networkx"])
+@pytest.mark.parametrize("seed", range(5))
+def test_detector_parallel_matches_find_deadlocks(seed, backend):
+    rng = random.Random(seed)
+    detector = DeadlockDetector(backend=backend)
+    for _ in range(300):
+        process, resource = f"P{rng.randrange(40)}", f"R{rng.randrange(40)}"
+        if rng.random() < 0.5:
+            detector.add_dependency(process, resource)
+        else:
+            detector.allocate_resource(process, resource)
+    key = lambda deadlocks: sorted(sorted(d.processes | d.resources) for d in deadlocks)
+    assert key(detector.find_deadlocks_parallel()) == key(detector.find_deadlocks())
+    # Readers waiting on each other's shared locks form a raw cycle but no deadlock.
+    readers = DeadlockDetector(backend=backend)
+    readers.apply_events([
+        ("RA", "PA", "allocate", SHARED), ("RB", "PB", "allocate", SHARED),
+        ("PA", "RB", "request", SHARED), ("PB", "RA", "request", SHARED),
+    ])
+    assert readers.find_deadlocks_parallel() == []
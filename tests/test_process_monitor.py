@@ -0,0 +1,90 @@
+"""
+Tests of the lock table parser and randomized tests of LockSampler diffs.
+"""
+import random
+import pytest
+from deadlock_detector import EXCLUSIVE, SHARED, DeadlockDetector
+from process_monitor import LockSampler, read_lock_edges
+
+
+def write_locks(path, locks):
+    """
+    Writes locks in /proc/locks format. Each lock is (kind, pid, inode,
+    start, end, waiters) with waiters a list of (kind, pid).
+    """
+    with open(path, "w") as file:
+        for number, (kind, pid, inode, start, end, waiters) in enumerate(locks, 1):
+            file.write(f"{number}: POSIX  ADVISORY  {kind} {pid} 08:01:{inode} {start} {end}\n")
+            for waiter_kind, waiter in waiters:
+                file.write(f"{number}: -> POSIX  ADVISORY  {waiter_kind} {waiter} 08:01:{inode} {start} {end}\n")
+
+
+def expected_edges(locks):
+    edges = {}
+    for kind, pid, inode, start, end, waiters in locks:
+        resource = f"R08:01:{inode}:{start}-{end}:{pid}"
+        for edge, lock_kind in [((resource, f"P{pid}"), kind)] + [((f"P{w}", resource), k) for k, w in waiters]:
+            if edges.get(edge) != EXCLUSIVE:
+                edges[edge] = EXCLUSIVE if lock_kind == "WRITE" else SHARED
+    return edges
+
+
+def test_waiting_on_another_range_is_not_a_deadlock(tmp_path):
+    path = str(tmp_path / "locks")
+    with open(path, "w") as file:
+        file.write("1: POSIX  ADVISORY  WRITE 100 08:01:555 0 10\n")
+        file.write("1: -> POSIX  ADVISORY  WRITE 200 08:01:555 0 10\n")
+        file.write("2: POSIX  ADVISORY  WRITE 200 08:01:555 20 30\n")
+    assert read_lock_edges(path) == {
+        ("R08:01:555:0-10:100", "P100"): ("allocate", EXCLUSIVE),
+        ("P200", "R08:01:555:0-10:100"): ("request", EXCLUSIVE),
+        ("R08:01:555:20-30:200", "P200"): ("allocate", EXCLUSIVE),
+    }
+    detector = DeadlockDetector()
+    LockSampler(detector, locks_path=path, resolve_paths=False).tick()
+    assert detector.detect_deadlock() == (False, None)
+
+
+def test_crossed_waits_are_a_deadlock(tmp_path):
+    path = str(tmp_path / "locks")
+    write_locks(path, [("WRITE", 100, 5, 0, 10, [("WRITE", 200)]), ("WRITE", 200, 5, 20, 30, [("WRITE", 100)])])
+    detector = DeadlockDetector()
+    LockSampler(detector, locks_path=path, resolve_paths=False).tick()
+    deadlocked, nodes = detector.detect_deadlock()
+    assert deadlocked and {"P100", "P200"} <= nodes
+
+
+def test_tick_diffs_each_edge(tmp_path):
+    path = str(tmp_path / "locks")
+    detector = DeadlockDetector(incremental=True)
+    sampler = LockSampler(detector, locks_path=path, resolve_paths=False)
+    write_locks(path, [("WRITE", 100, 5, 0, 9, [("WRITE", 200)]), ("READ", 200, 5, 10, 19, [])])
+    assert sampler.tick() == 3
+    write_locks(path, [("WRITE", 100, 5, 0, 9, []), ("WRITE", 200, 5, 10, 19, [])])
+    assert sampler.tick() == 2
+    assert {edge: detector.edge_info(*edge).mode for edge in detector.edges()} == {
+        ("R08:01:5:0-9:100", "P100"): EXCLUSIVE,
+        ("R08:01:5:10-19:200", "P200"): EXCLUSIVE,
+    }
+    assert sampler.tick() == 0
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_tick_matches_lock_table(tmp_path, seed):
+    rng = random.Random(seed)
+    path = str(tmp_path / "locks")
+    detector = DeadlockDetector(incremental=rng.random() < 0.5)
+    sampler = LockSampler(detector, locks_path=path, resolve_paths=False)
+    for _ in range(15):
+        locks = []
+        for _ in range(rng.randrange(6)):
+            start, holder = rng.randrange(3) * 10, rng.randrange(4)
+            # A process is never blocked by its own lock.
+            waiters = [
+                (rng.choice(("READ", "WRITE")), waiter)
+                for waiter in rng.sample([pid for pid in range(4) if pid != holder], rng.randrange(3))
+            ]
+            locks.append((rng.choice(("READ", "WRITE")), holder, rng.randrange(2), start, start + 9, waiters))
+        write_locks(path, locks)
+        sampler.tick()
+        assert {edge: detector.edge_info(*edge).mode for edge in detector.edges()} == expected_edges(locks)
@@ -0,0 +1,82 @@
+"""
+Randomized tests of the resolution planner.
+"""
+import itertools
+import random
+import networkx as nx
+import pytest
+from deadlock_detector import DeadlockDetector
+from resolution import ResolutionPlanner
+
+
+def random_detector(rng):
+    # A stepped clock gives waits distinct ages that stay put while planning.
+    now = [0.0]
+    detector = DeadlockDetector(incremental=rng.random() < 0.5, clock=lambda: now[0])
+    count = rng.randrange(2, 8)
+    for _ in range(rng.randrange(1, 25)):
+        now[0] += rng.randrange(3)
+        process, resource = f"P{rng.randrange(count)}", f"R{rng.randrange(count)}"
+        if rng.random() < 0.5:
+            detector.add_dependency(process, resource)
+        else:
+            detector.allocate_resource(process, resource)
+    return detector, {f"P{i}": rng.randrange(5) for i in range(count)}
+
+
+def acyclic_without(edges, victims):
+    return nx.is_directed_acyclic_graph(nx.DiGraph(
+        [(u, v) for u, v in edges if u not in victims and v not in victims and (u, v) not in victims]
+    ))
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_plans_break_every_cycle(seed):
+    rng = random.Random(seed)
+    detector, priorities = random_detector(rng)
+    edges = detector.edges()
+    for target in ("processes", "allocations"):
+        for budget in (10.0, 0.0):
+            plan = ResolutionPlanner(detector, priorities).plan(target, budget=budget)
+            assert plan.complete
+            assert acyclic_without(edges, set(plan.victims))
+            if target == "allocations":
+                assert all(detector.node_kind(resource) == "resource" for resource, _ in plan.victims)
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_process_plans_are_never_cheaper_than_optimal(seed):
+    rng = random.Random(seed)
+    detector, priorities = random_detector(rng)
+    planner = ResolutionPlanner(detector, priorities)
+    plan = planner.plan()
+    processes = sorted(set().union(*(d.processes for d in detector.find_deadlocks())))
+    costs = {process: planner.cost(process) for process in processes}
+    best = min(
+        sum(costs[process] for process in victims)
+        for size in range(len(processes) + 1)
+        for victims in itertools.combinations(processes, size)
+        if acyclic_without(detector.edges(), set(victims))
+    )
+    assert plan.cost >= best - 1e-9
+    assert plan.cost == pytest.approx(sum(costs[victim] for victim in plan.victims))
+    assert planner.apply(plan) == (False, None)
+
+
+def test_costs_weigh_priority_held_resources_and_wait_age():
+    now = [0.0]
+    detector = DeadlockDetector(clock=lambda: now[0])
+    detector.allocate_resource("P1", "R1")
+    detector.allocate_resource("P1", "R3")
+    detector.allocate_resource("P2", "R2")
+    detector.add_dependency("P1", "R2")
+    now[0] = 30.0
+    detector.add_dependency("P2", "R1")
+    planner = ResolutionPlanner(detector, {"P2": 1}, age_weight=0.1)
+    now[0] = 50.0
+    assert planner.cost("P1") == pytest.approx(1 + 2 + 0.1 * 50)
+    assert planner.cost("P2") == pytest.approx(1 + 1 + 1 + 0.1 * 20)
+    assert planner.plan().victims == ["P2"]
+    assert planner.allocation_cost("R1", "P1") == pytest.approx(1 + 0.1 * 50)
+    with pytest.raises(ValueError):
+        planner.plan("everything")
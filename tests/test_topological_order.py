@@ -0,0 +1,55 @@
+"""
+Randomized differential tests of the incremental order against NetworkX.
+"""
+import random
+import networkx as nx
+import pytest
+from deadlock_detector import DeadlockDetector
+from topological_order import DynamicTopologicalOrder
+
+
+def cyclic_components(graph):
+    return sorted(
+        sorted(component) for component in nx.strongly_connected_components(graph)
+        if len(component) > 1 or any(graph.has_edge(node, node) for node in component)
+    )
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_components_match_networkx(seed):
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    order = DynamicTopologicalOrder(lambda node: graph.succ[node], lambda node: graph.pred[node])
+    for step in range(200):
+        u, v = rng.randrange(12), rng.randrange(12)
+        if graph.has_edge(u, v):
+            graph.remove_edge(u, v)
+            order.remove_edge(u, v)
+        else:
+            graph.add_edge(u, v)
+            order.insert_edge(u, v)
+        if step % 37 == 0:
+            order.rebuild(list(graph.nodes))
+        assert sorted(sorted(component) for component in order.components()) == cyclic_components(graph)
+        assert (order.find_cycle() is None) == (not cyclic_components(graph))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_detector_matches_full_scan(seed):
+    rng = random.Random(seed)
+    incremental, full = DeadlockDetector(incremental=True), DeadlockDetector()
+    for _ in range(150):
+        process, resource = f"P{rng.randrange(8)}", f"R{rng.randrange(8)}"
+        roll = rng.random()
+        for detector in (incremental, full):
+            if roll < 0.45:
+                detector.add_dependency(process, resource)
+            elif roll < 0.8:
+                detector.allocate_resource(process, resource)
+            else:
+                detector.release_resource(process, resource)
+        assert incremental.detect_deadlock()[0] == full.detect_deadlock()[0]
+        assert (
+            sorted(sorted(d.processes) for d in incremental.find_deadlocks())
+            == sorted(sorted(d.processes) for d in full.find_deadlocks())
+        )
@@ -0,0 +1,59 @@
+"""
+Tests of wait-age scheduling.
+"""
+from deadlock_detector import EXCLUSIVE, SHARED, DeadlockDetector
+from wait_scheduler import WaitAgeScheduler
+
+
+def setup(threshold=10.0):
+    now = [0.0]
+    detector = DeadlockDetector(incremental=True, clock=lambda: now[0])
+    return now, detector, WaitAgeScheduler(detector, threshold)
+
+
+def close_ring(detector, mode=EXCLUSIVE):
+    detector.allocate_resource("P1", "R1", mode)
+    detector.allocate_resource("P2", "R2", mode)
+    detector.add_dependency("P1", "R2", mode)
+    detector.add_dependency("P2", "R1", mode)
+
+
+def test_reports_only_waits_older_than_the_threshold():
+    now, detector, scheduler = setup()
+    close_ring(detector)
+    assert scheduler.next_due() == 10.0
+    now[0] = 5.0
+    assert scheduler.poll() == []
+    assert scheduler.full_scans == 0
+    now[0] = 10.0
+    [deadlock] = scheduler.poll()
+    assert deadlock.processes == {"P1", "P2"}
+    assert scheduler.next_due() is None
+    detector.release_resource("P1", "R1")
+    assert scheduler.poll() == []
+
+
+def test_short_lived_cycles_never_scan():
+    now, detector, scheduler = setup()
+    close_ring(detector)
+    now[0] = 3.0
+    detector.release_resource("P2", "R1")
+    now[0] = 20.0
+    assert scheduler.poll() == []
+    assert scheduler.full_scans == 0
+    assert scheduler.cheap_checks == 4
+
+
+def test_a_lock_turning_exclusive_schedules_a_scan():
+    now, detector, scheduler = setup()
+    close_ring(detector, SHARED)
+    now[0] = 20.0
+    assert scheduler.poll() == []
+    detector.add_dependency("P1", "R2", EXCLUSIVE)
+    detector.add_dependency("P2", "R1", EXCLUSIVE)
+    assert scheduler.next_due() == 30.0
+    now[0] = 30.0
+    assert [deadlock.processes for deadlock in scheduler.poll()] == [{"P1", "P2"}]
+    # Turning it shared again ends the deadlock.
+    detector.add_dependency("P2", "R1", SHARED)
+    assert scheduler.poll() == []
@@ -0,0 +1,229 @@
+from scc import strongly_connected_components
+
+SLOT_GAP = 1 << 20
+
+
+class _Component:
+    """A strongly connected component of more than one node."""
+    __slots__ = ("members",)
+
+    def __init__(self, members):
+        self.members = members
+
+
+class DynamicTopologicalOrder:
+    """
+    Maintains a topological order of the strongly connected components of a
+    directed graph under edge insertions and removals (Pearce-Kelly), so a new
+    edge only searches the region between its endpoints.
+
+    An edge that closes a cycle merges every component on that cycle; removing
+    an edge inside a component re-runs Tarjan on that component alone.
+
+    Args:
+        successors (callable): Returns the successors of a node
+        predecessors (callable): Returns the predecessors of a node
+    """
+
+    def __init__(self, successors, predecessors):
+        self._successors = successors
+        self._predecessors = predecessors
+        self._component = {}
+        self._ord = {}
+        self._at = {}
+        self._next = 0
+        self._cyclic = set()
+        self._self_loops = set()
+
+    def __contains__(self, node):
+        return node in self._component or node in self._ord
+
+    def add_node(self, node):
+        """Places a new node at the end of the order."""
+        if node not in self:
+            self._place(node, self._next)
+            self._next += SLOT_GAP
+
+    def insert_edge(self, u, v):
+        """Adds edge u -> v to the order. Returns True if the edge lies on a cycle."""
+        self.add_node(u)
+        self.add_node(v)
+        if u == v:
+            self._self_loops.add(u)
+            return True
+        cu, cv = self.component_of(u), self.component_of(v)
+        if cu == cv:
+            return True
+        lb, ub = self._ord[cv], self._ord[cu]
+        if lb > ub:
+            return False
+
+        forward = self._search(cv, self._successors, lambda slot: slot <= ub)
+        backward = self._search(cu, self._predecessors, lambda slot: slot >= lb)
+        if cu not in forward:
+            self._reorder(backward, None, forward)
+            return False
+        merged = forward & backward
+        self._reorder(backward - merged, merged, forward - merged)
+        return True
+
+    def remove_edge(self, u, v):
+        """Drops edge u -> v, splitting its component if the edge was holding it together."""
+        if u == v:
+            self._self_loops.discard(u)
+            return
+        cu = self._component.get(u)
+        if cu is not None and cu is self._component.get(v):
+            self._split(cu)
+
+    def rebuild(self, nodes):
+        """Recomputes components and order from scratch in one linear pass."""
+        self._component.clear()
+        self._ord.clear()
+        self._at.clear()
+        self._cyclic.clear()
+        self._self_loops.clear()
+        self._next = 0
+        # Tarjan emits sinks first, so walk the components backwards.
+        for piece in reversed(strongly_connected_components(nodes, self._successors)):
+            # A self-loop inside a larger component must outlive a later split.
+            self._self_loops.update(node for node in piece if node in self._successors(node))
+            if len(piece) == 1:
+                key = piece[0]
+            else:
+                key = _Component(set(piece))
+                for member in piece:
+                    self._component[member] = key
+                self._cyclic.add(key)
+            self._place(key, self._next)
+            self._next += SLOT_GAP
+
+    def component_of(self, node):
+        """Returns the component key of a node (the node itself when it is on no cycle)."""
+        return self._component.get(node, node)
+
+    def has_cycle(self):
+        return bool(self._cyclic or self._self_loops)
+
+    def components(self):
+        """Returns the node sets of every component that contains a cycle."""
+        components = [set(component.members) for component in self._cyclic]
+        components.extend(
+            {node} for node in self._self_loops if node not in self._component
+        )
+        return components
+
+    def keyed_components(self):
+        """
+        Yields (key, members) for every component that contains a cycle. A
+        key stays the same object for as long as the component exists;
+        members is the live set, not a copy.
+        """
+        for component in self._cyclic:
+            yield component, component.members
+        for node in self._self_loops:
+            if node not in self._component:
+                yield node, (node,)
+
+    def find_cycle(self):
+        """Returns the nodes of one cyclic component, or None if the graph is acyclic."""
+        for component in self._cyclic:
+            return set(component.members)
+        for node in self._self_loops:
+            return {node}
+        return None
+
+    def _members(self, key):
+        return key.members if isinstance(key, _Component) else (key,)
+
+    def _search(self, start, neighbours, in_window):
+        """Collects the components reachable from start whose slot is in the window."""
+        ord_ = self._ord
+        component = self._component
+        seen = {start}
+        stack = [start]
+        while stack:
+            key = stack.pop()
+            for member in self._members(key):
+                for neighbour in neighbours(member):
+                    neighbour = component.get(neighbour, neighbour)
+                    if neighbour not in seen and in_window(ord_[neighbour]):
+                        seen.add(neighbour)
+                        stack.append(neighbour)
+        return seen
+
+    def _place(self, key, slot):
+        self._ord[key] = slot
+        self._at[slot] = key
+
+    def _unplace(self, key):
+        del self._at[self._ord.pop(key)]
+
+    def _reorder(self, backward, merged, forward):
+        ord_ = self._ord
+        merged = merged or set()
+        slots = sorted(ord_[key] for key in backward | forward | merged)
+        backward = sorted(backward, key=ord_.__getitem__)
+        forward = sorted(forward, key=ord_.__getitem__)
+        for key in backward + forward + list(merged):
+            self._unplace(key)
+        for slot, key in zip(slots, backward):
+            self._place(key, slot)
+        for slot, key in zip(slots[len(slots) - len(forward):], forward):
+            self._place(key, slot)
+        if merged:
+            self._place(self._merge(merged), slots[len(backward)])
+
+    def _merge(self, keys):
+        components = [key for key in keys if isinstance(key, _Component)]
+        target = max(components, key=lambda c: len(c.members), default=None)
+        if target is None:
+            target = _Component(set())
+        for key in keys:
+            if key is target:
+                continue
+            if isinstance(key, _Component):
+                self._cyclic.discard(key)
+            for member in self._members(key):
+                target.members.add(member)
+                self._component[member] = target
+        self._cyclic.add(target)
+        return target
+
+    def _split(self, component):
+        members = component.members
+        pieces = strongly_connected_components(
+            members,
+            lambda node: [succ for succ in self._successors(node) if succ in members]
+        )
+        if len(pieces) == 1:
+            return
+        if any(self._ord[component] + i in self._at for i in range(1, len(pieces))):
+            self._renumber(len(pieces))
+        slot = self._ord[component]
+        self._unplace(component)
+        self._cyclic.discard(component)
+        # Tarjan emits sinks first, so walk the pieces backwards.
+        for offset, piece in enumerate(reversed(pieces)):
+            if len(piece) == 1:
+                key = piece[0]
+                del self._component[key]
+                if key in self._successors(key):
+                    self._self_loops.add(key)
+            else:
+                key = _Component(set(piece))
+                for member in piece:
+                    self._component[member] = key
+                self._cyclic.add(key)
+            self._place(key, slot + offset)
+        self._next = max(self._next, slot + len(pieces))
+
+    def _renumber(self, room):
+        """Spreads every slot out again so a split has room for its pieces."""
+        gap = max(SLOT_GAP, 2 * room)
+        keys = sorted(self._ord, key=self._ord.__getitem__)
+        self._ord.clear()
+        self._at.clear()
+        for i, key in enumerate(keys):
+            self._place(key, i * gap)
+        self._next = len(keys) * gap
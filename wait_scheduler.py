@@ -0,0 +1,67 @@
+import heapq
+
+class WaitAgeScheduler:
+    """
+    Runs full deadlock analysis only when a wait has been stuck long enough.
+
+    Every new edge gets a cheap check, DeadlockDetector.on_cycle(), which is
+    a constant-time lookup on an incremental detector. Only an edge that
+    closes a cycle schedules work: once age_threshold seconds have passed,
+    poll() runs find_deadlocks(min_age=age_threshold), which ignores waits
+    younger than the threshold. Cycles of short-lived waits that resolve
+    before then never trigger a scan.
+
+    Args:
+        detector (DeadlockDetector): Detector to watch (ideally incremental)
+        age_threshold (float): Seconds a wait must last to count as stuck
+    """
+
+    def __init__(self, detector, age_threshold=1.0):
+        self.detector = detector
+        self.age_threshold = age_threshold
+        self.cheap_checks = 0
+        self.full_scans = 0
+        self._due = []
+        self._deadlocks = []
+        self._reported = set()
+        self._stale = False
+        detector.subscribe(self._on_change)
+
+    def close(self):
+        self.detector.unsubscribe(self._on_change)
+
+    def next_due(self):
+        """Returns the time of the next scheduled analysis, or None."""
+        return self._due[0][0] if self._due else None
+
+    def poll(self, now=None):
+        """
+        Runs the analysis if any cycle has become old enough, or a reported
+        deadlock changed. Returns the current list of Deadlock.
+        """
+        now = self.detector.clock() if now is None else now
+        ready = False
+        while self._due and self._due[0][0] <= now:
+            _, source, target = heapq.heappop(self._due)
+            # A cycle that has since been broken needs no scan.
+            ready = ready or self.detector.on_cycle(source, target)
+        if ready or self._stale:
+            self.full_scans += 1
+            self._stale = False
+            self._deadlocks = self.detector.find_deadlocks(min_age=self.age_threshold, now=now)
+            self._reported = set().union(
+                *(deadlock.processes | deadlock.resources for deadlock in self._deadlocks)
+            )
+        return self._deadlocks
+
+    def _on_change(self, event, source, target):
+        if event == "add" or event == "mode":
+            # A lock turning exclusive can close a deadlock like a new edge.
+            self.cheap_checks += 1
+            if self.detector.on_cycle(source, target):
+                # Every wait on the cycle is at least age_threshold old by then.
+                due = self.detector.clock() + self.age_threshold
+                heapq.heappush(self._due, (due, source, target))
+        if (event == "remove" or event == "mode") and source in self._reported:
+            # A removed edge, or a lock turning shared, can end a reported one.
+            self._stale = True